@@ -4,6 +4,81 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    JWT_CACHE_MAX_SIZE: int = 100_000
+
+    REVOKED_TOKENS_REFRESH_SECONDS: float = 5.0
+    REVOKED_TOKENS_CAPACITY: int = 100_000
+    REVOKED_TOKENS_ERROR_RATE: float = 0.001
+
+    METRICS_BUFFER_MAX_SIZE: int = 100_000
+    METRICS_FLUSH_BATCH_SIZE: int = 1_000
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 1.0
+    METRICS_BUFFER_HIGH_WATER: float = 0.8
+
+    TOPOLOGY_CACHE_TTL_SECONDS: float = 300.0
+    TOPOLOGY_CACHE_MAX_SIZE: int = 1_000_000
+
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    BINARY_LISTENER_ENABLED: bool = False
+    BINARY_LISTENER_HOST: str = "0.0.0.0"
+    BINARY_UDP_PORT: int = 9100
+    BINARY_TCP_PORT: int = 9101
+    BINARY_UDP_MAX_IN_FLIGHT: int = 1_000
+
+    METRICS_PARTITION_INTERVAL: str = "day"
+    METRICS_PARTITIONS_AHEAD: int = 7
+    METRICS_RETENTION_DAYS: int = 30
+    METRICS_PARTITION_CHECK_SECONDS: float = 3600.0
+
+    METRICS_STORAGE_MODE: str = "rows"
+    METRICS_CHUNK_SECONDS: int = 3600
+    METRICS_CHUNK_PERSIST_SECONDS: float = 60.0
+    METRICS_CHUNK_RETENTION_DAYS: int = 0
+
+    ROLLUP_RETENTION_DAYS_1M: int = 90
+    ROLLUP_RETENTION_DAYS_1H: int = 730
+    ROLLUP_RETENTION_DAYS_1D: int = 0
+
+    COLD_STORAGE_ENABLED: bool = False
+    COLD_STORAGE_DIR: str = "cold_storage"
+    COLD_STORAGE_SENSOR_RANGE: int = 1_000
+    COLD_STORAGE_BATCH_ROWS: int = 65_536
+    COLD_STORAGE_COMPRESSION: str = "zstd"
+    COLD_STORAGE_RETENTION_DAYS: int = 0
+
+    RECENT_READINGS_CAPACITY: int = 60
+    RECENT_READINGS_MAX_SENSORS: int = 1_000_000
+
+    ANOMALY_EWMA_ALPHA: float = 0.1
+    ANOMALY_Z_THRESHOLD: float = 4.0
+    ANOMALY_WARMUP_READINGS: int = 10
+    ANOMALY_MIN_STDDEV_RATIO: float = 0.01
+    ANOMALY_SLOPE_WINDOW_SECONDS: float = 60.0
+    ANOMALY_SLOPE_MIN_POINTS: int = 5
+    ANOMALY_HORIZON_SECONDS: float = 120.0
+
+    IOT_DEVICE_RATE: float = 50.0
+    IOT_DEVICE_BURST: float = 200.0
+    IOT_SENSOR_RATE: float = 10.0
+    IOT_SENSOR_BURST: float = 50.0
+    IOT_MAX_IN_FLIGHT: int = 64
+    IOT_RATE_LIMIT_MAX_KEYS: int = 1_000_000
+
+    SEQUENCE_RESET_GAP: int = 1_024
+    SEQUENCE_MAX_SENSORS: int = 1_000_000
+
+    INGEST_MAX_FUTURE_SKEW_SECONDS: float = 5.0
+    INGEST_REORDER_WINDOW_SECONDS: float = 300.0
+
+    DEVICE_SECRET_KEY: str | None = None
+    DEVICE_REVOCATION_REFRESH_SECONDS: float = 30.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,58 @@
+"""
+Підписані облікові дані IoT-пристроїв.
+
+Токен має вигляд dev.{device_id}.{version}.{signature}, де signature —
+HMAC-SHA256 від "dev.{device_id}.{version}" ключем DEVICE_SECRET_KEY
+(за замовчуванням JWT_SECRET_KEY), у base64url без доповнення. Перевірка
+не звертається до БД: достатньо підпису і знімка відкликань
+(app/services/device_revocations.py). Ротація збільшує
+IoTDevice.credential_version, і всі токени старших версій стають недійсними.
+
+Бінарні кадри підписуються ключем frame_key — це байти signature з токена
+(base64url-декодовані), тож пристрій не потребує окремого секрету.
+"""
+import base64
+import hashlib
+import hmac
+
+from app.core.config import settings
+
+PREFIX = "dev"
+
+
+class InvalidDeviceToken(Exception):
+    pass
+
+
+def _secret() -> bytes:
+    return (settings.DEVICE_SECRET_KEY or settings.JWT_SECRET_KEY).encode()
+
+
+def frame_key(device_id: int, version: int) -> bytes:
+    return hmac.new(_secret(), f"{PREFIX}.{device_id}.{version}".encode(), hashlib.sha256).digest()
+
+
+def _sign(device_id: int, version: int) -> str:
+    return base64.urlsafe_b64encode(frame_key(device_id, version)).rstrip(b"=").decode()
+
+
+def issue_device_token(device_id: int, version: int) -> str:
+    return f"{PREFIX}.{device_id}.{version}.{_sign(device_id, version)}"
+
+
+def verify_device_token(token: str) -> tuple[int, int]:
+    """(device_id, version) з токена або InvalidDeviceToken."""
+    try:
+        prefix, device_id, version, signature = token.split(".")
+        device_id, version = int(device_id), int(version)
+    except ValueError:
+        raise InvalidDeviceToken("Malformed device token")
+
+    if (
+        prefix != PREFIX
+        or not signature.isascii()
+        or not hmac.compare_digest(signature, _sign(device_id, version))
+    ):
+        raise InvalidDeviceToken("Invalid device token")
+
+    return device_id, version
@@ -0,0 +1,118 @@
+"""
+Хешування і перевірка паролів bcrypt в окремому пулі процесів.
+
+bcrypt займає 100+ мс CPU на виклик. У threadpool Starlette він забирав
+слоти, потрібні синхронним залежностям інших маршрутів, і конкурував за CPU
+з інжестом. Пул із PASSWORD_HASH_WORKERS процесів обмежує, скільки ядер
+може зайняти автентифікація. Понад PASSWORD_HASH_MAX_PENDING задач у пулі
+нові логіни і реєстрації одразу отримують 503 з Retry-After замість черги,
+тож сплеск логінів не відбирає ресурси в інжесту показників.
+
+Обробники мають повернути зʼєднання з БД у пул (db.close()) до виклику
+hash_password / check_password.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+# Мінімальна вартість bcrypt — прогрів воркерів майже без CPU
+_WARMUP_HASH = bcrypt.hashpw(b"", bcrypt.gensalt(rounds=4))
+
+
+def _hash(password: bytes) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt())
+
+
+def _check(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+class PasswordPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+
+        self._executor: ProcessPoolExecutor | None = None
+        self.pending = 0
+
+        self.completed_total = 0
+        self.rejected_total = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def start(self):
+        """Запустити воркери на старті застосунку, до першого логіну."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._pool(), _check, b"", _WARMUP_HASH)
+            for _ in range(self.workers)
+        ))
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected_total += 1
+            raise PasswordPoolBusy("Too many password operations in progress")
+
+        self.pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+        except BrokenProcessPool:
+            # Воркер завершився аварійно — наступний виклик створить новий пул
+            self._executor = None
+            raise
+        finally:
+            self.pending -= 1
+
+        self.completed_total += 1
+        return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed_total": self.completed_total,
+            "rejected_total": self.rejected_total
+        }
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
+
+async def _run(fn, *args):
+    try:
+        return await password_pool.run(fn, *args)
+    except PasswordPoolBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+
+
+async def hash_password(password: str) -> str:
+    return (await _run(_hash, password.encode("utf-8"))).decode("utf-8")
+
+
+async def check_password(password: str, hashed: str) -> bool:
+    return await _run(_check, password.encode("utf-8"), hashed.encode("utf-8"))
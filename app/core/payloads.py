@@ -0,0 +1,175 @@
+"""
+Узгодження формату тіла запиту для IoT-ендпоінтів: JSON, CBOR і MessagePack.
+
+Одиночні моделі валідуються pydantic як і раніше, а пакети показників
+розбираються швидким шляхом: TypeAdapter над кортежами і TypedDict, без
+побудови моделі на кожен елемент. Елемент пакета може бути обʼєктом
+{sensor_id, value, timestamp, seq} або компактним масивом [sensor_id, value, timestamp, seq]
+(timestamp і seq необовʼязкові);
+timestamp — ISO-8601, epoch-секунди або нативний datetime формату.
+"""
+import json
+from datetime import datetime
+from typing import Annotated
+
+import cbor2
+import msgpack
+from fastapi import HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Discriminator, Field, Tag, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
+
+from app.services.ingestion import Reading
+
+JSON = "application/json"
+CBOR = "application/cbor"
+MSGPACK = "application/msgpack"
+
+MEDIA_TYPES = {
+    JSON: JSON,
+    CBOR: CBOR,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+MAX_BATCH_READINGS = 10_000
+
+
+def request_media_type(request: Request) -> str:
+    content_type = request.headers.get("content-type", JSON)
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported content type: {media_type}"
+        )
+    return MEDIA_TYPES[media_type]
+
+
+def decode_payload(media_type: str, raw: bytes):
+    try:
+        if media_type == CBOR:
+            return cbor2.loads(raw)
+        if media_type == MSGPACK:
+            return msgpack.unpackb(raw, timestamp=3)
+        return json.loads(raw)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed {media_type} body"
+        )
+
+
+def request_body_schema(schema: dict) -> dict:
+    """openapi_extra для ендпоінтів, що читають тіло через ModelBody/batch_readings_body."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                media_type: {"schema": schema}
+                for media_type in (JSON, CBOR, MSGPACK)
+            }
+        }
+    }
+
+
+class ModelBody:
+    """Залежність: тіло запиту будь-якого підтримуваного формату -> pydantic-модель."""
+
+    def __init__(self, model: type[BaseModel]):
+        self.model = model
+
+    async def __call__(self, request: Request):
+        media_type = request_media_type(request)
+        raw = await request.body()
+
+        try:
+            if media_type == JSON:
+                return self.model.model_validate_json(raw)
+            return self.model.model_validate(decode_payload(media_type, raw))
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ])
+
+
+_Seq = Annotated[int, Field(ge=0)]
+
+
+class _ReadingObject(TypedDict):
+    sensor_id: int
+    value: float
+    timestamp: NotRequired[datetime | None]
+    seq: NotRequired[_Seq | None]
+
+
+def _reading_shape(item) -> str:
+    if isinstance(item, dict):
+        return "object"
+    if not isinstance(item, (list, tuple)):
+        # Невідомий тег — 422 від pydantic, а не TypeError на len()
+        return "invalid"
+    return {2: "short", 3: "full"}.get(len(item), "sequenced")
+
+
+# Дискримінатор обирає варіант одразу, без спроб і помилок для решти
+_ReadingItem = Annotated[
+    Annotated[_ReadingObject, Tag("object")]
+    | Annotated[tuple[int, float], Tag("short")]
+    | Annotated[tuple[int, float, datetime | None], Tag("full")]
+    | Annotated[tuple[int, float, datetime | None, _Seq | None], Tag("sequenced")],
+    Discriminator(_reading_shape)
+]
+_ReadingList = Annotated[
+    list[_ReadingItem],
+    Field(min_length=1, max_length=MAX_BATCH_READINGS)
+]
+
+
+class _BatchEnvelope(TypedDict):
+    readings: _ReadingList
+
+
+# Валідація виконується в pydantic-core над кортежами і dict — без моделі на елемент
+batch_adapter = TypeAdapter(
+    Annotated[
+        Annotated[_BatchEnvelope, Tag("envelope")] | Annotated[_ReadingList, Tag("list")],
+        Discriminator(lambda payload: "envelope" if isinstance(payload, dict) else "list")
+    ]
+)
+
+
+def _to_reading(item) -> Reading:
+    if isinstance(item, dict):
+        sensor_id, value = item["sensor_id"], item["value"]
+        timestamp, seq = item.get("timestamp"), item.get("seq")
+    else:
+        sensor_id, value, *rest = item
+        timestamp = rest[0] if rest else None
+        seq = rest[1] if len(rest) > 1 else None
+
+    return Reading(sensor_id, value, timestamp, seq)
+
+
+def parse_batch_readings(media_type: str, raw: bytes) -> list[Reading]:
+    try:
+        if media_type == JSON:
+            payload = batch_adapter.validate_json(raw)
+        else:
+            payload = batch_adapter.validate_python(decode_payload(media_type, raw))
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])}
+            for error in e.errors(include_url=False)
+        ])
+
+    items = payload["readings"] if isinstance(payload, dict) else payload
+    return [_to_reading(item) for item in items]
+
+
+async def batch_readings_body(request: Request) -> list[Reading]:
+    """Залежність: швидкий розбір пакета показників у список Reading."""
+    media_type = request_media_type(request)
+    return parse_batch_readings(media_type, await request.body())
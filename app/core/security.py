@@ -1,13 +1,16 @@
+import hashlib
+import uuid
 from typing import List
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
 from app.core.config import settings
 from app.db.database import get_db
-from app.db import models
+from app.services.principal_cache import principal_cache
+from app.services.token_cache import token_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -19,8 +22,9 @@ def create_access_token(data: dict):
     if "sub" in to_encode:
         to_encode["sub"] = str(to_encode["sub"])
 
-    expire = datetime.utcnow() + timedelta(hours=12)
-    to_encode.update({"exp": expire})
+    issued_at = datetime.utcnow()
+    expire = issued_at + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": issued_at, "jti": uuid.uuid4().hex})
 
     return jwt.encode(
         to_encode,
@@ -29,52 +33,77 @@ def create_access_token(data: dict):
     )
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+def decode_access_token(token: str) -> dict:
+    """
+    Claims токена: з кешу перевірених або після перевірки підпису.
+    Відкликаний токен — як і недійсний — дає 401.
+    """
+    claims = token_cache.get(token)
+
+    if claims is None:
+        try:
+            payload = jwt.decode(
+                token,
+                settings.JWT_SECRET_KEY,
+                algorithms=[settings.JWT_ALGORITHM]
+            )
+            claims = {
+                "user_id": int(payload["sub"]),
+                "role": payload["role"],
+                # Токени, видані до появи iat і jti, вважаються найстарішими
+                # і відкликаються за дайджестом
+                "iat": payload.get("iat", 0),
+                "jti": payload.get("jti") or hashlib.sha256(token.encode()).hexdigest(),
+                "exp": payload["exp"]
+            }
+        except (JWTError, KeyError, ValueError):
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid or expired token"
+            )
 
-        return {
-            "user_id": int(payload["sub"]),
-            "role": payload["role"]
-        }
+        token_cache.put(token, claims, claims["exp"])
 
-    except JWTError:
+    if token_cache.is_revoked(claims):
         raise HTTPException(
             status_code=401,
             detail="Invalid or expired token"
         )
 
+    return claims
+
 
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    claims = decode_access_token(token)
 
-def get_current_user_db(
+    return {
+        "user_id": claims["user_id"],
+        "role": claims["role"]
+    }
+
+
+
+async def get_current_user_db(
     token_data=Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     user_id = token_data["user_id"]
     role = token_data["role"]
 
-    user = None
-
-    if role == "administrator":
-        user = db.query(models.Administrator).filter_by(id=user_id).first()
-    elif role == "emergency_service":
-        user = db.query(models.EmergencyService).filter_by(id=user_id).first()
-    elif role == "business":
-        user = db.query(models.BusinessUser).filter_by(id=user_id).first()
+    user = await principal_cache.get_or_load(db, role, user_id)
 
     if not user:
         raise HTTPException(401, "User not found")
 
+    if role == "business" and user.is_blocked:
+        raise HTTPException(403, "Business account is blocked")
+
     return {"user": user, "role": role}
 
 
 
 def role_required(roles: List[str]):
-    def wrapper(user_data=Depends(get_current_user_db)):
+    async def wrapper(user_data=Depends(get_current_user_db)):
         if user_data["role"] not in roles:
             raise HTTPException(
                 status_code=403,
@@ -0,0 +1,71 @@
+"""
+Оновлення наявної схеми БД до поточних моделей (лише PostgreSQL).
+
+    python -m app.db.migrate
+
+Команда ідемпотентна, її можна запускати при кожному розгортанні:
+  * створює відсутні таблиці (агрегати, фрагменти, refresh- і відкликані
+    токени, відкликані акаунти);
+  * додає нові колонки та індекси до наявних таблиць;
+  * переносить несекціоновану sensor_metrics у секціоновану таблицю
+    (app/services/partitions.py) і створює секції наперед;
+  * після перенесення перераховує агрегати з перенесених рядків
+    (app/services/rollups.py).
+"""
+import asyncio
+
+from sqlalchemy import text
+
+from app.db.database import Base, engine
+from app.db import models
+from app.services.partitions import partition_manager
+from app.services.rollups import backfill
+
+# Колонки й індекси, додані до таблиць початкової схеми
+STATEMENTS = [
+    "ALTER TABLE iot_devices ADD COLUMN IF NOT EXISTS credential_version integer NOT NULL DEFAULT 1",
+    "ALTER TABLE incidents ADD COLUMN IF NOT EXISTS occurrence_count integer NOT NULL DEFAULT 1",
+    "ALTER TABLE incidents ADD COLUMN IF NOT EXISTS last_seen_at timestamp without time zone DEFAULT now()",
+    "ALTER TABLE incidents ADD COLUMN IF NOT EXISTS peak_value double precision",
+    "CREATE INDEX IF NOT EXISTS ix_incidents_sensor_status ON incidents (sensor_id, status)",
+    # Дублікати неврегульованих інцидентів сенсора закриваються на користь найстаршого
+    "UPDATE incidents SET status = 'resolved' "
+    "WHERE status != 'resolved' AND sensor_id IS NOT NULL AND id > ("
+    "SELECT min(i.id) FROM incidents i WHERE i.sensor_id = incidents.sensor_id AND i.status != 'resolved')",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_incidents_sensor_unresolved ON incidents (sensor_id) "
+    "WHERE status != 'resolved'",
+]
+
+
+async def migrate():
+    tables = [
+        table
+        for table in Base.metadata.sorted_tables
+        if table is not models.SensorMetric.__table__
+    ]
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+        for statement in STATEMENTS:
+            await conn.execute(text(statement))
+
+    migrated = await partition_manager.migrate_legacy_table()
+    print(f"{models.SensorMetric.__tablename__}: " + ("migrated" if migrated else "already partitioned"))
+
+    await partition_manager.maintain()
+    print(partition_manager.stats())
+
+    if migrated:
+        await backfill()
+        print("rollups: backfilled")
+
+
+async def _main():
+    try:
+        await migrate()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
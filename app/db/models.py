@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -6,7 +7,10 @@ from sqlalchemy import (
     ForeignKey,
     DateTime,
     func,
-    Boolean
+    Boolean,
+    Index,
+    LargeBinary,
+    text
 )
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -103,6 +107,7 @@ class IoTDevice(Base):
 
     supports_valve = Column(Boolean, nullable=False)
     active = Column(Boolean, nullable=False)
+    credential_version = Column(Integer, nullable=False, default=1, server_default="1")
 
     building = relationship("Building")
 
@@ -132,6 +137,11 @@ class Incident(Base):
     status = Column(String, nullable=False)
     description = Column(String, nullable=True)
 
+    # Повторні показання оновлюють відкритий інцидент, а не створюють новий
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1")
+    last_seen_at = Column(DateTime, server_default=func.now(), nullable=True)
+    peak_value = Column(Float, nullable=True)
+
     handled_by_service_id = Column(
         Integer,
         ForeignKey("emergency_services.id"),
@@ -147,6 +157,17 @@ class Incident(Base):
     building = relationship("Building")
     handled_by_service = relationship("EmergencyService")
 
+    __table_args__ = (
+        Index("ix_incidents_sensor_status", "sensor_id", "status"),
+        # Не більше одного неврегульованого інциденту на сенсор (app/services/incidents.py)
+        Index(
+            "uq_incidents_sensor_unresolved",
+            "sensor_id",
+            unique=True,
+            postgresql_where=text("status != 'resolved'")
+        ),
+    )
+
 
 
 class Valve(Base):
@@ -185,16 +206,24 @@ class Sensor(Base):
 
     device = relationship("IoTDevice", back_populates="sensors")
 
+    # Показники видаляє ON DELETE CASCADE у БД, без завантаження рядків у сесію
     metrics = relationship(
         "SensorMetric",
         back_populates="sensor",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
 class SensorMetric(Base):
     __tablename__ = "sensor_metrics"
+    # У PostgreSQL таблиця секціонована за recorded_at (app/services/partitions.py),
+    # тому ключ секціонування входить до первинного ключа
+    __table_args__ = (
+        Index("ix_sensor_metrics_sensor_recorded", "sensor_id", "recorded_at"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
 
     sensor_id = Column(
         Integer,
@@ -203,7 +232,95 @@ class SensorMetric(Base):
     )
 
     value = Column(Float, nullable=False)
-    recorded_at = Column(DateTime, server_default=func.now())
+    recorded_at = Column(
+        DateTime,
+        primary_key=True,
+        nullable=False,
+        server_default=func.now()
+    )
 
     sensor = relationship("Sensor", back_populates="metrics")
 
+
+
+class SensorMetricChunk(Base):
+    """Стиснені фрагменти показників (METRICS_STORAGE_MODE = "chunks", app/services/chunks.py)."""
+    __tablename__ = "sensor_metric_chunks"
+
+    sensor_id = Column(
+        Integer,
+        ForeignKey("sensors.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    chunk_start = Column(DateTime, primary_key=True)
+    chunk_id = Column(String(32), primary_key=True)
+
+    first_at = Column(DateTime, nullable=False)
+    last_at = Column(DateTime, nullable=False)
+    value_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+
+
+class SensorMetricRollup(Base):
+    """Агрегати показників за хвилину / годину / добу (app/services/rollups.py)."""
+    __tablename__ = "sensor_metric_rollups"
+
+    sensor_id = Column(
+        Integer,
+        ForeignKey("sensors.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    resolution = Column(String(2), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+
+    value_count = Column(Integer, nullable=False)
+    value_sum = Column(Float, nullable=False)
+    value_min = Column(Float, nullable=False)
+    value_max = Column(Float, nullable=False)
+
+
+
+class RefreshToken(Base):
+    """
+    Refresh-токени (app/services/refresh_tokens.py). Зберігається лише SHA-256
+    токена; family_id спільний для ланцюжка ротацій одного логіну.
+    """
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_principal", "role", "user_id"),
+    )
+
+    token_hash = Column(String(64), primary_key=True)
+    family_id = Column(String(32), nullable=False, index=True)
+
+    role = Column(String(20), nullable=False)
+    user_id = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+
+
+class RevokedToken(Base):
+    """Відкликані токени доступу за jti до їхнього exp (app/services/token_revocations.py)."""
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+
+class RevokedPrincipal(Base):
+    """
+    Заблоковані чи видалені акаунти: токени доступу, видані до revoked_at,
+    недійсні в усіх воркерах (app/services/token_revocations.py).
+    """
+    __tablename__ = "revoked_principals"
+
+    role = Column(String(20), primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+
+    revoked_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
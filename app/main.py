@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -8,11 +11,40 @@ from app.routers import (
     emergency_router,
     iot_router,   
 )
+from app.core.config import settings
+from app.core.passwords import password_pool
+from app.services.binary_listener import binary_listener
+from app.services.device_revocations import device_revocations
+from app.services.metrics_buffer import metrics_buffer
+from app.services.partitions import partition_manager
+from app.services.token_revocations import token_revocations
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Воркери пулу паролів стартують першими, поки в процесі мало потоків
+    await password_pool.start()
+    metrics_buffer.start()
+    partition_manager.start()
+    device_revocations.start()
+    token_revocations.start()
+    if settings.BINARY_LISTENER_ENABLED:
+        await binary_listener.start()
+    yield
+    await binary_listener.stop()
+    await token_revocations.stop()
+    await device_revocations.stop()
+    await partition_manager.stop()
+    await asyncio.to_thread(password_pool.shutdown)
+    # Дописати в БД усе, що ще лежить у write-behind буфері
+    await metrics_buffer.stop()
+
 
 app = FastAPI(
     title="GASGUARD",
     version="1.0",
-    description="IoT gas monitoring & emergency response system"
+    description="IoT gas monitoring & emergency response system",
+    lifespan=lifespan
 )
 
 
@@ -1,11 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-import bcrypt
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
 from app.db.database import get_db
 from app.db import models
 from app.schemas import administrator_schemas
+from app.core.passwords import hash_password, password_pool
 from app.core.security import role_required
+from app.services.admission import admission
+from app.services.anomaly import anomaly_detector
+from app.services.binary_listener import binary_listener
+from app.services.chunks import chunk_store
+from app.services.cold_storage import cold_storage
+from app.services.device_revocations import device_revocations
+from app.services.ingestion import forget_sensors
+from app.services.lateness import lateness_tracker
+from app.services.metrics_buffer import metrics_buffer
+from app.services.partitions import partition_manager
+from app.services.principal_cache import principal_cache
+from app.services.recent_readings import recent_readings
+from app.services.refresh_tokens import revoke_principal_refresh_tokens
+from app.services.sequences import sequence_tracker
+from app.services.token_cache import token_cache
+from app.services.token_revocations import token_revocations
+from app.services.topology_cache import sensor_topology
 
 
 router = APIRouter(prefix="/admin", tags=["Administrators"])
@@ -18,11 +37,11 @@ router = APIRouter(prefix="/admin", tags=["Administrators"])
     summary="Get all emergency services",
     description="Отримати список усіх екстрених служб"
 )
-def get_all_emergency_services(
-    db: Session = Depends(get_db),
+async def get_all_emergency_services(
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    services = db.query(models.EmergencyService).all()
+    services = (await db.scalars(select(models.EmergencyService))).all()
 
     return administrator_schemas.EmergencyServiceListResponse(
         emergency_services=services
@@ -35,15 +54,15 @@ def get_all_emergency_services(
     summary="Get emergency service details",
     description="Отримати деталі конкретної екстреної служби"
 )
-def get_emergency_service(
+async def get_emergency_service(
     service_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    service = (
-        db.query(models.EmergencyService)
+    service = await db.scalar(
+        select(models.EmergencyService)
         .filter(models.EmergencyService.id == service_id)
-        .first()
+        .limit(1)
     )
 
     if not service:
@@ -62,16 +81,16 @@ def get_emergency_service(
     summary="Create emergency service",
     description="Створити нову екстрену службу"
 )
-def create_emergency_service(
+async def create_emergency_service(
     data: administrator_schemas.EmergencyServiceCreateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
 
-    existing_service = (
-        db.query(models.EmergencyService)
+    existing_service = await db.scalar(
+        select(models.EmergencyService)
         .filter(models.EmergencyService.email == data.email)
-        .first()
+        .limit(1)
     )
 
     if existing_service:
@@ -80,10 +99,9 @@ def create_emergency_service(
             detail="Emergency service with this email already exists"
         )
 
-    hashed_password = bcrypt.hashpw(
-        data.password.encode("utf-8"),
-        bcrypt.gensalt()
-    ).decode("utf-8")
+    # bcrypt — у пулі процесів; зʼєднання повертається в пул на час хешування
+    await db.close()
+    hashed_password = await hash_password(data.password)
 
 
     service = models.EmergencyService(
@@ -94,8 +112,8 @@ def create_emergency_service(
     )
 
     db.add(service)
-    db.commit()
-    db.refresh(service)
+    await db.commit()
+    await db.refresh(service)
 
     return service
 
@@ -106,15 +124,15 @@ def create_emergency_service(
     summary="Delete emergency service",
     description="Видалити екстрену службу (доступно лише адміністратору)"
 )
-def delete_emergency_service(
+async def delete_emergency_service(
     service_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    service = (
-        db.query(models.EmergencyService)
+    service = await db.scalar(
+        select(models.EmergencyService)
         .filter(models.EmergencyService.id == service_id)
-        .first()
+        .limit(1)
     )
 
     if not service:
@@ -124,10 +142,10 @@ def delete_emergency_service(
         )
 
 
-    buildings_count = (
-        db.query(models.Building)
+    buildings_count = await db.scalar(
+        select(func.count())
+        .select_from(models.Building)
         .filter(models.Building.emergency_service_id == service_id)
-        .count()
     )
 
     if buildings_count > 0:
@@ -136,8 +154,11 @@ def delete_emergency_service(
             detail="Cannot delete emergency service with assigned buildings"
         )
 
-    db.delete(service)
-    db.commit()
+    await db.delete(service)
+    await revoke_principal_refresh_tokens(db, "emergency_service", service_id)
+    await token_revocations.revoke_principal(db, "emergency_service", service_id)
+    await db.commit()
+    principal_cache.invalidate("emergency_service", service_id)
 
 
     return
@@ -148,16 +169,15 @@ def delete_emergency_service(
     summary="Get unassigned buildings",
     description="Отримати всі будівлі, які не закріплені за жодною екстреною службою"
 )
-def get_unassigned_buildings(
-    db: Session = Depends(get_db),
+async def get_unassigned_buildings(
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    buildings = (
-        db.query(models.Building)
+    buildings = (await db.scalars(
+        select(models.Building)
         .filter(models.Building.emergency_service_id.is_(None))
         .order_by(models.Building.id)
-        .all()
-    )
+    )).all()
 
     return buildings
 
@@ -167,17 +187,17 @@ def get_unassigned_buildings(
     summary="Assign buildings to emergency service",
     description="Призначити екстренну службу для списку будівель"
 )
-def assign_buildings_to_emergency_service(
+async def assign_buildings_to_emergency_service(
     service_id: int,
     data: administrator_schemas.AssignBuildingsRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
 
-    service = (
-        db.query(models.EmergencyService)
+    service = await db.scalar(
+        select(models.EmergencyService)
         .filter(models.EmergencyService.id == service_id)
-        .first()
+        .limit(1)
     )
 
     if not service:
@@ -193,11 +213,10 @@ def assign_buildings_to_emergency_service(
         )
 
 
-    buildings = (
-        db.query(models.Building)
+    buildings = (await db.scalars(
+        select(models.Building)
         .filter(models.Building.id.in_(data.building_ids))
-        .all()
-    )
+    )).all()
 
     found_ids = {b.id for b in buildings}
     missing_ids = set(data.building_ids) - found_ids
@@ -212,7 +231,7 @@ def assign_buildings_to_emergency_service(
     for building in buildings:
         building.emergency_service_id = service_id
 
-    db.commit()
+    await db.commit()
 
     return administrator_schemas.AssignBuildingsResponse(
         emergency_service_id=service_id,
@@ -226,11 +245,11 @@ def assign_buildings_to_emergency_service(
     summary="Get all businesses",
     description="Отримати список усіх бізнес-користувачів"
 )
-def get_all_businesses(
-    db: Session = Depends(get_db),
+async def get_all_businesses(
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    businesses = db.query(models.BusinessUser).all()
+    businesses = (await db.scalars(select(models.BusinessUser))).all()
 
     return administrator_schemas.BusinessListResponse(
         businesses=[
@@ -251,15 +270,15 @@ def get_all_businesses(
     summary="Get business details",
     description="Отримати детальну інформацію про бізнес-користувача"
 )
-def get_business_by_id(
+async def get_business_by_id(
     business_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    business = (
-        db.query(models.BusinessUser)
+    business = await db.scalar(
+        select(models.BusinessUser)
         .filter(models.BusinessUser.id == business_id)
-        .first()
+        .limit(1)
     )
 
     if not business:
@@ -282,15 +301,15 @@ def get_business_by_id(
     summary="Delete business",
     description="Видалити бізнес-користувача та всі повʼязані з ним дані"
 )
-def delete_business(
+async def delete_business(
     business_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    business = (
-        db.query(models.BusinessUser)
+    business = await db.scalar(
+        select(models.BusinessUser)
         .filter(models.BusinessUser.id == business_id)
-        .first()
+        .limit(1)
     )
 
     if not business:
@@ -299,10 +318,20 @@ def delete_business(
             detail="Business not found"
         )
 
-    
+    sensor_ids = (await db.scalars(
+        select(models.Sensor.id)
+        .join(models.IoTDevice, models.Sensor.device_id == models.IoTDevice.id)
+        .join(models.Building, models.IoTDevice.building_id == models.Building.id)
+        .filter(models.Building.business_user_id == business_id)
+    )).all()
 
-    db.delete(business)
-    db.commit()
+    await db.delete(business)
+    await revoke_principal_refresh_tokens(db, "business", business_id)
+    await token_revocations.revoke_principal(db, "business", business_id)
+    await db.commit()
+    sensor_topology.invalidate_business(business_id)
+    forget_sensors(sensor_ids)
+    principal_cache.invalidate("business", business_id)
 
 
     return
@@ -314,15 +343,15 @@ def delete_business(
     summary="Block business",
     description="Заблокувати бізнес-користувача"
 )
-def block_business(
+async def block_business(
     business_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    business = (
-        db.query(models.BusinessUser)
+    business = await db.scalar(
+        select(models.BusinessUser)
         .filter(models.BusinessUser.id == business_id)
-        .first()
+        .limit(1)
     )
 
     if not business:
@@ -338,7 +367,11 @@ def block_business(
         )
 
     business.is_blocked = True
-    db.commit()
+    await revoke_principal_refresh_tokens(db, "business", business_id)
+    await token_revocations.revoke_principal(db, "business", business_id)
+    await db.commit()
+    sensor_topology.invalidate_business(business_id)
+    principal_cache.invalidate("business", business_id)
 
     return {
         "message": "Business blocked successfully",
@@ -353,11 +386,11 @@ def block_business(
     summary="Get all buildings",
     description="Отримати список усіх будівель у системі"
 )
-def get_all_buildings(
-    db: Session = Depends(get_db),
+async def get_all_buildings(
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    buildings = db.query(models.Building).all()
+    buildings = (await db.scalars(select(models.Building))).all()
 
     return administrator_schemas.AdminBuildingListResponse(
         buildings=buildings
@@ -370,15 +403,15 @@ def get_all_buildings(
     summary="Get building details",
     description="Отримати детальну інформацію про будівлю"
 )
-def get_building_by_id(
+async def get_building_by_id(
     building_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    building = (
-        db.query(models.Building)
+    building = await db.scalar(
+        select(models.Building)
         .filter(models.Building.id == building_id)
-        .first()
+        .limit(1)
     )
 
     if not building:
@@ -396,11 +429,11 @@ def get_building_by_id(
     summary="Get all IoT devices",
     description="Отримати список усіх IoT-пристроїв у системі"
 )
-def get_all_devices(
-    db: Session = Depends(get_db),
+async def get_all_devices(
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    devices = db.query(models.IoTDevice).all()
+    devices = (await db.scalars(select(models.IoTDevice))).all()
 
     data = [
         administrator_schemas.AdminDeviceItem(
@@ -423,17 +456,21 @@ def get_all_devices(
     summary="Get IoT device details",
     description="Отримати детальну інформацію про IoT-пристрій"
 )
-def get_device_detail(
+async def get_device_detail(
     device_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    device = (
-        db.query(models.IoTDevice)
+    device = await db.scalar(
+        select(models.IoTDevice)
         .join(models.Building, models.IoTDevice.building_id == models.Building.id)
         .join(models.BusinessUser, models.Building.business_user_id == models.BusinessUser.id)
+        .options(
+            contains_eager(models.IoTDevice.building)
+            .contains_eager(models.Building.business_user)
+        )
         .filter(models.IoTDevice.id == device_id)
-        .first()
+        .limit(1)
     )
 
     if not device:
@@ -459,19 +496,19 @@ def get_device_detail(
     summary="Incidents statistics",
     description="Статистика по інцидентах у системі"
 )
-def get_incident_statistics(
-    db: Session = Depends(get_db),
+async def get_incident_statistics(
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    total = db.query(models.Incident).count()
+    total = await db.scalar(select(func.count()).select_from(models.Incident))
 
-    open_count = db.query(models.Incident).filter(models.Incident.status == "open").count()
-    acknowledged_count = db.query(models.Incident).filter(models.Incident.status == "acknowledged").count()
-    in_progress_count = db.query(models.Incident).filter(models.Incident.status == "in_progress").count()
-    resolved_count = db.query(models.Incident).filter(models.Incident.status == "resolved").count()
+    open_count = await db.scalar(select(func.count()).select_from(models.Incident).filter(models.Incident.status == "open"))
+    acknowledged_count = await db.scalar(select(func.count()).select_from(models.Incident).filter(models.Incident.status == "acknowledged"))
+    in_progress_count = await db.scalar(select(func.count()).select_from(models.Incident).filter(models.Incident.status == "in_progress"))
+    resolved_count = await db.scalar(select(func.count()).select_from(models.Incident).filter(models.Incident.status == "resolved"))
 
-    warning_count = db.query(models.Incident).filter(models.Incident.severity == "warning").count()
-    critical_count = db.query(models.Incident).filter(models.Incident.severity == "critical").count()
+    warning_count = await db.scalar(select(func.count()).select_from(models.Incident).filter(models.Incident.severity == "warning"))
+    critical_count = await db.scalar(select(func.count()).select_from(models.Incident).filter(models.Incident.severity == "critical"))
 
     return administrator_schemas.AdminIncidentStatisticsResponse(
         total_incidents=total,
@@ -489,21 +526,26 @@ def get_incident_statistics(
     summary="Get all incidents",
     description="Отримати всі інциденти в системі"
 )
-def get_all_incidents(
-    db: Session = Depends(get_db),
+async def get_all_incidents(
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    incidents = (
-        db.query(models.Incident)
+    incidents = (await db.scalars(
+        select(models.Incident)
         .join(models.Building, models.Incident.building_id == models.Building.id)
         .join(models.BusinessUser, models.Building.business_user_id == models.BusinessUser.id)
         .outerjoin(
             models.EmergencyService,
             models.Building.emergency_service_id == models.EmergencyService.id
         )
+        .options(
+            contains_eager(models.Incident.building)
+            .contains_eager(models.Building.business_user),
+            contains_eager(models.Incident.building)
+            .contains_eager(models.Building.emergency_service)
+        )
         .order_by(models.Incident.detected_at.desc())
-        .all()
-    )
+    )).all()
 
     result = []
 
@@ -535,21 +577,27 @@ def get_all_incidents(
     summary="Get incident details",
     description="Отримати детальну інформацію про інцидент"
 )
-def get_incident_detail(
+async def get_incident_detail(
     incident_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    incident = (
-        db.query(models.Incident)
+    incident = await db.scalar(
+        select(models.Incident)
         .join(models.Building, models.Incident.building_id == models.Building.id)
         .join(models.BusinessUser, models.Building.business_user_id == models.BusinessUser.id)
         .outerjoin(
             models.EmergencyService,
             models.Building.emergency_service_id == models.EmergencyService.id
         )
+        .options(
+            contains_eager(models.Incident.building)
+            .contains_eager(models.Building.business_user),
+            contains_eager(models.Incident.building)
+            .contains_eager(models.Building.emergency_service)
+        )
         .filter(models.Incident.id == incident_id)
-        .first()
+        .limit(1)
     )
 
     if not incident:
@@ -582,7 +630,10 @@ def get_incident_detail(
         emergency_service_id=emergency.id if emergency else None,
         emergency_service_name=emergency.name if emergency else None,
 
-        sensor_id=incident.sensor_id
+        sensor_id=incident.sensor_id,
+        occurrence_count=incident.occurrence_count,
+        last_seen_at=incident.last_seen_at,
+        peak_value=incident.peak_value
     )
 
 
@@ -590,15 +641,58 @@ def get_incident_detail(
 
 
 
+@router.get(
+    "/ingestion/stats",
+    response_model=administrator_schemas.IngestionStatsResponse,
+    summary="Ingestion statistics",
+    description="Стан буферів, кешів і фонових задач прийому показників"
+)
+async def get_ingestion_stats(
+    user=Depends(role_required(["administrator"]))
+):
+    return administrator_schemas.IngestionStatsResponse(
+        metrics_buffer=metrics_buffer.stats(),
+        topology_cache=sensor_topology.stats(),
+        binary_listener=binary_listener.stats(),
+        metrics_partitions=partition_manager.stats(),
+        cold_storage=cold_storage.stats(),
+        metric_chunks=chunk_store.stats(),
+        recent_readings=recent_readings.stats(),
+        anomaly_detector=anomaly_detector.stats(),
+        admission=admission.stats(),
+        sequences=sequence_tracker.stats(),
+        lateness=lateness_tracker.stats(),
+        device_revocations=device_revocations.stats()
+    )
+
+
+@router.get(
+    "/auth/stats",
+    response_model=administrator_schemas.AuthStatsResponse,
+    summary="Authentication statistics",
+    description="Стан кешів користувачів і JWT, відкликаних токенів і пулу хешування паролів"
+)
+async def get_auth_stats(
+    user=Depends(role_required(["administrator"]))
+):
+    return administrator_schemas.AuthStatsResponse(
+        principal_cache=principal_cache.stats(),
+        token_cache=token_cache.stats(),
+        token_revocations=token_revocations.stats(),
+        password_pool=password_pool.stats()
+    )
+
+
+
 @router.get(
     "/all",
     response_model=administrator_schemas.AdministratorListResponse
 )
-def get_all_admins(
-    db: Session = Depends(get_db),
+async def get_all_admins(
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    admins = db.query(models.Administrator).all()
+    admins = (await db.scalars(select(models.Administrator))).all()
 
     data = [
         administrator_schemas.AdministratorItem(
@@ -619,16 +713,16 @@ def get_all_admins(
     response_model=administrator_schemas.AdministratorDetailResponse,
     status_code=status.HTTP_201_CREATED
 )
-def create_administrator(
+async def create_administrator(
     data: administrator_schemas.AdministratorCreateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
 
-    existing_admin = (
-        db.query(models.Administrator)
+    existing_admin = await db.scalar(
+        select(models.Administrator)
         .filter(models.Administrator.email == data.email)
-        .first()
+        .limit(1)
     )
 
     if existing_admin:
@@ -638,10 +732,9 @@ def create_administrator(
         )
 
     
-    hashed_password = bcrypt.hashpw(
-        data.password.encode("utf-8"),
-        bcrypt.gensalt()
-    ).decode("utf-8")
+    # bcrypt — у пулі процесів; зʼєднання повертається в пул на час хешування
+    await db.close()
+    hashed_password = await hash_password(data.password)
 
     new_admin = models.Administrator(
         email=data.email,
@@ -650,8 +743,8 @@ def create_administrator(
     )
 
     db.add(new_admin)
-    db.commit()
-    db.refresh(new_admin)
+    await db.commit()
+    await db.refresh(new_admin)
 
     return administrator_schemas.AdministratorDetailResponse(
         id=str(new_admin.id),
@@ -666,12 +759,12 @@ def create_administrator(
     "/{admin_id}",
     response_model=administrator_schemas.AdministratorDetailResponse
 )
-def get_admin(
+async def get_admin(
     admin_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user=Depends(role_required(["administrator"]))
 ):
-    admin = db.query(models.Administrator).filter_by(id=admin_id).first()
+    admin = await db.scalar(select(models.Administrator).filter_by(id=admin_id))
 
     if not admin:
         raise HTTPException(
@@ -694,9 +787,9 @@ def get_admin(
     summary="Delete administrator",
     description="Видалити адміністратора (доступно лише адміністратору)"
 )
-def delete_administrator(
+async def delete_administrator(
     admin_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_data=Depends(role_required(["administrator"]))
 ):
     current_admin: models.Administrator = user_data["user"]
@@ -707,10 +800,10 @@ def delete_administrator(
             detail="You cannot delete yourself"
         )
 
-    admin = (
-        db.query(models.Administrator)
+    admin = await db.scalar(
+        select(models.Administrator)
         .filter(models.Administrator.id == admin_id)
-        .first()
+        .limit(1)
     )
 
     if not admin:
@@ -719,7 +812,10 @@ def delete_administrator(
             detail="Administrator not found"
         )
 
-    db.delete(admin)
-    db.commit()
+    await db.delete(admin)
+    await revoke_principal_refresh_tokens(db, "administrator", admin_id)
+    await token_revocations.revoke_principal(db, "administrator", admin_id)
+    await db.commit()
+    principal_cache.invalidate("administrator", admin_id)
 
     return
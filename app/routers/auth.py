@@ -1,82 +1,163 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-import bcrypt
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
 from app.db.models import Administrator, EmergencyService, BusinessUser
-from app.core.security import create_access_token
+from app.core.passwords import check_password, hash_password
+from app.core.config import settings
+from app.core.security import create_access_token, decode_access_token, oauth2_scheme
+from app.schemas import auth_schemas
+from app.services.principal_cache import principal_cache
+from app.services.refresh_tokens import (
+    InvalidRefreshToken,
+    claim_refresh_token,
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token
+)
+from app.services.token_revocations import token_revocations
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+LOGIN_ROLES = (
+    ("administrator", Administrator),
+    ("emergency_service", EmergencyService),
+    ("business", BusinessUser),
+)
+
+
+
+def token_response(role: str, user_id: int, refresh_token: str) -> dict:
+    return {
+        "access_token": create_access_token({"sub": user_id, "role": role}),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "role": role,
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
+async def issue_tokens(db: AsyncSession, role: str, user_id: int) -> dict:
+    """Токен доступу і refresh-токен нової родини."""
+    refresh_token = issue_refresh_token(db, role, user_id)
+    await db.commit()
 
+    return token_response(role, user_id, refresh_token)
 
-@router.post("/login")
-def login(
+
+@router.post("/login", response_model=auth_schemas.AuthResponse)
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     email = form_data.username
-    password = form_data.password.encode("utf-8")
-
-    admin = db.query(Administrator).filter(Administrator.email == email).first()
-    if admin:
-        if bcrypt.checkpw(password, admin.password.encode("utf-8")):
-            token = create_access_token({"sub": admin.id, "role": "administrator"})
-            return {
-                "access_token": token,
-                "token_type": "bearer",
-                "role": "administrator"
-            }
-        else:
-            raise HTTPException(status_code=401, detail="Incorrect password")
-
-    service = db.query(EmergencyService).filter(EmergencyService.email == email).first()
-    if service:
-        if bcrypt.checkpw(password, service.password.encode("utf-8")):
-            token = create_access_token({"sub": service.id, "role": "emergency_service"})
-            return {
-                "access_token": token,
-                "token_type": "bearer",
-                "role": "emergency_service"
-            }
-        else:
-            raise HTTPException(status_code=401, detail="Incorrect password")
-
-    business = db.query(BusinessUser).filter(BusinessUser.email == email).first()
-    if business:
-        if bcrypt.checkpw(password, business.password.encode("utf-8")):
-            token = create_access_token({"sub": business.id, "role": "business"})
-            return {
-                "access_token": token,
-                "token_type": "bearer",
-                "role": "business"
-            }
-        else:
-            raise HTTPException(status_code=401, detail="Incorrect password")
 
- 
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="User not found"
-    )
+    # Одна вибірка замість трьох послідовних: роль, id і хеш за email.
+    # Якщо email є в кількох таблицях, пріоритет як і раніше: адміністратор,
+    # служба, бізнес
+    credentials = union_all(*(
+        select(
+            literal(priority).label("priority"),
+            literal(role).label("role"),
+            model.id,
+            model.password
+        )
+        .filter(model.email == email)
+        for priority, (role, model) in enumerate(LOGIN_ROLES)
+    ))
+    account = (await db.execute(
+        credentials.order_by("priority").limit(1)
+    )).first()
+
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
+    # Зʼєднання повертається в пул до перевірки пароля
+    await db.close()
+
+    if not await check_password(form_data.password, account.password):
+        raise HTTPException(status_code=401, detail="Incorrect password")
+
+    return await issue_tokens(db, account.role, account.id)
+
+
+@router.post(
+    "/refresh",
+    response_model=auth_schemas.AuthResponse,
+    summary="Refresh access token",
+    description="Обміняти refresh-токен на нову пару токенів; використаний refresh-токен відкликається"
+)
+async def refresh(
+    data: auth_schemas.RefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        stored = await claim_refresh_token(db, data.refresh_token)
+    except InvalidRefreshToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
+    role, user_id = stored.role, stored.user_id
+
+    # Ротація лише для чинного акаунта: відмова не витрачає refresh-токен
+    user = await principal_cache.get_or_load(db, role, user_id)
+
+    if not user:
+        raise HTTPException(401, "User not found")
+
+    if role == "business" and user.is_blocked:
+        raise HTTPException(403, "Business account is blocked")
+
+    refresh_token = await rotate_refresh_token(db, stored)
+
+    return token_response(role, user_id, refresh_token)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Logout",
+    description="Відкликати поточний токен доступу і, якщо передано, родину refresh-токена"
+)
+async def logout(
+    data: auth_schemas.LogoutRequest | None = None,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    claims = decode_access_token(token)
+    await token_revocations.revoke(claims["jti"], datetime.utcfromtimestamp(claims["exp"]))
+
+    if data and data.refresh_token:
+        await revoke_refresh_token(db, data.refresh_token)
+        await db.commit()
+
+    return
 
 
 @router.post(
     "/business/register",
+    response_model=auth_schemas.AuthResponse,
     status_code=status.HTTP_201_CREATED
 )
-def register_business(
+async def register_business(
     email: str,
     password: str,
     business_name: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
  
-    existing_business = (
-        db.query(BusinessUser)
+    existing_business = await db.scalar(
+        select(BusinessUser)
         .filter(BusinessUser.email == email)
-        .first()
+        .limit(1)
     )
 
     if existing_business:
@@ -85,11 +166,9 @@ def register_business(
             detail="Business user with this email already exists"
         )
 
-   
-    hashed_password = bcrypt.hashpw(
-        password.encode("utf-8"),
-        bcrypt.gensalt()
-    ).decode("utf-8")
+    # Зʼєднання повертається в пул на час хешування
+    await db.close()
+    hashed_password = await hash_password(password)
 
     
     new_business = BusinessUser(
@@ -99,18 +178,9 @@ def register_business(
     )
 
     db.add(new_business)
-    db.commit()
-    db.refresh(new_business)
+    await db.commit()
+    await db.refresh(new_business)
 
   
-    token = create_access_token({
-        "sub": new_business.id,
-        "role": "business"
-    })
-
-    return {
-        "access_token": token,
-        "token_type": "bearer",
-        "role": "business"
-    }
+    return await issue_tokens(db, "business", new_business.id)
 
@@ -1,10 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from app.db.database import get_db
+from app.core.device_tokens import issue_device_token
 from app.core.security import role_required
 from app.db import models
 from app.schemas import business_schemas
+from app.services.chunks import chunk_store
+from app.services.cold_storage import cold_storage
+from app.services.device_revocations import device_revocations
+from app.services.downsampling import lttb
+from app.services.ingestion import forget_sensors
+from app.services.partitions import partition_manager
+from app.services.recent_readings import from_epoch, recent_readings
+from app.services.rollups import query_rollups
+from app.services.topology_cache import sensor_topology
 
 router = APIRouter(
     prefix="/business",
@@ -17,9 +33,9 @@ router = APIRouter(
     "/me",
     response_model=business_schemas.BusinessUserResponse
 )
-def get_my_profile(
+async def get_my_profile(
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     business_user: models.BusinessUser = user_data["user"]
 
@@ -36,20 +52,19 @@ def get_my_profile(
     "/buildings",
     response_model=list[business_schemas.BusinessBuildingResponse]
 )
-def get_my_buildings(
+async def get_my_buildings(
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Отримати всі будівлі поточного власника бізнесу
     """
     business_user: models.BusinessUser = user_data["user"]
 
-    buildings = (
-        db.query(models.Building)
+    buildings = (await db.scalars(
+        select(models.Building)
         .filter(models.Building.business_user_id == business_user.id)
-        .all()
-    )
+    )).all()
 
     return [
         business_schemas.BusinessBuildingResponse(
@@ -68,10 +83,10 @@ def get_my_buildings(
     "/buildings/{building_id}/devices",
     response_model=list[business_schemas.BusinessDeviceResponse]
 )
-def get_building_devices(
+async def get_building_devices(
     building_id: int,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Отримати IoT-пристрої конкретної будівлі.
@@ -80,13 +95,13 @@ def get_building_devices(
     business_user: models.BusinessUser = user_data["user"]
 
     # 🔒 Перевірка: будівля належить цьому бізнесу
-    building = (
-        db.query(models.Building)
+    building = await db.scalar(
+        select(models.Building)
         .filter(
             models.Building.id == building_id,
             models.Building.business_user_id == business_user.id
         )
-        .first()
+        .limit(1)
     )
 
     if not building:
@@ -95,11 +110,10 @@ def get_building_devices(
             detail="Building not found or access denied"
         )
 
-    devices = (
-        db.query(models.IoTDevice)
+    devices = (await db.scalars(
+        select(models.IoTDevice)
         .filter(models.IoTDevice.building_id == building_id)
-        .all()
-    )
+    )).all()
 
     return [
         business_schemas.BusinessDeviceResponse(
@@ -117,22 +131,21 @@ def get_building_devices(
     "/incidents",
     response_model=list[business_schemas.BusinessIncidentResponse]
 )
-def get_business_incidents(
+async def get_business_incidents(
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Отримати всі інциденти по обʼєктах поточного бізнесу
     """
     business_user: models.BusinessUser = user_data["user"]
 
-    incidents = (
-        db.query(models.Incident)
+    incidents = (await db.scalars(
+        select(models.Incident)
         .join(models.Building, models.Incident.building_id == models.Building.id)
         .filter(models.Building.business_user_id == business_user.id)
         .order_by(models.Incident.detected_at.desc())
-        .all()
-    )
+    )).all()
 
     return [
         business_schemas.BusinessIncidentResponse(
@@ -142,7 +155,10 @@ def get_business_incidents(
             detected_at=i.detected_at,
             severity=i.severity,
             status=i.status,
-            description=i.description
+            description=i.description,
+            occurrence_count=i.occurrence_count,
+            last_seen_at=i.last_seen_at,
+            peak_value=i.peak_value
         )
         for i in incidents
     ]
@@ -153,24 +169,24 @@ def get_business_incidents(
     "/incidents/{incident_id}",
     response_model=business_schemas.BusinessIncidentDetailResponse
 )
-def get_business_incident(
+async def get_business_incident(
     incident_id: int,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Отримати деталі одного інциденту поточного бізнесу
     """
     business_user: models.BusinessUser = user_data["user"]
 
-    incident = (
-        db.query(models.Incident)
+    incident = await db.scalar(
+        select(models.Incident)
         .join(models.Building, models.Incident.building_id == models.Building.id)
         .filter(
             models.Incident.id == incident_id,
             models.Building.business_user_id == business_user.id
         )
-        .first()
+        .limit(1)
     )
 
     if not incident:
@@ -186,7 +202,10 @@ def get_business_incident(
         detected_at=incident.detected_at,
         severity=incident.severity,
         status=incident.status,
-        description=incident.description
+        description=incident.description,
+        occurrence_count=incident.occurrence_count,
+        last_seen_at=incident.last_seen_at,
+        peak_value=incident.peak_value
     )
 
 
@@ -196,24 +215,24 @@ def get_business_incident(
     "/incidents/{incident_id}/acknowledge",
     status_code=status.HTTP_200_OK
 )
-def acknowledge_incident(
+async def acknowledge_incident(
     incident_id: int,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Підтвердження тривоги власником бізнесу
     """
     business_user: models.BusinessUser = user_data["user"]
 
-    incident = (
-        db.query(models.Incident)
+    incident = await db.scalar(
+        select(models.Incident)
         .join(models.Building, models.Incident.building_id == models.Building.id)
         .filter(
             models.Incident.id == incident_id,
             models.Building.business_user_id == business_user.id
         )
-        .first()
+        .limit(1)
     )
 
     if not incident:
@@ -230,7 +249,7 @@ def acknowledge_incident(
 
     
     incident.status = "acknowledged"
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Incident acknowledged successfully",
@@ -245,10 +264,10 @@ def acknowledge_incident(
     summary="Create Building",
     description="Створити нову будівлю для поточного бізнесу"
 )
-def create_building(
+async def create_building(
     building_data: business_schemas.BusinessBuildingCreateRequest,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     business_user: models.BusinessUser = user_data["user"]
 
@@ -261,8 +280,8 @@ def create_building(
     )
 
     db.add(new_building)
-    db.commit()
-    db.refresh(new_building)
+    await db.commit()
+    await db.refresh(new_building)
 
     return new_building
 
@@ -273,21 +292,21 @@ def create_building(
     summary="Delete Building",
     description="Видалити будівлю, що належить поточному бізнесу"
 )
-def delete_building(
+async def delete_building(
     building_id: int,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     business_user: models.BusinessUser = user_data["user"]
 
     
-    building = (
-        db.query(models.Building)
+    building = await db.scalar(
+        select(models.Building)
         .filter(
             models.Building.id == building_id,
             models.Building.business_user_id == business_user.id
         )
-        .first()
+        .limit(1)
     )
 
     if not building:
@@ -297,13 +316,13 @@ def delete_building(
         )
 
     
-    active_incidents = (
-        db.query(models.Incident)
+    active_incidents = await db.scalar(
+        select(func.count())
+        .select_from(models.Incident)
         .filter(
             models.Incident.building_id == building_id,
             models.Incident.status != "resolved"
         )
-        .count()
     )
 
     if active_incidents > 0:
@@ -313,10 +332,10 @@ def delete_building(
         )
 
   
-    devices_count = (
-        db.query(models.IoTDevice)
+    devices_count = await db.scalar(
+        select(func.count())
+        .select_from(models.IoTDevice)
         .filter(models.IoTDevice.building_id == building_id)
-        .count()
     )
 
     if devices_count > 0:
@@ -326,8 +345,9 @@ def delete_building(
         )
 
    
-    db.delete(building)
-    db.commit()
+    await db.delete(building)
+    await db.commit()
+    sensor_topology.invalidate_building(building_id)
 
     return
 
@@ -338,22 +358,22 @@ def delete_building(
     summary="Get sensors for IoT device",
     description="Отримати всі сенсори вибраного IoT-пристрою, що належить бізнесу"
 )
-def get_device_sensors(
+async def get_device_sensors(
     device_id: int,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     business_user: models.BusinessUser = user_data["user"]
 
     # 🔒 Перевірка: пристрій належить будівлі цього бізнесу
-    device = (
-        db.query(models.IoTDevice)
+    device = await db.scalar(
+        select(models.IoTDevice)
         .join(models.Building, models.IoTDevice.building_id == models.Building.id)
         .filter(
             models.IoTDevice.id == device_id,
             models.Building.business_user_id == business_user.id
         )
-        .first()
+        .limit(1)
     )
 
     if not device:
@@ -363,7 +383,12 @@ def get_device_sensors(
         )
 
     # ✅ Повертаємо всі сенсори цього пристрою
-    return device.sensors
+    sensors = (await db.scalars(
+        select(models.Sensor)
+        .filter(models.Sensor.device_id == device.id)
+    )).all()
+
+    return sensors
 
 
 
@@ -374,22 +399,22 @@ def get_device_sensors(
     summary="Add IoT device to building",
     description="Додати IoT-пристрій до будівлі поточного бізнесу"
 )
-def create_device_for_building(
+async def create_device_for_building(
     building_id: int,
     device_data: business_schemas.BusinessDeviceCreateRequest,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     business_user: models.BusinessUser = user_data["user"]
 
     
-    building = (
-        db.query(models.Building)
+    building = await db.scalar(
+        select(models.Building)
         .filter(
             models.Building.id == building_id,
             models.Building.business_user_id == business_user.id
         )
-        .first()
+        .limit(1)
     )
 
     if not building:
@@ -399,10 +424,10 @@ def create_device_for_building(
         )
 
     
-    existing_device = (
-        db.query(models.IoTDevice)
+    existing_device = await db.scalar(
+        select(models.IoTDevice)
         .filter(models.IoTDevice.serial_number == device_data.serial_number)
-        .first()
+        .limit(1)
     )
 
     if existing_device:
@@ -421,34 +446,79 @@ def create_device_for_building(
     )
 
     db.add(new_device)
-    db.commit()
-    db.refresh(new_device)
+    await db.commit()
+    await db.refresh(new_device)
 
     return new_device
 
 
+@router.post(
+    "/devices/{device_id}/credentials",
+    response_model=business_schemas.BusinessDeviceCredentialResponse,
+    summary="Issue IoT device credentials",
+    description=(
+        "Видати токен пристрою для IoT-ендпоінтів. З rotate=true версія облікових даних "
+        "збільшується, і всі раніше видані токени пристрою стають недійсними"
+    )
+)
+async def issue_device_credentials(
+    device_id: int,
+    rotate: bool = Query(False),
+    user_data=Depends(role_required(["business"])),
+    db: AsyncSession = Depends(get_db)
+):
+    business_user: models.BusinessUser = user_data["user"]
+
+    device = await db.scalar(
+        select(models.IoTDevice)
+        .join(models.Building, models.IoTDevice.building_id == models.Building.id)
+        .filter(
+            models.IoTDevice.id == device_id,
+            models.Building.business_user_id == business_user.id
+        )
+        .limit(1)
+    )
+
+    if not device:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Device not found or access denied"
+        )
+
+    if rotate:
+        device.credential_version += 1
+        await db.commit()
+        device_revocations.rotate(device.id, device.credential_version)
+
+    return business_schemas.BusinessDeviceCredentialResponse(
+        device_id=device.id,
+        credential_version=device.credential_version,
+        token=issue_device_token(device.id, device.credential_version)
+    )
+
+
 @router.delete(
     "/devices/{device_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete IoT device",
     description="Видалити IoT-пристрій, що належить поточному бізнесу"
 )
-def delete_iot_device(
+async def delete_iot_device(
     device_id: int,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     business_user: models.BusinessUser = user_data["user"]
 
     
-    device = (
-        db.query(models.IoTDevice)
+    device = await db.scalar(
+        select(models.IoTDevice)
         .join(models.Building, models.IoTDevice.building_id == models.Building.id)
         .filter(
             models.IoTDevice.id == device_id,
             models.Building.business_user_id == business_user.id
         )
-        .first()
+        .limit(1)
     )
 
     if not device:
@@ -457,8 +527,15 @@ def delete_iot_device(
             detail="Device not found or access denied"
         )
 
-    db.delete(device)
-    db.commit()
+    sensor_ids = (await db.scalars(
+        select(models.Sensor.id).filter(models.Sensor.device_id == device_id)
+    )).all()
+
+    await db.delete(device)
+    await db.commit()
+    sensor_topology.invalidate_device(device_id)
+    device_revocations.disable(device_id)
+    forget_sensors(sensor_ids)
 
     
     return
@@ -471,23 +548,23 @@ def delete_iot_device(
     summary="Add sensor to IoT device",
     description="Додати сенсор до IoT-пристрою поточного бізнесу"
 )
-def create_sensor_for_device(
+async def create_sensor_for_device(
     device_id: int,
     sensor_data: business_schemas.BusinessSensorCreateRequest,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     business_user: models.BusinessUser = user_data["user"]
 
     
-    device = (
-        db.query(models.IoTDevice)
+    device = await db.scalar(
+        select(models.IoTDevice)
         .join(models.Building, models.IoTDevice.building_id == models.Building.id)
         .filter(
             models.IoTDevice.id == device_id,
             models.Building.business_user_id == business_user.id
         )
-        .first()
+        .limit(1)
     )
 
     if not device:
@@ -512,8 +589,9 @@ def create_sensor_for_device(
     )
 
     db.add(new_sensor)
-    db.commit()
-    db.refresh(new_sensor)
+    await db.commit()
+    await db.refresh(new_sensor)
+    sensor_topology.invalidate_device(device_id)
 
     return new_sensor
 
@@ -528,23 +606,23 @@ def create_sensor_for_device(
     summary="Delete sensor",
     description="Видалити сенсор, якщо всі інциденти по ньому врегульовані"
 )
-def delete_sensor(
+async def delete_sensor(
     sensor_id: int,
     user_data=Depends(role_required(["business"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     business_user: models.BusinessUser = user_data["user"]
 
    
-    sensor = (
-        db.query(models.Sensor)
+    sensor = await db.scalar(
+        select(models.Sensor)
         .join(models.IoTDevice, models.Sensor.device_id == models.IoTDevice.id)
         .join(models.Building, models.IoTDevice.building_id == models.Building.id)
         .filter(
             models.Sensor.id == sensor_id,
             models.Building.business_user_id == business_user.id
         )
-        .first()
+        .limit(1)
     )
 
     if not sensor:
@@ -554,13 +632,13 @@ def delete_sensor(
         )
 
     
-    active_incidents = (
-        db.query(models.Incident)
+    active_incidents = await db.scalar(
+        select(func.count())
+        .select_from(models.Incident)
         .filter(
             models.Incident.sensor_id == sensor_id,
             models.Incident.status != "resolved"
         )
-        .count()
     )
 
     if active_incidents > 0:
@@ -570,7 +648,228 @@ def delete_sensor(
         )
 
     
-    db.delete(sensor)
-    db.commit()
+    await db.delete(sensor)
+    await db.commit()
+    sensor_topology.invalidate_sensor(sensor_id)
+    forget_sensors([sensor_id])
 
     return
+
+
+def _metrics_period(from_: datetime | None, to: datetime | None) -> tuple[datetime, datetime]:
+    """Період запиту показників у naive UTC; за замовчуванням — останні 24 години."""
+    # Показники зберігаються в naive UTC
+    to = to or datetime.utcnow()
+    if to.tzinfo:
+        to = to.astimezone(timezone.utc).replace(tzinfo=None)
+    from_ = from_ or to - timedelta(days=1)
+    if from_.tzinfo:
+        from_ = from_.astimezone(timezone.utc).replace(tzinfo=None)
+
+    if from_ >= to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be earlier than 'to'"
+        )
+
+    return from_, to
+
+
+@router.get(
+    "/sensors/{sensor_id}/stats",
+    response_model=business_schemas.SensorMetricStatsResponse,
+    summary="Get sensor metric statistics",
+    description="Min/max/avg/count показників сенсора за період з агрегатів 1m / 1h / 1d"
+)
+async def get_sensor_stats(
+    sensor_id: int,
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    points: int = Query(500, ge=1, le=5000),
+    user_data=Depends(role_required(["business"])),
+    db: AsyncSession = Depends(get_db)
+):
+    business_user: models.BusinessUser = user_data["user"]
+
+    sensor = await db.scalar(
+        select(models.Sensor)
+        .join(models.IoTDevice, models.Sensor.device_id == models.IoTDevice.id)
+        .join(models.Building, models.IoTDevice.building_id == models.Building.id)
+        .filter(
+            models.Sensor.id == sensor_id,
+            models.Building.business_user_id == business_user.id
+        )
+        .limit(1)
+    )
+
+    if not sensor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sensor not found or access denied"
+        )
+
+    from_, to = _metrics_period(from_, to)
+
+    resolution, rollups = await query_rollups(db, sensor_id, from_, to, points)
+
+    count = sum(r.value_count for r in rollups)
+
+    return business_schemas.SensorMetricStatsResponse(
+        sensor_id=sensor_id,
+        resolution=resolution,
+        count=count,
+        min=min((r.value_min for r in rollups), default=None),
+        max=max((r.value_max for r in rollups), default=None),
+        avg=sum(r.value_sum for r in rollups) / count if count else None,
+        buckets=[
+            business_schemas.SensorMetricBucket(
+                bucket_start=r.bucket_start,
+                count=r.value_count,
+                min=r.value_min,
+                max=r.value_max,
+                avg=r.value_sum / r.value_count
+            )
+            for r in rollups
+        ]
+    )
+
+
+@router.get(
+    "/sensors/{sensor_id}/metrics",
+    response_model=business_schemas.SensorMetricHistoryResponse,
+    summary="Get sensor reading history",
+    description="Історія показників сенсора за період (гарячий і холодний рівні), проріджена LTTB до points точок"
+)
+async def get_sensor_metrics(
+    sensor_id: int,
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    points: int = Query(1000, ge=3, le=10000),
+    user_data=Depends(role_required(["business"])),
+    db: AsyncSession = Depends(get_db)
+):
+    business_user: models.BusinessUser = user_data["user"]
+
+    sensor = await db.scalar(
+        select(models.Sensor)
+        .join(models.IoTDevice, models.Sensor.device_id == models.IoTDevice.id)
+        .join(models.Building, models.IoTDevice.building_id == models.Building.id)
+        .filter(
+            models.Sensor.id == sensor_id,
+            models.Building.business_user_id == business_user.id
+        )
+        .limit(1)
+    )
+
+    if not sensor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sensor not found or access denied"
+        )
+
+    from_, to = _metrics_period(from_, to)
+
+    # Два масиви одним рядком замість рядка на показник: psycopg розбирає їх
+    # без Row-обʼєктів, а фільтр за recorded_at відсікає зайві секції sensor_metrics.
+    # array_agg з ORDER BY — PostgreSQL, як і вся схема (app/db/database.py)
+    recorded_at = models.SensorMetric.recorded_at
+    seconds, values = (await db.execute(
+        select(
+            func.array_agg(aggregate_order_by(
+                cast(func.extract("epoch", recorded_at), Float),
+                recorded_at
+            )),
+            func.array_agg(aggregate_order_by(models.SensorMetric.value, recorded_at))
+        )
+        .select_from(models.Sensor)
+        .join(models.Sensor.metrics)
+        .filter(
+            models.Sensor.id == sensor.id,
+            recorded_at >= from_,
+            recorded_at < to
+        )
+    )).one()
+
+    x = np.array(seconds or [], dtype=np.float64)
+    y = np.array(values or [], dtype=np.float64)
+
+    # У режимі фрагментів нові показання у sensor_metric_chunks; рядки, записані
+    # до перемикання режиму, лишаються в sensor_metrics
+    if chunk_store.enabled:
+        chunk_x, chunk_y = await chunk_store.read(db, sensor.id, from_, to)
+        x, y = np.concatenate([x, chunk_x]), np.concatenate([y, chunk_y])
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+
+    # Старші за retention показання вже у файлах холодного рівня; межа — перше
+    # гаряче показання, тож секція, вивантажена, але ще не видалена, не дублюється
+    cold_until = partition_manager.retention_cutoff(datetime.utcnow())
+    if cold_storage.enabled and cold_until and from_ < cold_until:
+        cold_x, cold_y = await run_in_threadpool(
+            cold_storage.read,
+            sensor.id,
+            from_,
+            min(to, from_epoch(x[0])) if len(x) else to
+        )
+        x, y = np.concatenate([cold_x, x]), np.concatenate([cold_y, y])
+
+    selected = lttb(x, y, points)
+
+    return business_schemas.SensorMetricHistoryResponse(
+        sensor_id=sensor.id,
+        total_points=len(x),
+        points=[
+            business_schemas.SensorMetricPoint(
+                recorded_at=from_epoch(moment),
+                value=value
+            )
+            for moment, value in zip(x[selected].tolist(), y[selected].tolist())
+        ]
+    )
+
+
+@router.get(
+    "/sensors/{sensor_id}/recent",
+    response_model=business_schemas.SensorRecentReadingsResponse,
+    summary="Get recent sensor readings",
+    description="Останні показники сенсора з памʼяті процесу: останнє значення, останні N і статистика за вікно"
+)
+async def get_sensor_recent(
+    sensor_id: int,
+    limit: int = Query(60, ge=1, le=1000),
+    window: float = Query(300.0, gt=0),
+    user_data=Depends(role_required(["business"])),
+    db: AsyncSession = Depends(get_db)
+):
+    business_user: models.BusinessUser = user_data["user"]
+
+    # Власника перевіряє кеш топології — на влучанні запиту до БД немає
+    sensor = await sensor_topology.get_or_load(db, sensor_id)
+
+    if not sensor or sensor.business_user_id != business_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sensor not found or access denied"
+        )
+
+    latest = recent_readings.latest(sensor_id)
+    times, values = recent_readings.last(sensor_id, limit)
+
+    return business_schemas.SensorRecentReadingsResponse(
+        sensor_id=sensor_id,
+        latest=business_schemas.SensorMetricPoint(
+            recorded_at=latest[0],
+            value=latest[1]
+        ) if latest else None,
+        points=[
+            business_schemas.SensorMetricPoint(
+                recorded_at=from_epoch(moment),
+                value=value
+            )
+            for moment, value in zip(times.tolist(), values.tolist())
+        ],
+        window=business_schemas.SensorWindowStats(
+            seconds=window,
+            **recent_readings.window_stats(sensor_id, window)
+        )
+    )
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
 from app.db.database import get_db
 from app.core.security import role_required
@@ -19,9 +21,9 @@ router = APIRouter(
     summary="Get emergency service profile",
     description="Отримати профіль поточної екстренної служби"
 )
-def get_my_profile(
+async def get_my_profile(
     user_data=Depends(role_required(["emergency_service"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     emergency_service: models.EmergencyService = user_data["user"]
 
@@ -43,14 +45,14 @@ from sqlalchemy import or_
     summary="Get incidents that require response",
     description="Отримати інциденти, за які відповідає служба або які ще не призначені"
 )
-def get_emergency_incidents(
+async def get_emergency_incidents(
     user_data=Depends(role_required(["emergency_service"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     emergency_service: models.EmergencyService = user_data["user"]
 
-    incidents = (
-        db.query(models.Incident)
+    incidents = (await db.scalars(
+        select(models.Incident)
         .join(models.Building, models.Incident.building_id == models.Building.id)
         .filter(
             models.Incident.status.in_(["open", "acknowledged"]),
@@ -60,8 +62,7 @@ def get_emergency_incidents(
             )
         )
         .order_by(models.Incident.detected_at.desc())
-        .all()
-    )
+    )).all()
 
     return incidents
 
@@ -71,18 +72,17 @@ def get_emergency_incidents(
     summary="Get buildings assigned to emergency service",
     description="Отримати всі будівлі, закріплені за поточною екстренною службою"
 )
-def get_assigned_buildings(
+async def get_assigned_buildings(
     user_data=Depends(role_required(["emergency_service"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     emergency_service: models.EmergencyService = user_data["user"]
 
-    buildings = (
-        db.query(models.Building)
+    buildings = (await db.scalars(
+        select(models.Building)
         .filter(models.Building.emergency_service_id == emergency_service.id)
         .order_by(models.Building.id)
-        .all()
-    )
+    )).all()
 
     return buildings
 
@@ -95,20 +95,20 @@ def get_assigned_buildings(
     summary="Get building details",
     description="Отримати деталі будівлі для швидкого реагування екстренної служби"
 )
-def get_emergency_building(
+async def get_emergency_building(
     building_id: int,
     user_data=Depends(role_required(["emergency_service"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     emergency_service: models.EmergencyService = user_data["user"]
 
-    building = (
-        db.query(models.Building)
+    building = await db.scalar(
+        select(models.Building)
         .filter(
             models.Building.id == building_id,
             models.Building.emergency_service_id == emergency_service.id
         )
-        .first()
+        .limit(1)
     )
 
     if not building:
@@ -129,16 +129,17 @@ from sqlalchemy import or_
     summary="Accept incident",
     description="Взяти інцидент в роботу екстренною службою"
 )
-def accept_incident(
+async def accept_incident(
     incident_id: int,
     user_data=Depends(role_required(["emergency_service"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     emergency_service: models.EmergencyService = user_data["user"]
 
-    incident = (
-        db.query(models.Incident)
+    incident = await db.scalar(
+        select(models.Incident)
         .join(models.Building, models.Incident.building_id == models.Building.id)
+        .options(contains_eager(models.Incident.building))
         .filter(
             models.Incident.id == incident_id,
             or_(
@@ -146,7 +147,7 @@ def accept_incident(
                 models.Building.emergency_service_id.is_(None)
             )
         )
-        .first()
+        .limit(1)
     )
 
     if not incident:
@@ -170,8 +171,7 @@ def accept_incident(
     incident.status = "in_progress"
     incident.handled_by_service_id = emergency_service.id
 
-    db.commit()
-    db.refresh(incident)
+    await db.commit()
 
     return {
         "message": "Incident accepted and taken into work",
@@ -190,21 +190,21 @@ def accept_incident(
     summary="Resolve incident",
     description="Завершити інцидент екстренною службою"
 )
-def resolve_incident(
+async def resolve_incident(
     incident_id: int,
     user_data=Depends(role_required(["emergency_service"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     emergency_service: models.EmergencyService = user_data["user"]
 
-    incident = (
-        db.query(models.Incident)
+    incident = await db.scalar(
+        select(models.Incident)
         .join(models.Building, models.Incident.building_id == models.Building.id)
         .filter(
             models.Incident.id == incident_id,
             models.Building.emergency_service_id == emergency_service.id
         )
-        .first()
+        .limit(1)
     )
 
     if not incident:
@@ -222,7 +222,7 @@ def resolve_incident(
 
    
     incident.status = "resolved"
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Incident resolved successfully",
@@ -238,22 +238,21 @@ def resolve_incident(
     summary="Get accepted incidents",
     description="Отримати інциденти, які екстренна служба вже взяла в роботу"
 )
-def get_accepted_incidents(
+async def get_accepted_incidents(
     user_data=Depends(role_required(["emergency_service"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     emergency_service: models.EmergencyService = user_data["user"]
 
-    incidents = (
-        db.query(models.Incident)
+    incidents = (await db.scalars(
+        select(models.Incident)
         .join(models.Building, models.Incident.building_id == models.Building.id)
         .filter(
             models.Incident.status == "in_progress",
             models.Incident.handled_by_service_id == emergency_service.id
         )
         .order_by(models.Incident.detected_at.desc())
-        .all()
-    )
+    )).all()
 
     return incidents
 
@@ -265,21 +264,20 @@ def get_accepted_incidents(
     summary="Get resolved incidents",
     description="Отримати завершені інциденти екстренної служби"
 )
-def get_resolved_incidents(
+async def get_resolved_incidents(
     user_data=Depends(role_required(["emergency_service"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     emergency_service: models.EmergencyService = user_data["user"]
 
-    incidents = (
-        db.query(models.Incident)
+    incidents = (await db.scalars(
+        select(models.Incident)
         .filter(
             models.Incident.status == "resolved",
             models.Incident.handled_by_service_id == emergency_service.id
         )
         .order_by(models.Incident.detected_at.desc())
-        .all()
-    )
+    )).all()
 
     return incidents
 
@@ -290,15 +288,15 @@ def get_resolved_incidents(
     summary="Get incident location",
     description="Отримати локацію інциденту для відображення на карті"
 )
-def get_incident_location(
+async def get_incident_location(
     incident_id: int,
     user_data=Depends(role_required(["emergency_service"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     emergency_service: models.EmergencyService = user_data["user"]
 
-    result = (
-        db.query(
+    result = (await db.execute(
+        select(
             models.Incident.id.label("incident_id"),
             models.Building.id.label("building_id"),
             models.Building.address,
@@ -310,8 +308,8 @@ def get_incident_location(
             models.Incident.id == incident_id,
             models.Building.emergency_service_id == emergency_service.id
         )
-        .first()
-    )
+        .limit(1)
+    )).first()
 
     if not result:
         raise HTTPException(
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import math
 
-from app.db.database import get_db
-from app.db import models
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.security import APIKeyHeader
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.device_tokens import InvalidDeviceToken, verify_device_token
+from app.core.payloads import MAX_BATCH_READINGS, ModelBody, batch_readings_body, request_body_schema
+from app.db.database import SessionLocal, get_db
+from app.services.admission import Overloaded, RateLimited, admission
+from app.services.device_revocations import device_revocations
+from app.services.ingestion import DisabledSensorsError, Reading, UnknownSensorsError, ingest_readings
+from app.services.metrics_buffer import metrics_buffer
 from app.schemas.iot_schemas import (
     SensorDataCreateRequest,
-    SensorDataResponse
+    SensorDataResponse,
+    SensorReadingBatchItem,
+    SensorReadingBatchResponse,
+    SensorStreamAck
 )
 
 router = APIRouter(
@@ -13,60 +25,232 @@ router = APIRouter(
     tags=["IoT"]
 )
 
+# Кадр WebSocket — одне показання або масив показань
+stream_message_adapter = TypeAdapter(
+    SensorReadingBatchItem | list[SensorReadingBatchItem]
+)
+
+device_token_scheme = APIKeyHeader(name="X-Device-Token", auto_error=False)
+
+
+def _authenticate(token: str | None) -> int | None:
+    """device_id з дійсного і не відкликаного токена; перевірка лише в памʼяті."""
+    if not token:
+        return None
+    try:
+        device_id, version = verify_device_token(token)
+    except InvalidDeviceToken:
+        return None
+    if device_revocations.is_revoked(device_id, version):
+        return None
+    return device_id
+
+
+def current_device(token: str | None = Depends(device_token_scheme)) -> int:
+    device_id = _authenticate(token)
+    if device_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or revoked device token"
+        )
+    return device_id
+
+
+def _admit(sensor_ids: list[int], device_id: int):
+    try:
+        admission.admit(sensor_ids, [device_id] * len(sensor_ids))
+    except RateLimited as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
+
+def admit_sensor_reading(sensor_id: int, device_id: int = Depends(current_device)):
+    _admit([sensor_id], device_id)
+
+
+def admit_batch(
+    readings: list[Reading] = Depends(batch_readings_body),
+    device_id: int = Depends(current_device)
+):
+    _admit([r.sensor_id for r in readings], device_id)
+
+
+async def ingestion_slot(device_id: int = Depends(current_device)):
+    """
+    Глобальна межа одночасних запитів інжесту; понад неї — 503 без черги.
+    Береться до списання токенів, тож відкинутий запит їх не витрачає.
+    """
+    try:
+        admission.enter()
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+
+    try:
+        yield
+    finally:
+        admission.leave()
+
+
 @router.post(
     "/sensors/{sensor_id}/data",
     response_model=SensorDataResponse,
     status_code=status.HTTP_201_CREATED,
-    summary="Send sensor data"
+    summary="Send sensor data",
+    openapi_extra=request_body_schema(SensorDataCreateRequest.model_json_schema()),
+    # Токен і допуск перевіряються до розбору тіла і до відкриття сесії БД
+    dependencies=[Depends(ingestion_slot), Depends(admit_sensor_reading)]
 )
-def receive_sensor_data(
+async def receive_sensor_data(
     sensor_id: int,
-    data: SensorDataCreateRequest,
-    db: Session = Depends(get_db)
+    data: SensorDataCreateRequest = Depends(ModelBody(SensorDataCreateRequest)),
+    device_id: int = Depends(current_device),
+    db: AsyncSession = Depends(get_db)
 ):
-    
-    sensor = db.query(models.Sensor).filter(
-        models.Sensor.id == sensor_id
-    ).first()
-    if not sensor:
+    # Топологія береться з кешу — звичайне показання не робить запитів до БД;
+    # сенсор іншого пристрою вважається невідомим
+    try:
+        results = await ingest_readings(
+            db,
+            [Reading(sensor_id, data.value, data.timestamp, data.seq)],
+            device_id=device_id
+        )
+    except UnknownSensorsError:
         raise HTTPException(404, "Sensor not found")
+    except DisabledSensorsError as e:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, str(e))
 
-   
-    device = db.query(models.IoTDevice).filter(
-        models.IoTDevice.id == sensor.device_id
-    ).first()
-
-    
-    building = db.query(models.Building).filter(
-        models.Building.id == device.building_id
-    ).first()
-
-    value = data.value
-    severity = "normal"
-    incident_created = False
-
-    
-    if value >= sensor.threshold_critical:
-        severity = "critical"
-    elif value >= sensor.threshold_warning:
-        severity = "warning"
-
-    
-    if severity in ("warning", "critical"):
-        incident = models.Incident(
-            building_id=building.id,
-            sensor_id=sensor.id,
-            severity=severity,
-            status="open",
-            description=f"{sensor.sensor_type.upper()} = {value} {sensor.unit}"
+    return SensorDataResponse(**results[0]._asdict())
+
+
+@router.post(
+    "/readings:batch",
+    response_model=SensorReadingBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Send a batch of sensor readings",
+    description=(
+        "Прийняти пакет показників пристрою (X-Device-Token): один запит до БД для всіх сенсорів і масова вставка. "
+        "Тіло — JSON, CBOR або MessagePack; елемент пакета — обʼєкт або масив [sensor_id, value, timestamp, seq]. "
+        "Показання з уже прийнятим seq не записуються повторно і позначаються duplicate; "
+        "показання, старші за вікно переупорядкування, позначаються late і не відкривають інцидентів"
+    ),
+    openapi_extra=request_body_schema({
+        "type": "object",
+        "required": ["readings"],
+        "properties": {
+            "readings": {
+                "type": "array",
+                "maxItems": MAX_BATCH_READINGS,
+                "items": SensorReadingBatchItem.model_json_schema()
+            }
+        }
+    }),
+    dependencies=[Depends(ingestion_slot), Depends(admit_batch)]
+)
+async def receive_sensor_data_batch(
+    readings: list[Reading] = Depends(batch_readings_body),
+    device_id: int = Depends(current_device),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        results = await ingest_readings(db, readings, device_id=device_id)
+    except UnknownSensorsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
         )
-        db.add(incident)
-        db.commit()
-        incident_created = True
-
-    return SensorDataResponse(
-        sensor_id=sensor.id,
-        value=value,
-        severity=severity,
-        incident_created=incident_created
+    except DisabledSensorsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+
+    duplicates = sum(r.duplicate for r in results)
+    expired = sum(r.expired for r in results)
+
+    return SensorReadingBatchResponse(
+        accepted=len(results) - duplicates - expired,
+        duplicates=duplicates,
+        late=sum(r.late and not r.expired for r in results),
+        expired=expired,
+        incidents_created=sum(r.incident_created for r in results),
+        results=[SensorDataResponse(**r._asdict()) for r in results]
     )
+
+
+@router.websocket("/ws")
+async def sensor_stream(
+    websocket: WebSocket,
+    token: str | None = None
+):
+    """
+    Довготривалий канал для пристроїв, що звітують часто.
+
+    Токен пристрою передається заголовком X-Device-Token або параметром token.
+    Кожен текстовий кадр — JSON-показання або масив показань; у відповідь
+    приходить SensorStreamAck із severity для кожного. Кадри обробляються
+    послідовно, а при переповненні буфера показників наступний кадр не
+    читається, доки буфер не спуститься — повільна БД пригальмовує сокет.
+    """
+    device_id = _authenticate(websocket.headers.get("x-device-token") or token)
+    if device_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+
+    try:
+        while True:
+            raw = await websocket.receive_text()
+
+            try:
+                items = stream_message_adapter.validate_json(raw)
+            except ValidationError:
+                await websocket.send_text(
+                    SensorStreamAck(error="Invalid reading payload").model_dump_json()
+                )
+                continue
+
+            if not isinstance(items, list):
+                items = [items]
+            readings = [
+                Reading(item.sensor_id, item.value, item.timestamp, item.seq)
+                for item in items
+            ]
+
+            try:
+                admission.enter()
+            except Overloaded as e:
+                await websocket.send_text(SensorStreamAck(error=str(e)).model_dump_json())
+                continue
+
+            try:
+                admission.admit([r.sensor_id for r in readings], [device_id] * len(readings))
+            except RateLimited as e:
+                admission.leave()
+                await websocket.send_text(SensorStreamAck(error=str(e)).model_dump_json())
+                continue
+
+            try:
+                async with SessionLocal() as db:
+                    results = await ingest_readings(db, readings, device_id=device_id)
+                ack = SensorStreamAck(
+                    results=[SensorDataResponse(**r._asdict()) for r in results]
+                )
+            except (UnknownSensorsError, DisabledSensorsError) as e:
+                ack = SensorStreamAck(error=str(e))
+            finally:
+                admission.leave()
+
+            await websocket.send_text(ack.model_dump_json())
+
+            await metrics_buffer.wait_for_capacity()
+
+    except WebSocketDisconnect:
+        pass
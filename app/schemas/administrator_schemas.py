@@ -205,6 +205,9 @@ class AdminIncidentDetailResponse(BaseModel):
     emergency_service_name: str | None
 
     sensor_id: int | None
+    occurrence_count: int = 1
+    last_seen_at: datetime | None = None
+    peak_value: float | None = None
 
     class Config:
         from_attributes = True
@@ -235,3 +238,162 @@ class AdminBuildingResponse(BaseModel):
     class Config:
         orm_mode = True
 
+
+class MetricsBufferStats(BaseModel):
+    depth: int
+    max_size: int
+    high_water_size: int
+    flushed_total: int
+    dropped_total: int
+    rejected_total: int
+    failed_flushes: int
+    flush_count: int
+    last_flush_seconds: float
+    max_flush_seconds: float
+
+
+class TopologyCacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+
+
+class PrincipalCacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    invalidations: int
+
+
+class TokenCacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+
+
+class TokenRevocationStats(BaseModel):
+    revoked_tokens: int
+    filter_bytes: int
+    filter_hashes: int
+    revoked_principals: int
+    refreshed_at: datetime | None
+    rejected_total: int
+
+
+class PasswordPoolStats(BaseModel):
+    workers: int
+    pending: int
+    max_pending: int
+    completed_total: int
+    rejected_total: int
+
+
+class BinaryListenerStats(BaseModel):
+    enabled: bool
+    frames_received: int
+    frames_rejected: int
+    malformed_messages: int
+    failed_messages: int
+    udp_datagrams_dropped: int
+
+
+class MetricsPartitionStats(BaseModel):
+    enabled: bool
+    interval: str
+    partitions: int
+    created_total: int
+    dropped_total: int
+    last_run_at: datetime | None
+
+
+class ColdStorageStats(BaseModel):
+    enabled: bool
+    files: int
+    bytes: int
+    exported_rows_total: int
+    exported_files_total: int
+    pruned_periods_total: int
+
+
+class MetricChunkStats(BaseModel):
+    enabled: bool
+    open_chunks: int
+    unsaved_closed_chunks: int
+    appended_total: int
+    persisted_chunks_total: int
+    persisted_bytes_total: int
+    bytes_per_reading: float | None
+    rejected_chunks_total: int
+    failed_persists: int
+
+
+class RecentReadingsStats(BaseModel):
+    sensors: int
+    max_sensors: int
+    capacity: int
+    allocated_sensors: int
+    bytes_per_sensor: int
+    memory_bytes: int
+    untracked_total: int
+
+
+class AnomalyDetectorStats(BaseModel):
+    flagged_total: int
+
+
+class AdmissionStats(BaseModel):
+    in_flight: int
+    max_in_flight: int
+    tracked_devices: int
+    tracked_sensors: int
+    rate_limited_total: int
+    shed_total: int
+
+
+class SequenceTrackerStats(BaseModel):
+    sensors: int
+    max_sensors: int
+    duplicates_total: int
+    resets_total: int
+
+
+class LatenessStats(BaseModel):
+    reorder_window_seconds: float
+    observed_total: int
+    late_total: int
+    clamped_total: int
+    expired_total: int
+    max_lateness_seconds: float
+    histogram: dict[str, int]
+
+
+class DeviceRevocationStats(BaseModel):
+    rotated_devices: int
+    disabled_devices: int
+    refreshed_at: datetime | None
+    rejected_total: int
+
+
+class IngestionStatsResponse(BaseModel):
+    metrics_buffer: MetricsBufferStats
+    topology_cache: TopologyCacheStats
+    binary_listener: BinaryListenerStats
+    metrics_partitions: MetricsPartitionStats
+    cold_storage: ColdStorageStats
+    metric_chunks: MetricChunkStats
+    recent_readings: RecentReadingsStats
+    anomaly_detector: AnomalyDetectorStats
+    admission: AdmissionStats
+    sequences: SequenceTrackerStats
+    lateness: LatenessStats
+    device_revocations: DeviceRevocationStats
+
+
+class AuthStatsResponse(BaseModel):
+    principal_cache: PrincipalCacheStats
+    token_cache: TokenCacheStats
+    token_revocations: TokenRevocationStats
+    password_pool: PasswordPoolStats
@@ -98,6 +98,12 @@ class BusinessDeviceCreateRequest(BaseModel):
     )
 
 
+class BusinessDeviceCredentialResponse(BaseModel):
+    device_id: int
+    credential_version: int
+    token: str = Field(..., description="Передається пристроєм у заголовку X-Device-Token")
+
+
 class BusinessDeviceCreateResponse(BaseModel):
     id: int
     building_id: int
@@ -157,6 +163,9 @@ class BusinessIncidentResponse(BaseModel):
     severity: str
     status: str
     description: str | None
+    occurrence_count: int = 1
+    last_seen_at: datetime | None = None
+    peak_value: float | None = None
 
     class Config:
         orm_mode = True
@@ -173,6 +182,53 @@ class BusinessIncidentAcknowledgeResponse(BaseModel):
 
 
 
+class SensorMetricBucket(BaseModel):
+    bucket_start: datetime
+    count: int
+    min: float
+    max: float
+    avg: float
+
+
+class SensorMetricStatsResponse(BaseModel):
+    sensor_id: int
+    resolution: str
+    count: int
+    min: float | None
+    max: float | None
+    avg: float | None
+    buckets: list[SensorMetricBucket]
+
+
+
+class SensorMetricPoint(BaseModel):
+    recorded_at: datetime
+    value: float
+
+
+class SensorMetricHistoryResponse(BaseModel):
+    sensor_id: int
+    total_points: int
+    points: list[SensorMetricPoint]
+
+
+
+class SensorWindowStats(BaseModel):
+    seconds: float
+    count: int
+    min: float | None
+    max: float | None
+    avg: float | None
+
+
+class SensorRecentReadingsResponse(BaseModel):
+    sensor_id: int
+    latest: SensorMetricPoint | None
+    points: list[SensorMetricPoint]
+    window: SensorWindowStats
+
+
+
 class BusinessValveResponse(BaseModel):
     device_id: int
     valve_number: int
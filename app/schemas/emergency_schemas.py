@@ -20,6 +20,9 @@ class EmergencyIncidentResponse(BaseModel):
     severity: str
     status: str
     description: str | None
+    occurrence_count: int = 1
+    last_seen_at: datetime | None = None
+    peak_value: float | None = None
 
     class Config:
         from_attributes = True
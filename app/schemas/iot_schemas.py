@@ -1,8 +1,19 @@
 # app/schemas/iot_schemas.py
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, Field
 
 class SensorDataCreateRequest(BaseModel):
     value: float
+    timestamp: datetime | None = Field(
+        default=None,
+        description="Час вимірювання на пристрої; без нього береться час сервера"
+    )
+    seq: int | None = Field(
+        default=None,
+        ge=0,
+        description="Послідовний номер показання на пристрої; повтор із тим самим seq ігнорується"
+    )
 
 
 class SensorDataResponse(BaseModel):
@@ -10,3 +21,27 @@ class SensorDataResponse(BaseModel):
     value: float
     severity: str
     incident_created: bool
+    duplicate: bool = False
+    late: bool = False
+    expired: bool = False
+
+
+class SensorReadingBatchItem(BaseModel):
+    sensor_id: int
+    value: float
+    timestamp: datetime | None = None
+    seq: int | None = Field(default=None, ge=0)
+
+
+class SensorReadingBatchResponse(BaseModel):
+    accepted: int
+    duplicates: int = 0
+    late: int = 0
+    expired: int = 0
+    incidents_created: int
+    results: list[SensorDataResponse]
+
+
+class SensorStreamAck(BaseModel):
+    results: list[SensorDataResponse] = []
+    error: str | None = None
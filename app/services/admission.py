@@ -0,0 +1,136 @@
+"""
+Контроль допуску для IoT-ендпоінтів: token bucket на пристрій і на сенсор
+та глобальна межа одночасних запитів інжесту.
+
+Відро сенсора має ключ (device_id, sensor_id): токени списуються до
+перевірки, що сенсор належить пристрою, тож чужий пристрій, надсилаючи
+той самий sensor_id, витрачає лише власне відро.
+
+Перевірки виконуються в памʼяті до відкриття сесії БД: пристрій, що
+перезавантажується по колу, отримує швидкий 429 з Retry-After, а при
+перевантаженні зайві запити відкидаються 503 замість черги за пулом зʼєднань.
+"""
+import time
+from collections import Counter
+from collections.abc import Hashable
+
+from app.core.config import settings
+
+
+class TokenBuckets:
+    """
+    Набір token bucket за ключем: rate токенів за секунду, ємність burst.
+    Кількість ключів обмежена max_keys — найдавніше створені відкидаються.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: dict[Hashable, list[float]] = {}
+
+    def _refill(self, key: Hashable, now: float) -> list[float]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                del self._buckets[next(iter(self._buckets))]
+            bucket = self._buckets[key] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def retry_after(self, key: Hashable, cost: float, now: float) -> float:
+        """0, якщо запит вартістю cost допустимий, інакше — секунди очікування."""
+        tokens = self._refill(key, now)[0]
+        # Пакет, більший за burst, пропускається з повного відра і йде в борг
+        needed = min(cost, self.burst)
+        if tokens >= needed:
+            return 0.0
+        return (needed - tokens) / self.rate
+
+    def consume(self, key: Hashable, cost: float):
+        self._buckets[key][0] -= cost
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.2f}s")
+
+
+class Overloaded(Exception):
+    pass
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        device_rate: float,
+        device_burst: float,
+        sensor_rate: float,
+        sensor_burst: float,
+        max_in_flight: int,
+        max_keys: int
+    ):
+        self.devices = TokenBuckets(device_rate, device_burst, max_keys)
+        self.sensors = TokenBuckets(sensor_rate, sensor_burst, max_keys)
+        self.max_in_flight = max_in_flight
+
+        self.in_flight = 0
+        self.rate_limited_total = 0
+        self.shed_total = 0
+
+    def admit(self, sensor_ids: list[int], device_ids: list[int]):
+        """
+        Списати токени за показання або підняти RateLimited.
+        Спершу перевіряються всі відра, тож відхилений запит нічого не списує.
+        """
+        now = time.monotonic()
+        sensor_costs = Counter(zip(device_ids, sensor_ids))
+        device_costs = Counter(device_ids)
+
+        retry_after = max(
+            [self.sensors.retry_after(key, cost, now) for key, cost in sensor_costs.items()]
+            + [self.devices.retry_after(key, cost, now) for key, cost in device_costs.items()]
+        )
+        if retry_after > 0:
+            self.rate_limited_total += 1
+            raise RateLimited(retry_after)
+
+        for key, cost in sensor_costs.items():
+            self.sensors.consume(key, cost)
+        for key, cost in device_costs.items():
+            self.devices.consume(key, cost)
+
+    def enter(self):
+        if self.in_flight >= self.max_in_flight:
+            self.shed_total += 1
+            raise Overloaded("Too many ingestion requests in flight")
+        self.in_flight += 1
+
+    def leave(self):
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "tracked_devices": len(self.devices),
+            "tracked_sensors": len(self.sensors),
+            "rate_limited_total": self.rate_limited_total,
+            "shed_total": self.shed_total
+        }
+
+
+admission = AdmissionController(
+    device_rate=settings.IOT_DEVICE_RATE,
+    device_burst=settings.IOT_DEVICE_BURST,
+    sensor_rate=settings.IOT_SENSOR_RATE,
+    sensor_burst=settings.IOT_SENSOR_BURST,
+    max_in_flight=settings.IOT_MAX_IN_FLIGHT,
+    max_keys=settings.IOT_RATE_LIMIT_MAX_KEYS
+)
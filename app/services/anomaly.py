@@ -0,0 +1,163 @@
+"""
+Потоковий детектор раннього попередження для показників нижче порогів.
+
+Для кожного сенсора зберігаються EWMA-середнє і EWMA-дисперсія (у слотах
+кільцевих буферів recent_readings), а нахил рахується лінійною регресією
+по показаннях за останні ANOMALY_SLOPE_WINDOW_SECONDS. Показання отримує
+severity "early_warning", якщо:
+
+  * z-оцінка відносно EWMA перевищує ANOMALY_Z_THRESHOLD (різкий стрибок), або
+  * за поточного нахилу значення досягне threshold_warning протягом
+    ANOMALY_HORIZON_SECONDS (швидке зростання), а найновіше показання
+    продовжує тренд — вище середнього по вікну.
+
+Пакет обробляється векторно: EWMA оновлюється «раундами» — у раунді k
+обробляється k-те показання кожного сенсора, тож усі сенсори пакета
+рахуються одними операціями NumPy.
+"""
+import numpy as np
+
+from app.core.config import settings
+from app.services.recent_readings import RecentReadings, recent_readings
+
+
+class AnomalyDetector:
+    def __init__(
+        self,
+        readings: RecentReadings,
+        alpha: float,
+        z_threshold: float,
+        warmup: int,
+        min_stddev_ratio: float,
+        slope_window: float,
+        slope_min_points: int,
+        horizon: float
+    ):
+        self.readings = readings
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.min_stddev_ratio = min_stddev_ratio
+        self.slope_window = slope_window
+        self.slope_min_points = slope_min_points
+        self.horizon = horizon
+
+        self._owner = np.full(0, -1, dtype=np.int64)
+        self._mean = np.zeros(0, dtype=np.float64)
+        self._var = np.zeros(0, dtype=np.float64)
+        self._seen = np.zeros(0, dtype=np.int32)
+
+        self.flagged_total = 0
+
+    def _ensure_capacity(self):
+        extra = self.readings.allocated_sensors - len(self._owner)
+        if extra > 0:
+            self._owner = np.concatenate([self._owner, np.full(extra, -1, dtype=np.int64)])
+            self._mean = np.concatenate([self._mean, np.zeros(extra)])
+            self._var = np.concatenate([self._var, np.zeros(extra)])
+            self._seen = np.concatenate([self._seen, np.zeros(extra, dtype=np.int32)])
+
+    def _update_ewma(self, slots, values, thresholds, rank) -> np.ndarray:
+        flags = np.zeros(len(slots), dtype=bool)
+
+        for step in range(int(rank.max()) + 1):
+            # У межах раунду кожен сенсор трапляється не більше одного разу
+            index = np.flatnonzero(rank == step)
+            slot, x = slots[index], values[index]
+            mean, var, seen = self._mean[slot], self._var[slot], self._seen[slot]
+
+            # Нижня межа σ не дає сталому сигналу спрацьовувати на найменший шум
+            stddev = np.maximum(np.sqrt(var), thresholds[index] * self.min_stddev_ratio)
+            flags[index] = (seen >= self.warmup) & ((x - mean) / stddev >= self.z_threshold)
+
+            diff = x - mean
+            increment = self.alpha * diff
+            first = seen == 0
+            self._mean[slot] = np.where(first, x, mean + increment)
+            self._var[slot] = np.where(first, 0.0, (1 - self.alpha) * (var + diff * increment))
+            self._seen[slot] = seen + 1
+
+        return flags
+
+    def _rising(self, slots, latest, thresholds) -> np.ndarray:
+        times, values, filled = self.readings.rows(slots)
+
+        # Час відносно найновішого показання, щоб не втрачати точність епох-секунд
+        newest = np.where(filled, times, -np.inf).max(axis=1)
+        times = times - newest[:, None]
+        window = filled & (times >= -self.slope_window)
+
+        count = window.sum(axis=1)
+        safe = np.maximum(count, 1)
+        mean_t = np.where(window, times, 0).sum(axis=1) / safe
+        mean_v = np.where(window, values, 0).sum(axis=1) / safe
+        dt = np.where(window, times - mean_t[:, None], 0)
+        dv = np.where(window, values - mean_v[:, None], 0)
+        spread = (dt * dt).sum(axis=1)
+        slope = np.divide((dt * dv).sum(axis=1), spread, out=np.zeros_like(spread), where=spread > 0)
+
+        # При справжньому зростанні найновіше показання вище середнього по
+        # вікну; сенсор, що повертається до норми після сплеску, — нижче
+        return (
+            (count >= self.slope_min_points)
+            & (slope > 0)
+            & (latest > mean_v)
+            & (latest + slope * self.horizon >= thresholds)
+        )
+
+    def evaluate(self, sensor_ids: list[int], values: list[float], thresholds: list[float]) -> np.ndarray:
+        """
+        Прапорці early warning для пакета показань у порядку надходження.
+        Викликається після recent_readings.extend для того самого пакета.
+        """
+        flags = np.zeros(len(sensor_ids), dtype=bool)
+        if not sensor_ids:
+            return flags
+
+        self._ensure_capacity()
+        ids = np.asarray(sensor_ids, dtype=np.int64)
+        slots = self.readings.slots_of(sensor_ids)
+        values = np.asarray(values, dtype=np.float64)
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+
+        tracked = np.flatnonzero(slots >= 0)
+        if not len(tracked):
+            return flags
+        ids, slots, values, thresholds = ids[tracked], slots[tracked], values[tracked], thresholds[tracked]
+
+        # Слот міг перейти до іншого сенсора після discard — стан починається заново
+        reused = self._owner[slots] != ids
+        self._owner[slots[reused]] = ids[reused]
+        self._seen[slots[reused]] = 0
+
+        order = np.argsort(slots, kind="stable")
+        unique, first, counts = np.unique(slots[order], return_index=True, return_counts=True)
+        rank = np.empty(len(slots), dtype=np.int64)
+        rank[order] = np.arange(len(slots)) - np.repeat(first, counts)
+
+        tracked_flags = self._update_ewma(slots, values, thresholds, rank)
+
+        # Нахил оцінюється раз на сенсор і позначає його останнє показання в пакеті
+        last = order[first + counts - 1]
+        tracked_flags[last] |= self._rising(unique, values[last], thresholds[last])
+
+        flags[tracked] = tracked_flags
+        self.flagged_total += int(flags.sum())
+        return flags
+
+    def stats(self) -> dict:
+        return {
+            "flagged_total": self.flagged_total
+        }
+
+
+anomaly_detector = AnomalyDetector(
+    readings=recent_readings,
+    alpha=settings.ANOMALY_EWMA_ALPHA,
+    z_threshold=settings.ANOMALY_Z_THRESHOLD,
+    warmup=settings.ANOMALY_WARMUP_READINGS,
+    min_stddev_ratio=settings.ANOMALY_MIN_STDDEV_RATIO,
+    slope_window=settings.ANOMALY_SLOPE_WINDOW_SECONDS,
+    slope_min_points=settings.ANOMALY_SLOPE_MIN_POINTS,
+    horizon=settings.ANOMALY_HORIZON_SECONDS
+)
@@ -0,0 +1,257 @@
+"""
+Бінарний канал прийому показників для обмежених сенсорів (UDP і TCP).
+
+Кадр має фіксований формат (network byte order, 57 байт):
+
+    B    версія кадру (2)
+    16s  серійний номер пристрою, доповнений нулями
+    I    sensor_id
+    Q    час вимірювання, мс від Unix epoch (0 — час сервера)
+    f    значення (float32)
+    I    послідовний номер показання для відсікання повторів
+    I    версія облікових даних пристрою (credential_version токена)
+    16s  перші 16 байт HMAC-SHA256 від усіх попередніх байтів кадру ключем
+         пристрою — байтами signature з його токена (app/core/device_tokens.py)
+
+Версія 1 (без seq) не приймається: її підписаний кадр можна було б
+повторювати без обмежень. Кадр без чинного підпису, зі старою версією облікових даних або з
+серійним номером, що не збігається з пристроєм сенсора, відхиляється.
+
+Усі кадри одного повідомлення мають однакову версію.
+UDP: датаграма — один або кілька кадрів підряд.
+TCP: повідомлення — 2-байтна довжина (H) і кадри; у відповідь приходить
+така сама довжина і по одному байту severity на кадр.
+
+Коди severity: 0 — normal, 1 — warning, 2 — critical, 3 — early_warning,
+4 — повтор уже прийнятого кадру, 5 — кадр старший за період зберігання,
+255 — кадр відхилено.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import struct
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.device_tokens import frame_key
+from app.db.database import SessionLocal
+from app.services.device_revocations import device_revocations
+from app.services.ingestion import DisabledSensorsError, Reading, UnknownSensorsError, ingest_readings
+from app.services.metrics_buffer import metrics_buffer
+from app.services.topology_cache import sensor_topology
+
+logger = logging.getLogger(__name__)
+
+FRAMES = {
+    2: struct.Struct("!B16sIQfII16s"),
+}
+TAG_SIZE = 16
+LENGTH_PREFIX = struct.Struct("!H")
+
+SEVERITY_CODES = {"normal": 0, "warning": 1, "critical": 2, "early_warning": 3}
+DUPLICATE = 4
+EXPIRED = 5
+REJECTED = 0xFF
+
+
+def decode_frames(payload: bytes) -> list[tuple]:
+    """
+    Кадри повідомлення як (version, serial, sensor_id, timestamp_ms, value,
+    seq, credential_version, tag, signed), де signed — байти під підписом.
+    """
+    if not payload or payload[0] not in FRAMES:
+        raise ValueError("Unknown frame version")
+
+    frame = FRAMES[payload[0]]
+    if len(payload) % frame.size:
+        raise ValueError(f"Payload length {len(payload)} is not a multiple of {frame.size}")
+
+    return [
+        (*fields, payload[offset:offset + frame.size - TAG_SIZE])
+        for offset, fields in zip(range(0, len(payload), frame.size), frame.iter_unpack(payload))
+    ]
+
+
+def frame_tag(key: bytes, signed: bytes) -> bytes:
+    return hmac.new(key, signed, hashlib.sha256).digest()[:TAG_SIZE]
+
+
+def frame_timestamp(timestamp_ms: int) -> datetime | None:
+    if not timestamp_ms:
+        return None
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+
+class BinaryListener:
+    def __init__(self, host: str, udp_port: int, tcp_port: int, udp_max_in_flight: int):
+        self.host = host
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self.udp_max_in_flight = udp_max_in_flight
+
+        self._udp_transport = None
+        self._tcp_server = None
+        self._udp_tasks = set()
+
+        self.frames_received = 0
+        self.frames_rejected = 0
+        self.malformed_messages = 0
+        self.failed_messages = 0
+        self.udp_datagrams_dropped = 0
+
+    async def process_payload(self, payload: bytes) -> bytes:
+        """Обробити кадри одного повідомлення. Повертає байти severity."""
+        frames = decode_frames(payload)
+        self.frames_received += len(frames)
+
+        async with SessionLocal() as db:
+            sensors = await sensor_topology.get_many(db, {f[2] for f in frames})
+
+            codes = bytearray([REJECTED]) * len(frames)
+            accepted = []
+            readings = []
+            keys = {}
+
+            for index, frame in enumerate(frames):
+                version, serial, sensor_id, timestamp_ms, value, seq, credential_version, tag, signed = frame
+                sensor = sensors.get(sensor_id)
+                # Серійний номер у кадрі має збігатися з пристроєм сенсора
+                if (
+                    sensor is None
+                    or not sensor.device_active
+                    or sensor.business_blocked
+                    or serial.rstrip(b"\0").decode("ascii", "replace") != sensor.serial_number
+                    or device_revocations.is_revoked(sensor.device_id, credential_version)
+                ):
+                    continue
+
+                key_id = (sensor.device_id, credential_version)
+                if key_id not in keys:
+                    keys[key_id] = frame_key(*key_id)
+                if not hmac.compare_digest(tag, frame_tag(keys[key_id], signed)):
+                    continue
+                accepted.append(index)
+                readings.append(Reading(sensor_id, value, frame_timestamp(timestamp_ms), seq))
+
+            if readings:
+                try:
+                    results = await ingest_readings(db, readings)
+                except (UnknownSensorsError, DisabledSensorsError):
+                    # Топологію змінили між перевіркою і записом
+                    results = []
+                    accepted = []
+
+                for index, result in zip(accepted, results):
+                    if result.duplicate:
+                        codes[index] = DUPLICATE
+                    elif result.expired:
+                        codes[index] = EXPIRED
+                    else:
+                        codes[index] = SEVERITY_CODES[result.severity]
+
+        self.frames_rejected += codes.count(REJECTED)
+        return bytes(codes)
+
+    async def handle_tcp_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header = await reader.readexactly(LENGTH_PREFIX.size)
+                (length,) = LENGTH_PREFIX.unpack(header)
+                payload = await reader.readexactly(length)
+
+                try:
+                    codes = await self.process_payload(payload)
+                except ValueError:
+                    self.malformed_messages += 1
+                    break
+
+                writer.write(LENGTH_PREFIX.pack(len(codes)) + codes)
+                await writer.drain()
+
+                # Backpressure: не читати наступне повідомлення, доки буфер переповнений
+                await metrics_buffer.wait_for_capacity()
+
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception:
+            self.failed_messages += 1
+            logger.exception("Binary TCP client failed")
+        finally:
+            writer.close()
+
+    def handle_datagram(self, payload: bytes, addr, transport):
+        if len(self._udp_tasks) >= self.udp_max_in_flight:
+            self.udp_datagrams_dropped += 1
+            return
+
+        async def process():
+            try:
+                codes = await self.process_payload(payload)
+            except ValueError:
+                self.malformed_messages += 1
+                return
+            except Exception:
+                self.failed_messages += 1
+                logger.exception("Binary UDP datagram from %s failed", addr)
+                return
+            transport.sendto(codes, addr)
+
+        task = asyncio.create_task(process())
+        self._udp_tasks.add(task)
+        task.add_done_callback(self._udp_tasks.discard)
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        listener = self
+
+        class UdpProtocol(asyncio.DatagramProtocol):
+            def connection_made(self, transport):
+                self.transport = transport
+
+            def datagram_received(self, data, addr):
+                listener.handle_datagram(data, addr, self.transport)
+
+        self._udp_transport, _ = await loop.create_datagram_endpoint(
+            UdpProtocol,
+            local_addr=(self.host, self.udp_port)
+        )
+        self._tcp_server = await asyncio.start_server(
+            self.handle_tcp_client,
+            self.host,
+            self.tcp_port
+        )
+        logger.info(
+            "Binary ingestion listening on udp/%d and tcp/%d",
+            self.udp_port,
+            self.tcp_port
+        )
+
+    async def stop(self):
+        if self._tcp_server:
+            self._tcp_server.close()
+            await self._tcp_server.wait_closed()
+            self._tcp_server = None
+        if self._udp_transport:
+            self._udp_transport.close()
+            self._udp_transport = None
+        if self._udp_tasks:
+            await asyncio.gather(*self._udp_tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._tcp_server is not None,
+            "frames_received": self.frames_received,
+            "frames_rejected": self.frames_rejected,
+            "malformed_messages": self.malformed_messages,
+            "failed_messages": self.failed_messages,
+            "udp_datagrams_dropped": self.udp_datagrams_dropped
+        }
+
+
+binary_listener = BinaryListener(
+    host=settings.BINARY_LISTENER_HOST,
+    udp_port=settings.BINARY_UDP_PORT,
+    tcp_port=settings.BINARY_TCP_PORT,
+    udp_max_in_flight=settings.BINARY_UDP_MAX_IN_FLIGHT
+)
@@ -0,0 +1,296 @@
+"""
+Режим зберігання показників фрагментами (METRICS_STORAGE_MODE = "chunks").
+
+Замість рядка на показання кожен сенсор має відкритий фрагмент у памʼяті за
+поточний інтервал METRICS_CHUNK_SECONDS, стиснений кодеком Gorilla
+(app/services/gorilla.py). Фрагменти зберігаються в sensor_metric_chunks
+як bytea — один рядок на сенсор за інтервал, тож читання діапазону — кілька
+рядків замість тисяч.
+
+Запис:
+  * write-behind буфер передає показання в append() після коміту rollups;
+  * змінені фрагменти зберігаються upsert-ом не частіше ніж раз на
+    METRICS_CHUNK_PERSIST_SECONDS (і при зупинці) — компроміс між
+    перезаписом bytea і вікном втрати при аварійному завершенні процесу;
+  * фрагмент, чий інтервал скінчився понад INGEST_REORDER_WINDOW_SECONDS
+    тому, після збереження вивантажується з памʼяті; запізніле показання
+    для нього відкриває окремий фрагмент того самого інтервалу.
+
+Кожен відкритий фрагмент має власний chunk_id, тому кілька воркерів і
+запізнілі показання пишуть різні рядки, а читання обʼєднує їх.
+Мітки часу зберігаються з точністю до мілісекунди.
+"""
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db import models
+from app.services.gorilla import ChunkEncoder, decode, float_bits
+from app.services.recent_readings import EPOCH
+
+logger = logging.getLogger(__name__)
+
+EVICT_CHECK_SECONDS = 60.0
+
+
+def to_ms(moment: datetime) -> int:
+    return (moment - EPOCH) // timedelta(milliseconds=1)
+
+
+def from_ms(ms: int) -> datetime:
+    return EPOCH + timedelta(milliseconds=ms)
+
+
+@dataclass(slots=True)
+class OpenChunk:
+    sensor_id: int
+    start_ms: int
+    chunk_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    encoder: ChunkEncoder = field(default_factory=ChunkEncoder)
+    first_ms: int = 0
+    last_ms: int = 0
+    persisted_count: int = 0
+
+    def append(self, ms: int, bits: int):
+        if not self.encoder.count:
+            self.first_ms = self.last_ms = ms
+        self.first_ms = min(self.first_ms, ms)
+        self.last_ms = max(self.last_ms, ms)
+        self.encoder.append(ms, bits)
+
+    @property
+    def dirty(self) -> bool:
+        return self.encoder.count > self.persisted_count
+
+
+class ChunkStore:
+    def __init__(self, mode: str, chunk_seconds: int, persist_interval: float, evict_after: float, retention_days: int):
+        if mode not in ("rows", "chunks"):
+            raise ValueError(f"Unsupported metrics storage mode: {mode}")
+
+        self.enabled = mode == "chunks"
+        self.chunk_ms = chunk_seconds * 1000
+        self.persist_interval = persist_interval
+        self.evict_after_ms = int(evict_after * 1000)
+        self.retention_days = retention_days
+
+        self._open: dict[int, OpenChunk] = {}
+        # Фрагменти, що вже не приймають показань, але ще не збережені
+        self._closed: dict[tuple[int, int], OpenChunk] = {}
+
+        self._last_persist = time.monotonic()
+        self._last_evict = time.monotonic()
+
+        self.appended_total = 0
+        self.persisted_chunks_total = 0
+        self.persisted_bytes_total = 0
+        self.persisted_points_total = 0
+        self.rejected_chunks_total = 0
+        self.failed_persists = 0
+
+    def append(self, rows: list[dict]):
+        """Додати показання (рядки write-behind буфера) у відкриті фрагменти."""
+        for row, bits in zip(rows, float_bits([row["value"] for row in rows])):
+            sensor_id = row["sensor_id"]
+            ms = to_ms(row["recorded_at"])
+            start_ms = ms - ms % self.chunk_ms
+
+            chunk = self._open.get(sensor_id)
+            if chunk is None or chunk.start_ms < start_ms:
+                if chunk is not None and chunk.dirty:
+                    self._closed[(sensor_id, chunk.start_ms)] = chunk
+                chunk = self._open[sensor_id] = OpenChunk(sensor_id, start_ms)
+            elif chunk.start_ms > start_ms:
+                # Запізніле показання для інтервалу, що вже закрито
+                chunk = self._closed.get((sensor_id, start_ms))
+                if chunk is None:
+                    chunk = self._closed[(sensor_id, start_ms)] = OpenChunk(sensor_id, start_ms)
+
+            chunk.append(ms, bits)
+
+        self.appended_total += len(rows)
+
+    def persist_due(self) -> bool:
+        return time.monotonic() - self._last_persist >= self.persist_interval
+
+    def _snapshot(self, chunk: OpenChunk) -> dict:
+        return {
+            "sensor_id": chunk.sensor_id,
+            "chunk_start": from_ms(chunk.start_ms),
+            "chunk_id": chunk.chunk_id,
+            "first_at": from_ms(chunk.first_ms),
+            "last_at": from_ms(chunk.last_ms),
+            "value_count": chunk.encoder.count,
+            "data": chunk.encoder.getvalue()
+        }
+
+    async def _save(self, chunks: list[OpenChunk]):
+        snapshots = [self._snapshot(c) for c in chunks]
+        statement = pg_insert(models.SensorMetricChunk)
+
+        async with SessionLocal() as db:
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["sensor_id", "chunk_start", "chunk_id"],
+                    set_={
+                        "first_at": statement.excluded.first_at,
+                        "last_at": statement.excluded.last_at,
+                        "value_count": statement.excluded.value_count,
+                        "data": statement.excluded.data
+                    }
+                ),
+                snapshots
+            )
+            await db.commit()
+
+        self.persisted(chunks, snapshots)
+
+    async def persist(self):
+        """
+        Upsert усіх змінених фрагментів. Якщо пакет порушує обмеження БД
+        (фрагмент щойно видаленого сенсора), фрагменти зберігаються поодинці,
+        а відхилені відкидаються, щоб не блокувати решту.
+        """
+        chunks = [c for c in self._open.values() if c.dirty] + list(self._closed.values())
+        if not chunks:
+            self._last_persist = time.monotonic()
+            return
+
+        try:
+            await self._save(chunks)
+            return
+        except IntegrityError:
+            pass
+
+        for chunk in chunks:
+            try:
+                await self._save([chunk])
+            except IntegrityError:
+                self.rejected_chunks_total += 1
+                self._drop(chunk)
+                logger.warning(
+                    "Dropped metric chunk of sensor %d violating a constraint",
+                    chunk.sensor_id,
+                    exc_info=True
+                )
+
+    def _drop(self, chunk: OpenChunk):
+        if self._open.get(chunk.sensor_id) is chunk:
+            del self._open[chunk.sensor_id]
+        if self._closed.get((chunk.sensor_id, chunk.start_ms)) is chunk:
+            del self._closed[(chunk.sensor_id, chunk.start_ms)]
+
+    def discard_sensors(self, sensor_ids):
+        """Прибрати з памʼяті фрагменти видалених сенсорів."""
+        sensor_ids = set(sensor_ids)
+        for sensor_id in sensor_ids:
+            self._open.pop(sensor_id, None)
+        for key in [key for key in self._closed if key[0] in sensor_ids]:
+            del self._closed[key]
+
+    def persisted(self, chunks: list[OpenChunk], snapshots: list[dict]):
+        """Позначити збережений стан після успішного коміту."""
+        for chunk, snapshot in zip(chunks, snapshots):
+            chunk.persisted_count = snapshot["value_count"]
+            if self._closed.get((chunk.sensor_id, chunk.start_ms)) is chunk and not chunk.dirty:
+                del self._closed[(chunk.sensor_id, chunk.start_ms)]
+
+        self.persisted_chunks_total += len(snapshots)
+        self.persisted_bytes_total += sum(len(s["data"]) for s in snapshots)
+        self.persisted_points_total += sum(s["value_count"] for s in snapshots)
+        self._last_persist = time.monotonic()
+
+        if time.monotonic() - self._last_evict >= EVICT_CHECK_SECONDS:
+            self._evict()
+
+    def _evict(self):
+        now_ms = to_ms(datetime.utcnow())
+        stale = [
+            sensor_id
+            for sensor_id, chunk in self._open.items()
+            if not chunk.dirty and chunk.start_ms + self.chunk_ms + self.evict_after_ms < now_ms
+        ]
+        for sensor_id in stale:
+            del self._open[sensor_id]
+        self._last_evict = time.monotonic()
+
+    async def read(self, db: AsyncSession, sensor_id: int, start: datetime, end: datetime) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Показання сенсора за [start, end): (секунди epoch, значення), за часом.
+        Незбережені фрагменти цього процесу беруться з памʼяті.
+        """
+        chunk = models.SensorMetricChunk
+        rows = (await db.execute(
+            select(chunk.chunk_id, chunk.value_count, chunk.data)
+            .filter(
+                chunk.sensor_id == sensor_id,
+                chunk.chunk_start > start - timedelta(milliseconds=self.chunk_ms),
+                chunk.chunk_start < end,
+                chunk.last_at >= start,
+                chunk.first_at < end
+            )
+        )).all()
+
+        encoded = {row.chunk_id: (row.data, row.value_count) for row in rows}
+        start_ms, end_ms = to_ms(start), to_ms(end)
+        for c in [self._open.get(sensor_id), *self._closed.values()]:
+            if c is not None and c.sensor_id == sensor_id and c.last_ms >= start_ms and c.first_ms < end_ms:
+                encoded[c.chunk_id] = (c.encoder.getvalue(), c.encoder.count)
+
+        if not encoded:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+
+        times, values = zip(*(decode(data, count) for data, count in encoded.values()))
+        times, values = np.concatenate(times), np.concatenate(values)
+
+        keep = (times >= start_ms) & (times < end_ms)
+        times, values = times[keep], values[keep]
+        order = np.argsort(times, kind="stable")
+        return times[order] / 1000, values[order]
+
+    async def prune(self, now: datetime) -> int:
+        if not self.enabled or self.retention_days <= 0:
+            return 0
+
+        async with SessionLocal() as db:
+            result = await db.execute(
+                delete(models.SensorMetricChunk)
+                .filter(models.SensorMetricChunk.last_at < now - timedelta(days=self.retention_days))
+            )
+            await db.commit()
+        return result.rowcount
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "open_chunks": len(self._open),
+            "unsaved_closed_chunks": len(self._closed),
+            "appended_total": self.appended_total,
+            "persisted_chunks_total": self.persisted_chunks_total,
+            "persisted_bytes_total": self.persisted_bytes_total,
+            "bytes_per_reading": (
+                self.persisted_bytes_total / self.persisted_points_total
+                if self.persisted_points_total else None
+            ),
+            "rejected_chunks_total": self.rejected_chunks_total,
+            "failed_persists": self.failed_persists
+        }
+
+
+chunk_store = ChunkStore(
+    mode=settings.METRICS_STORAGE_MODE,
+    chunk_seconds=settings.METRICS_CHUNK_SECONDS,
+    persist_interval=settings.METRICS_CHUNK_PERSIST_SECONDS,
+    evict_after=settings.INGEST_REORDER_WINDOW_SECONDS,
+    retention_days=settings.METRICS_CHUNK_RETENTION_DAYS
+)
@@ -0,0 +1,276 @@
+"""
+Холодний рівень sensor_metrics: стиснені файли Arrow IPC на локальному диску.
+
+Коли COLD_STORAGE_ENABLED, секції, старші за METRICS_RETENTION_DAYS,
+перед видаленням вивантажуються у файли (app/services/partitions.py), і
+сирі показання зберігаються далі поза PostgreSQL. Розкладка:
+
+    {COLD_STORAGE_DIR}/{YYYYMMDD}/{lo:010d}-{hi:010d}.{джерело}.arrow
+
+— показання сенсорів [lo, hi) за один період секції (або день DEFAULT-секції).
+Файл містить record batch на сенсор (довгий ряд — кілька, по
+COLD_STORAGE_BATCH_ROWS), колонки recorded_at (timestamp[us], naive UTC)
+і value, стиснення COLD_STORAGE_COMPRESSION. У метаданих футера — JSON
+{sensor_id: [перший batch, кількість]}, тож читач відкриває файл через
+memory map і розпаковує лише батчі потрібного сенсора.
+
+Файл пишеться у *.tmp і перейменовується після закриття: повторний експорт
+тієї самої секції після збою перезаписує файл, а не дублює його.
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.database import engine
+from app.services.recent_readings import EPOCH
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = pa.schema([
+    ("recorded_at", pa.timestamp("us")),
+    ("value", pa.float64()),
+])
+
+# Найдовший інтервал секцій (week): файл періоду може містити показання до тижня
+MAX_PERIOD = timedelta(weeks=1)
+
+STREAM_ROWS = 50_000
+
+
+class _RangeFile:
+    def __init__(self, path: Path, index: dict, compression: str | None):
+        self.path = path
+        self.tmp = path.with_name(path.name + ".tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.sink = pa.OSFile(str(self.tmp), "wb")
+        self.writer = ipc.new_file(
+            self.sink,
+            SCHEMA,
+            options=ipc.IpcWriteOptions(compression=compression),
+            metadata={b"index": json.dumps(index).encode()}
+        )
+
+    def write(self, micros: np.ndarray, values: np.ndarray):
+        self.writer.write_batch(pa.record_batch(
+            [pa.array(micros, type=pa.int64()).cast(pa.timestamp("us")), pa.array(values)],
+            schema=SCHEMA
+        ))
+
+    def close(self):
+        self.writer.close()
+        self.sink.close()
+        os.replace(self.tmp, self.path)
+
+
+class ColdStorage:
+    def __init__(
+        self,
+        enabled: bool,
+        directory: str,
+        sensor_range: int,
+        batch_rows: int,
+        compression: str | None,
+        retention_days: int
+    ):
+        self.enabled = enabled
+        self.directory = Path(directory)
+        self.sensor_range = sensor_range
+        self.batch_rows = batch_rows
+        self.compression = compression or None
+        self.retention_days = retention_days
+
+        self.exported_rows_total = 0
+        self.exported_files_total = 0
+        self.pruned_periods_total = 0
+
+    def _path(self, period: datetime, lo: int, source: str) -> Path:
+        return self.directory / f"{period:%Y%m%d}" / f"{lo:010d}-{lo + self.sensor_range:010d}.{source}.arrow"
+
+    def _file_index(self, counts: list[tuple[int, int]]) -> dict[int, dict]:
+        """Індекси футера для кожного файлу: lo -> {sensor_id: [перший batch, кількість]}."""
+        indexes = {}
+        batches = {}
+        for sensor_id, count in counts:
+            lo = sensor_id // self.sensor_range * self.sensor_range
+            first = batches.get(lo, 0)
+            batches[lo] = first + -(-count // self.batch_rows)
+            indexes.setdefault(lo, {})[str(sensor_id)] = [first, batches[lo] - first]
+        return indexes
+
+    async def export(self, source: str, period: datetime, start: datetime, end: datetime, label: str | None = None) -> int:
+        """
+        Вивантажити рядки таблиці source за [start, end) у файли періоду period.
+        Повертає кількість вивантажених рядків.
+        """
+        label = label or source
+        where = "WHERE recorded_at >= :start AND recorded_at < :end"
+        params = {"start": start, "end": end}
+
+        async with engine.connect() as conn:
+            # Підрахунок і вибірка мають бачити той самий знімок таблиці
+            await conn.execution_options(isolation_level="REPEATABLE READ")
+            counts = (await conn.execute(
+                text(f'SELECT sensor_id, count(*) FROM "{source}" {where} GROUP BY sensor_id ORDER BY sensor_id'),
+                params
+            )).all()
+            if not counts:
+                return 0
+
+            indexes = self._file_index(counts)
+            remaining = iter(counts)
+            current_id, current_left = next(remaining)
+            current_file = current_lo = None
+
+            micros = np.empty(0, dtype=np.int64)
+            values = np.empty(0, dtype=np.float64)
+
+            result = await conn.stream(
+                text(
+                    "SELECT (extract(epoch FROM recorded_at) * 1000000)::bigint, value "
+                    f'FROM "{source}" {where} ORDER BY sensor_id, recorded_at'
+                ).execution_options(yield_per=STREAM_ROWS),
+                params
+            )
+
+            try:
+                async for rows in result.partitions(STREAM_ROWS):
+                    chunk_micros, chunk_values = zip(*rows)
+                    micros = np.concatenate([micros, np.array(chunk_micros, dtype=np.int64)])
+                    values = np.concatenate([values, np.array(chunk_values, dtype=np.float64)])
+
+                    # Батчі по batch_rows; неповний хвіст сенсора чекає наступних рядків
+                    while current_id is not None and len(micros):
+                        take = min(current_left, len(micros), self.batch_rows)
+                        if take < min(current_left, self.batch_rows):
+                            break
+
+                        lo = current_id // self.sensor_range * self.sensor_range
+                        if lo != current_lo:
+                            if current_file:
+                                await asyncio.to_thread(current_file.close)
+                                self.exported_files_total += 1
+                            current_file = _RangeFile(self._path(period, lo, label), indexes[lo], self.compression)
+                            current_lo = lo
+
+                        await asyncio.to_thread(current_file.write, micros[:take], values[:take])
+                        micros, values = micros[take:], values[take:]
+
+                        current_left -= take
+                        if not current_left:
+                            current_id, current_left = next(remaining, (None, 0))
+            except BaseException:
+                if current_file:
+                    current_file.writer.close()
+                    current_file.sink.close()
+                    current_file.tmp.unlink(missing_ok=True)
+                raise
+
+            if current_file:
+                await asyncio.to_thread(current_file.close)
+                self.exported_files_total += 1
+
+        exported = sum(count for _, count in counts)
+        self.exported_rows_total += exported
+        logger.info("Exported %d rows of %s to cold storage", exported, source)
+        return exported
+
+    def _files_for(self, sensor_id: int, start: datetime, end: datetime):
+        if not self.directory.is_dir():
+            return
+
+        for period_dir in sorted(self.directory.iterdir()):
+            try:
+                period = datetime.strptime(period_dir.name, "%Y%m%d")
+            except ValueError:
+                continue
+            if period >= end or period + MAX_PERIOD <= start:
+                continue
+
+            for path in period_dir.glob("*.arrow"):
+                lo, hi = map(int, path.name.split(".", 1)[0].split("-"))
+                if lo <= sensor_id < hi:
+                    yield path
+
+    def read(self, sensor_id: int, start: datetime, end: datetime) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Показання сенсора за [start, end) з холодного рівня: (секунди epoch, значення),
+        відсортовані за часом. Блокуючий виклик — з async-коду через threadpool.
+        """
+        start_us = int((start - EPOCH).total_seconds() * 1_000_000)
+        end_us = int((end - EPOCH).total_seconds() * 1_000_000)
+        times, values = [], []
+
+        for path in self._files_for(sensor_id, start, end):
+            with pa.memory_map(str(path)) as source:
+                reader = ipc.open_file(source)
+                entry = json.loads(reader.metadata[b"index"]).get(str(sensor_id))
+                if not entry:
+                    continue
+
+                first, count = entry
+                for i in range(first, first + count):
+                    batch = reader.get_batch(i)
+                    micros = batch.column(0).cast(pa.int64()).to_numpy()
+                    lo, hi = np.searchsorted(micros, [start_us, end_us])
+                    if lo < hi:
+                        # Копії: нестиснені буфери вказують у memory map, що закривається
+                        times.append(micros[lo:hi] / 1_000_000)
+                        values.append(np.array(batch.column(1).to_numpy()[lo:hi], dtype=np.float64))
+
+        if not times:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+
+        times, values = np.concatenate(times), np.concatenate(values)
+        order = np.argsort(times, kind="stable")
+        return times[order], values[order]
+
+    def prune(self, now: datetime) -> int:
+        """Видалити періоди, старші за COLD_STORAGE_RETENTION_DAYS (0 — зберігати завжди)."""
+        if self.retention_days <= 0 or not self.directory.is_dir():
+            return 0
+
+        cutoff = now - timedelta(days=self.retention_days)
+        pruned = 0
+        for period_dir in self.directory.iterdir():
+            try:
+                period = datetime.strptime(period_dir.name, "%Y%m%d")
+            except ValueError:
+                continue
+            if period + MAX_PERIOD <= cutoff:
+                shutil.rmtree(period_dir)
+                pruned += 1
+
+        self.pruned_periods_total += pruned
+        return pruned
+
+    def stats(self) -> dict:
+        files = list(self.directory.glob("*/*.arrow")) if self.directory.is_dir() else []
+        return {
+            "enabled": self.enabled,
+            "files": len(files),
+            "bytes": sum(path.stat().st_size for path in files),
+            "exported_rows_total": self.exported_rows_total,
+            "exported_files_total": self.exported_files_total,
+            "pruned_periods_total": self.pruned_periods_total
+        }
+
+
+cold_storage = ColdStorage(
+    enabled=settings.COLD_STORAGE_ENABLED,
+    directory=settings.COLD_STORAGE_DIR,
+    sensor_range=settings.COLD_STORAGE_SENSOR_RANGE,
+    batch_rows=settings.COLD_STORAGE_BATCH_ROWS,
+    compression=settings.COLD_STORAGE_COMPRESSION,
+    retention_days=settings.COLD_STORAGE_RETENTION_DAYS
+)
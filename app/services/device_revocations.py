@@ -0,0 +1,107 @@
+"""
+Знімок відкликаних облікових даних IoT-пристроїв у памʼяті процесу.
+
+Містить лише пристрої, що хоч раз проходили ротацію (credential_version > 1),
+і неактивні пристрої, тож лишається малим навіть за мільйонів пристроїв.
+Знімок повністю перечитується кожні DEVICE_REVOCATION_REFRESH_SECONDS, а
+ротація і видалення в цьому процесі застосовуються до нього одразу.
+
+Колонку credential_version у наявній таблиці iot_devices додає
+`python -m app.db.migrate`.
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import or_, select
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db import models
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceRevocations:
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+
+        # device_id -> найменша дійсна версія; неактивні пристрої відхиляються цілком
+        self._min_version: dict[int, int] = {}
+        self._disabled: set[int] = set()
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        self.refreshed_at = None
+        self.rejected_total = 0
+
+    def is_revoked(self, device_id: int, version: int) -> bool:
+        if device_id in self._disabled or version < self._min_version.get(device_id, 1):
+            self.rejected_total += 1
+            return True
+        return False
+
+    def rotate(self, device_id: int, version: int):
+        self._min_version[device_id] = max(version, self._min_version.get(device_id, 1))
+
+    def disable(self, device_id: int):
+        self._disabled.add(device_id)
+
+    async def refresh(self):
+        async with SessionLocal() as db:
+            rows = (await db.execute(
+                select(
+                    models.IoTDevice.id,
+                    models.IoTDevice.credential_version,
+                    models.IoTDevice.active
+                )
+                .filter(or_(
+                    models.IoTDevice.credential_version > 1,
+                    models.IoTDevice.active.is_(False)
+                ))
+            )).all()
+
+        self._min_version = {row.id: row.credential_version for row in rows if row.credential_version > 1}
+        self._disabled = {row.id for row in rows if not row.active}
+        self.refreshed_at = datetime.utcnow()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Device revocation refresh failed")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="device-revocations")
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "rotated_devices": len(self._min_version),
+            "disabled_devices": len(self._disabled),
+            "refreshed_at": self.refreshed_at,
+            "rejected_total": self.rejected_total
+        }
+
+
+device_revocations = DeviceRevocations(
+    refresh_interval=settings.DEVICE_REVOCATION_REFRESH_SECONDS
+)
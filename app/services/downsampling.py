@@ -0,0 +1,50 @@
+"""
+Проріджування часових рядів для графіків: Largest-Triangle-Three-Buckets.
+
+Ряд ділиться на points - 2 кошики; з кожного обирається точка, що утворює
+найбільший трикутник з попередньою обраною точкою і середнім наступного
+кошика. Середні всіх кошиків рахуються одразу через кумулятивні суми, а
+площі трикутників — векторно в межах кошика.
+"""
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Індекси не більше ніж points точок ряду (x має бути відсортований)."""
+    size = len(x)
+    if points >= size:
+        return np.arange(size)
+    if points < 3:
+        return np.array([0, size - 1][:points], dtype=np.int64)
+
+    # Площі не залежать від зсуву, а кумулятивні суми епох-секунд втрачали б точність
+    x = x - x[0]
+
+    # Межі points - 2 кошиків між першою і останньою точкою
+    edges = np.linspace(1, size - 1, points - 1).astype(np.int64)
+
+    # Середнє наступного кошика; для останнього — сама остання точка
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], size)
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    counts = next_end - next_start
+    avg_x = (sum_x[next_end] - sum_x[next_start]) / counts
+    avg_y = (sum_y[next_end] - sum_y[next_start]) / counts
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+
+    a = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs(
+            (ax - avg_x[bucket]) * (y[start:end] - ay)
+            - (ax - x[start:end]) * (avg_y[bucket] - ay)
+        )
+        a = start + int(area.argmax())
+        selected[bucket + 1] = a
+
+    return selected
@@ -0,0 +1,191 @@
+"""
+Стиснення часових рядів у стилі Gorilla (Pelkonen et al., VLDB 2015).
+
+Фрагмент — послідовність пар (мс epoch, float64):
+
+  * перша пара — 64 біти часу і 64 біти значення;
+  * час далі кодується різницею різниць (delta-of-delta):
+      0                     — '0'
+      [-64, 63]             — '10'   + 7 біт
+      [-256, 255]           — '110'  + 9 біт
+      [-2048, 2047]         — '1110' + 12 біт
+      інакше                — '1111' + 64 біти
+    тож рівномірний потік показань коштує 1 біт на мітку часу;
+  * значення — XOR із попереднім:
+      однакове              — '0'
+      у межах попереднього вікна значущих бітів — '10' + значущі біти
+      інакше                — '11' + 5 біт провідних нулів + 6 біт (довжина - 1) + біти.
+
+Порядок часу не обовʼязковий — від'ємні дельти лише займають більше бітів.
+Кількість пар зберігається окремо (value_count у sensor_metric_chunks).
+"""
+import numpy as np
+
+_MASK64 = (1 << 64) - 1
+
+# (ширина, префікс, довжина префікса) для delta-of-delta
+_DOD_BUCKETS = (
+    (7, 0b10, 2),
+    (9, 0b110, 3),
+    (12, 0b1110, 4),
+)
+
+
+def _signed(value: int, width: int) -> int:
+    return value - (1 << width) if value >> (width - 1) else value
+
+
+class BitWriter:
+    __slots__ = ("buffer", "acc", "bits")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.acc = 0
+        self.bits = 0
+
+    def write(self, value: int, width: int):
+        self.acc = (self.acc << width) | (value & ((1 << width) - 1))
+        self.bits += width
+        if self.bits >= 64:
+            spare = self.bits & 7
+            self.buffer += (self.acc >> spare).to_bytes(self.bits >> 3, "big")
+            self.acc &= (1 << spare) - 1
+            self.bits = spare
+
+    def getvalue(self) -> bytes:
+        pad = -self.bits & 7
+        return bytes(self.buffer) + (self.acc << pad).to_bytes((self.bits + pad) >> 3, "big")
+
+    def __len__(self) -> int:
+        return len(self.buffer) + ((self.bits + 7) >> 3)
+
+
+class BitReader:
+    __slots__ = ("data", "pos", "acc", "bits")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+        self.acc = 0
+        self.bits = 0
+
+    def read(self, width: int) -> int:
+        while self.bits < width:
+            word = self.data[self.pos:self.pos + 8]
+            self.acc = (self.acc << 64) | int.from_bytes(word.ljust(8, b"\0"), "big")
+            self.pos += 8
+            self.bits += 64
+        self.bits -= width
+        value = self.acc >> self.bits
+        self.acc &= (1 << self.bits) - 1
+        return value
+
+
+class ChunkEncoder:
+    __slots__ = ("writer", "count", "last_ms", "last_delta", "last_bits", "leading", "trailing")
+
+    def __init__(self):
+        self.writer = BitWriter()
+        self.count = 0
+        self.last_ms = 0
+        self.last_delta = 0
+        self.last_bits = 0
+        # Вікна значущих бітів ще немає
+        self.leading = 64
+        self.trailing = 64
+
+    def append(self, ms: int, bits: int):
+        """Додати пару; bits — float64 як uint64 (див. float_bits)."""
+        writer = self.writer
+
+        if not self.count:
+            writer.write(ms, 64)
+            writer.write(bits, 64)
+        else:
+            delta = ms - self.last_ms
+            dod = delta - self.last_delta
+            if dod == 0:
+                writer.write(0, 1)
+            else:
+                for width, prefix, prefix_width in _DOD_BUCKETS:
+                    if -(1 << (width - 1)) <= dod < 1 << (width - 1):
+                        writer.write(prefix, prefix_width)
+                        writer.write(dod, width)
+                        break
+                else:
+                    writer.write(0b1111, 4)
+                    writer.write(dod, 64)
+            self.last_delta = delta
+
+            xor = bits ^ self.last_bits
+            if not xor:
+                writer.write(0, 1)
+            else:
+                leading = min(64 - xor.bit_length(), 31)
+                trailing = (xor & -xor).bit_length() - 1
+                if leading >= self.leading and trailing >= self.trailing:
+                    writer.write(0b10, 2)
+                    writer.write(xor >> self.trailing, 64 - self.leading - self.trailing)
+                else:
+                    length = 64 - leading - trailing
+                    writer.write(0b11, 2)
+                    writer.write(leading, 5)
+                    writer.write(length - 1, 6)
+                    writer.write(xor >> trailing, length)
+                    self.leading, self.trailing = leading, trailing
+
+        self.last_ms = ms
+        self.last_bits = bits
+        self.count += 1
+
+    def getvalue(self) -> bytes:
+        return self.writer.getvalue()
+
+    def __len__(self) -> int:
+        return len(self.writer)
+
+
+def float_bits(values) -> list[int]:
+    """float64 -> біти як Python int, пакетно через NumPy."""
+    return np.asarray(values, dtype=np.float64).view(np.uint64).tolist()
+
+
+def decode(data: bytes, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """(мс epoch int64, значення float64) у порядку запису."""
+    times = np.empty(count, dtype=np.int64)
+    bits = np.empty(count, dtype=np.uint64)
+    if not count:
+        return times, bits.view(np.float64)
+
+    reader = BitReader(data)
+    read = reader.read
+
+    ms = _signed(read(64), 64)
+    value = read(64)
+    times[0], bits[0] = ms, value
+
+    delta = 0
+    leading = trailing = 0
+    for i in range(1, count):
+        if read(1):
+            if not read(1):
+                dod = _signed(read(7), 7)
+            elif not read(1):
+                dod = _signed(read(9), 9)
+            elif not read(1):
+                dod = _signed(read(12), 12)
+            else:
+                dod = _signed(read(64), 64)
+            delta += dod
+        ms += delta
+
+        if read(1):
+            if read(1):
+                leading = read(5)
+                length = read(6) + 1
+                trailing = 64 - leading - length
+            value ^= read(64 - leading - trailing) << trailing
+
+        times[i], bits[i] = ms, value
+
+    return times, bits.view(np.float64)
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from sqlalchemy import case, func, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+from app.services.topology_cache import SensorTopology
+
+
+async def record_incident(
+    db: AsyncSession,
+    sensor: SensorTopology,
+    severity: str,
+    peak_value: float,
+    occurrences: int = 1,
+    seen_at: datetime | None = None
+) -> bool:
+    """
+    Зареєструвати перевищення порогу з коалесценцією інцидентів.
+
+    Поки по сенсору є неврегульований інцидент, повторні показання лише
+    оновлюють його лічильники (occurrence_count, last_seen_at, peak_value),
+    а перехід warning -> critical підвищує severity на місці.
+    Повертає True, якщо було створено новий інцидент. Коміт — на стороні викликача.
+    """
+    seen_at = seen_at or datetime.utcnow()
+    description = f"{sensor.sensor_type.upper()} = {peak_value} {sensor.unit}"
+    incident = models.Incident
+
+    statement = pg_insert(incident).values(
+        building_id=sensor.building_id,
+        sensor_id=sensor.sensor_id,
+        severity=severity,
+        status="open",
+        description=description,
+        occurrence_count=occurrences,
+        last_seen_at=seen_at,
+        peak_value=peak_value
+    )
+    excluded = statement.excluded
+
+    values = {
+        "occurrence_count": incident.occurrence_count + excluded.occurrence_count,
+        "last_seen_at": excluded.last_seen_at,
+        # greatest у PostgreSQL пропускає NULL
+        "peak_value": func.greatest(incident.peak_value, excluded.peak_value)
+    }
+
+    if severity == "critical":
+        values["severity"] = "critical"
+        values["description"] = case(
+            (incident.severity != "critical", excluded.description),
+            else_=incident.description
+        )
+
+    # Один атомарний upsert за унікальним частковим індексом: паралельні
+    # показання по сенсору не створять двох відкритих інцидентів.
+    # xmax = 0 лише в щойно вставленого рядка
+    inserted = await db.scalar(
+        statement.on_conflict_do_update(
+            index_elements=["sensor_id"],
+            index_where=incident.status != "resolved",
+            set_=values
+        )
+        .returning(literal_column("xmax = 0"))
+    )
+    return bool(inserted)
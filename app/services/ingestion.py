@@ -0,0 +1,209 @@
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.anomaly import anomaly_detector
+from app.services.chunks import chunk_store
+from app.services.incidents import record_incident
+from app.services.lateness import lateness_tracker
+from app.services.metrics_buffer import metrics_buffer
+from app.services.recent_readings import recent_readings, to_epoch
+from app.services.sequences import sequence_tracker
+from app.services.topology_cache import sensor_topology
+
+
+class Reading(NamedTuple):
+    sensor_id: int
+    value: float
+    timestamp: datetime | None = None
+    seq: int | None = None
+
+
+class IngestResult(NamedTuple):
+    sensor_id: int
+    value: float
+    severity: str
+    incident_created: bool
+    duplicate: bool = False
+    late: bool = False
+    expired: bool = False
+
+
+class UnknownSensorsError(Exception):
+    def __init__(self, sensor_ids):
+        self.sensor_ids = sorted(sensor_ids)
+        super().__init__(f"Sensors not found: {self.sensor_ids}")
+
+
+class DisabledSensorsError(Exception):
+    def __init__(self, sensor_ids):
+        self.sensor_ids = sorted(sensor_ids)
+        super().__init__(f"Device is inactive or business account is blocked for sensors: {self.sensor_ids}")
+
+
+def forget_sensors(sensor_ids):
+    """Прибрати стан видалених сенсорів: буфер показників, фрагменти, кільця, seq."""
+    sensor_ids = list(sensor_ids)
+    if not sensor_ids:
+        return
+    metrics_buffer.discard_sensors(sensor_ids)
+    chunk_store.discard_sensors(sensor_ids)
+    for sensor_id in sensor_ids:
+        recent_readings.discard(sensor_id)
+        sequence_tracker.forget(sensor_id)
+
+
+def classify_value(value: float, threshold_warning: int, threshold_critical: int) -> str:
+    if value >= threshold_critical:
+        return "critical"
+    if value >= threshold_warning:
+        return "warning"
+    return "normal"
+
+
+async def ingest_readings(
+    db: AsyncSession,
+    readings: list[Reading],
+    device_id: int | None = None
+) -> list[IngestResult]:
+    """
+    Спільний шлях обробки показників для HTTP, WebSocket та бінарних каналів.
+
+    Топологія береться з кешу (промахи — одним запитом), показники йдуть у
+    write-behind буфер і кільцеві буфери, детектор аномалій позначає
+    early_warning, а перевищення по кожному сенсору зводяться в одне
+    оновлення інциденту. Показання з уже баченим seq повертаються з
+    duplicate=True і не пишуться в історію, але перевищення в них так само
+    оновлює інцидент. Запізнілі показання (за часом
+    пристрою) потрапляють лише в історію і rollups, застарілі понад період
+    зберігання — відкидаються з expired=True. Якщо задано device_id, сенсори
+    інших пристроїв вважаються невідомими — так відсікаються підмінені sensor_id.
+    Показання неактивного пристрою чи заблокованого бізнесу не приймаються
+    (DisabledSensorsError).
+    """
+    sensors = await sensor_topology.get_many(db, {r.sensor_id for r in readings})
+    if device_id is not None:
+        sensors = {
+            sensor_id: sensor
+            for sensor_id, sensor in sensors.items()
+            if sensor.device_id == device_id
+        }
+
+    missing_ids = {r.sensor_id for r in readings} - sensors.keys()
+    if missing_ids:
+        raise UnknownSensorsError(missing_ids)
+
+    disabled_ids = {
+        sensor.sensor_id
+        for sensor in sensors.values()
+        if not sensor.device_active or sensor.business_blocked
+    }
+    if disabled_ids:
+        raise DisabledSensorsError(disabled_ids)
+
+    now = datetime.utcnow()
+    metrics = []
+    live = []
+    alerts = {}
+    first_alert_index = {}
+    results = []
+    accepted = []
+
+    def add_alert(sensor_id: int, severity: str, value: float, seen_at: datetime):
+        # Перевищення по одному сенсору зводяться в одне оновлення інциденту
+        first_alert_index.setdefault(sensor_id, len(results))
+        alert = alerts.setdefault(sensor_id, {
+            "severity": severity,
+            "peak_value": value,
+            "occurrences": 0,
+            "seen_at": seen_at
+        })
+        if severity == "critical":
+            alert["severity"] = "critical"
+        alert["peak_value"] = max(alert["peak_value"], value)
+        alert["occurrences"] += 1
+        alert["seen_at"] = max(alert["seen_at"], seen_at)
+
+    for reading in readings:
+        sensor = sensors[reading.sensor_id]
+        severity = classify_value(
+            reading.value,
+            sensor.threshold_warning,
+            sensor.threshold_critical
+        )
+
+        # Повтор уже прийнятого показання не пишеться в історію. Перевищення все
+        # одно оцінюється: seq після перезапуску лічильника пристрою може
+        # збігтися з уже баченим, а інцидент лише зведеться з відкритим
+        if reading.seq is not None and not sequence_tracker.accept(sensor.sensor_id, reading.seq):
+            if severity in ("warning", "critical"):
+                add_alert(sensor.sensor_id, severity, reading.value, now)
+            results.append(
+                IngestResult(sensor.sensor_id, reading.value, severity, False, True)
+            )
+            continue
+        if reading.seq is not None:
+            accepted.append((sensor.sensor_id, reading.seq))
+
+        recorded_at, late = lateness_tracker.place(reading.timestamp, now)
+        if recorded_at is None:
+            results.append(
+                IngestResult(sensor.sensor_id, reading.value, severity, False, late=True, expired=True)
+            )
+            continue
+
+        metrics.append({
+            "sensor_id": sensor.sensor_id,
+            "value": reading.value,
+            "recorded_at": recorded_at
+        })
+
+        # Запізніле показання лише доповнює історію: стан на «зараз» воно не описує
+        if late:
+            results.append(
+                IngestResult(sensor.sensor_id, reading.value, severity, False, late=True)
+            )
+            continue
+
+        live.append((recorded_at, len(results), sensor.sensor_id, reading.value, sensor.threshold_warning))
+
+        if severity in ("warning", "critical"):
+            add_alert(sensor.sensor_id, severity, reading.value, recorded_at)
+
+        results.append(
+            IngestResult(sensor.sensor_id, reading.value, severity, False)
+        )
+
+    # Інциденти комітяться до будь-якого запису в памʼять: якщо коміт не вдався,
+    # номери знімаються, і повтор запиту не вважатиметься дублікатом
+    if alerts:
+        try:
+            for sensor_id, alert in alerts.items():
+                if await record_incident(db, sensors[sensor_id], **alert):
+                    # Прапорець отримує перше перевищення, що відкрило інцидент
+                    index = first_alert_index[sensor_id]
+                    results[index] = results[index]._replace(incident_created=True)
+            await db.commit()
+        except BaseException:
+            for sensor_id, seq in accepted:
+                sequence_tracker.release(sensor_id, seq)
+            raise
+
+    metrics_buffer.extend(metrics)
+
+    # У межах вікна переупорядкування кільця і детектор бачать показання за часом пристрою
+    live.sort(key=lambda item: item[0])
+    times = [to_epoch(item[0]) for item in live]
+    sensor_ids = [item[2] for item in live]
+    values = [item[3] for item in live]
+    recent_readings.extend(sensor_ids, values, times)
+
+    # Раннє попередження лише для показань нижче статичних порогів, без інциденту
+    early = anomaly_detector.evaluate(sensor_ids, values, [item[4] for item in live])
+    for position in early.nonzero()[0].tolist():
+        index = live[position][1]
+        if results[index].severity == "normal":
+            results[index] = results[index]._replace(severity="early_warning")
+
+    return results
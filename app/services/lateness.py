@@ -0,0 +1,100 @@
+"""
+Розміщення показань за часом пристрою і облік запізнення.
+
+Пристрій може передати власний timestamp — після обриву звʼязку шлюз
+вивантажує буфер, і показання мають лягти у свою партицію і свій кошик
+rollup, а не отримати час завантаження. Правила:
+
+  * час у майбутньому понад INGEST_MAX_FUTURE_SKEW_SECONDS замінюється
+    часом сервера (годинник пристрою збився) — clamped_total;
+  * показання, старше за INGEST_REORDER_WINDOW_SECONDS, вважається
+    запізнілим: воно пишеться в історію й rollups, але не відкриває
+    інцидентів і не потрапляє в кільцеві буфери та детектор аномалій;
+  * показання, старше за METRICS_RETENTION_DAYS, відкидається — його
+    партиція вже видалена — expired_total.
+
+Гістограма запізнення (сервер мінус пристрій) допомагає підібрати розмір
+буфера на шлюзах.
+"""
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+
+# Верхні межі кошиків гістограми, секунди
+BUCKETS = (1, 5, 30, 60, 300, 900, 3600, 6 * 3600, 24 * 3600)
+
+
+def bucket_label(upper: float | None) -> str:
+    if upper is None:
+        return f">{BUCKETS[-1]}s"
+    return f"<={upper}s"
+
+
+class LatenessTracker:
+    def __init__(self, max_future_skew: float, reorder_window: float, retention_days: int):
+        self.max_future_skew = timedelta(seconds=max_future_skew)
+        self.reorder_window = timedelta(seconds=reorder_window)
+        self.retention = timedelta(days=retention_days) if retention_days > 0 else None
+
+        self._histogram = [0] * (len(BUCKETS) + 1)
+        self.observed_total = 0
+        self.late_total = 0
+        self.clamped_total = 0
+        self.expired_total = 0
+        self.max_lateness = 0.0
+
+    def place(self, timestamp: datetime | None, now: datetime) -> tuple[datetime | None, bool]:
+        """
+        (recorded_at, late) для показання. recorded_at — naive UTC або None,
+        якщо показання старше за період зберігання і має бути відкинуте.
+        """
+        if timestamp is None:
+            return now, False
+
+        # Час зберігається як naive UTC, як і datetime.utcnow() у решті коду
+        if timestamp.tzinfo is not None:
+            offset = timestamp.utcoffset()
+            timestamp = timestamp.replace(tzinfo=None)
+            if offset:
+                timestamp -= offset
+
+        lateness = now - timestamp
+        if lateness < -self.max_future_skew:
+            self.clamped_total += 1
+            return now, False
+
+        seconds = max(lateness.total_seconds(), 0.0)
+        self.observed_total += 1
+        self._histogram[bisect_left(BUCKETS, seconds)] += 1
+        self.max_lateness = max(self.max_lateness, seconds)
+
+        if self.retention is not None and lateness > self.retention:
+            self.expired_total += 1
+            return None, True
+
+        late = lateness > self.reorder_window
+        if late:
+            self.late_total += 1
+        return timestamp, late
+
+    def stats(self) -> dict:
+        return {
+            "reorder_window_seconds": self.reorder_window.total_seconds(),
+            "observed_total": self.observed_total,
+            "late_total": self.late_total,
+            "clamped_total": self.clamped_total,
+            "expired_total": self.expired_total,
+            "max_lateness_seconds": self.max_lateness,
+            "histogram": {
+                bucket_label(upper): count
+                for upper, count in zip((*BUCKETS, None), self._histogram)
+            }
+        }
+
+
+lateness_tracker = LatenessTracker(
+    max_future_skew=settings.INGEST_MAX_FUTURE_SKEW_SECONDS,
+    reorder_window=settings.INGEST_REORDER_WINDOW_SECONDS,
+    retention_days=settings.METRICS_RETENTION_DAYS
+)
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db import models
+from app.services.chunks import chunk_store
+from app.services.rollups import upsert_rollups
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsBuffer:
+    """
+    Write-behind буфер показників сенсорів.
+
+    Обробники лише додають рядки в памʼять, а фонова задача пише їх у
+    sensor_metrics багаторядковими INSERT — за розміром пакета або за
+    інтервалом часу. Буфер обмежений max_size: при переповненні
+    відкидаються найстаріші рядки (лічильник dropped_total). Разом із сирими
+    рядками оновлюються агрегати sensor_metric_rollups.
+
+    У режимі METRICS_STORAGE_MODE = "chunks" сирі рядки після коміту агрегатів
+    потрапляють у стиснені фрагменти chunk_store, а не в sensor_metrics.
+
+    Пакет, що порушує обмеження БД (наприклад, показання щойно видаленого
+    сенсора), ділиться навпіл, доки поганий рядок не лишиться сам, — його
+    відкидає і логує, решта пишеться. Інші помилки повертають пакет у чергу.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        high_water: float = 0.8
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.high_water_size = int(max_size * high_water)
+
+        self._rows = deque()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._stopping = False
+        self._task = None
+
+        self.flushed_total = 0
+        self.dropped_total = 0
+        self.rejected_total = 0
+        self.failed_flushes = 0
+        self.flush_count = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def extend(self, rows: list[dict]):
+        if len(rows) > self.max_size:
+            self.dropped_total += len(rows) - self.max_size
+            rows = rows[-self.max_size:]
+
+        overflow = len(self._rows) + len(rows) - self.max_size
+        for _ in range(max(overflow, 0)):
+            self._rows.popleft()
+        self.dropped_total += max(overflow, 0)
+        self._rows.extend(rows)
+
+        if len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+        if len(self._rows) >= self.high_water_size:
+            self._drained.clear()
+
+    async def wait_for_capacity(self):
+        """
+        Backpressure для потокових каналів: чекати, поки буфер не спуститься
+        нижче high water. Якщо БД повільна, джерело призупиняється, а не
+        змушує буфер відкидати рядки.
+        """
+        while len(self._rows) >= self.high_water_size and not self._stopping:
+            self._wakeup.set()
+            await self._drained.wait()
+
+    def discard_sensors(self, sensor_ids):
+        """Прибрати з черги показання видалених сенсорів."""
+        sensor_ids = set(sensor_ids)
+        kept = [row for row in self._rows if row["sensor_id"] not in sensor_ids]
+        self.dropped_total += len(self._rows) - len(kept)
+        self._rows = deque(kept)
+
+    def _take_batch(self) -> list[dict]:
+        count = min(self.batch_size, len(self._rows))
+        return [self._rows.popleft() for _ in range(count)]
+
+    def _requeue(self, rows: list[dict]):
+        free = self.max_size - len(self._rows)
+        kept = rows[:max(free, 0)]
+        self._rows.extendleft(reversed(kept))
+        self.dropped_total += len(rows) - len(kept)
+
+    async def flush(self, persist_chunks: bool = False) -> int:
+        """Записати все, що накопичилось у буфері. Повертає кількість рядків."""
+        written = 0
+
+        async with self._flush_lock:
+            while True:
+                rows = self._take_batch()
+                if not rows:
+                    break
+
+                started = time.perf_counter()
+                written_rows, rejected_rows = [], []
+                try:
+                    await self._write(rows, written_rows, rejected_rows)
+                except Exception:
+                    self.failed_flushes += 1
+                    # Уже записані частини пакета в чергу не повертаються
+                    self._requeue(rows[len(written_rows) + len(rejected_rows):])
+                    logger.exception("Failed to flush %d sensor metrics", len(rows))
+                    break
+                rows = written_rows
+
+                elapsed = time.perf_counter() - started
+                self.flush_count += 1
+                self.flushed_total += len(rows)
+                self.last_flush_seconds = elapsed
+                self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+                written += len(rows)
+
+                if chunk_store.enabled:
+                    chunk_store.append(rows)
+
+                if len(self._rows) < self.high_water_size:
+                    self._drained.set()
+
+            if chunk_store.enabled and (persist_chunks or chunk_store.persist_due()):
+                await self._persist_chunks()
+
+        return written
+
+    async def _insert(self, rows: list[dict]):
+        async with SessionLocal() as db:
+            if not chunk_store.enabled:
+                await db.execute(insert(models.SensorMetric), rows)
+            # Агрегати в тій самій транзакції, що й сирі рядки
+            await upsert_rollups(db, rows)
+            await db.commit()
+
+    async def _write(self, rows: list[dict], written: list[dict], rejected: list[dict]):
+        """Записати пакет, по порядку розкладаючи рядки в written і rejected."""
+        try:
+            await self._insert(rows)
+        except IntegrityError:
+            if len(rows) == 1:
+                self.rejected_total += 1
+                rejected.append(rows[0])
+                logger.warning("Dropped sensor metric violating a constraint: %s", rows[0])
+                return
+            middle = len(rows) // 2
+            await self._write(rows[:middle], written, rejected)
+            await self._write(rows[middle:], written, rejected)
+            return
+        written.extend(rows)
+
+    async def _persist_chunks(self):
+        try:
+            await chunk_store.persist()
+        except Exception:
+            chunk_store.failed_persists += 1
+            logger.exception("Failed to persist sensor metric chunks")
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="metrics-buffer-flusher")
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        self._drained.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self.flush(persist_chunks=True)
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._rows),
+            "max_size": self.max_size,
+            "high_water_size": self.high_water_size,
+            "flushed_total": self.flushed_total,
+            "dropped_total": self.dropped_total,
+            "rejected_total": self.rejected_total,
+            "failed_flushes": self.failed_flushes,
+            "flush_count": self.flush_count,
+            "last_flush_seconds": self.last_flush_seconds,
+            "max_flush_seconds": self.max_flush_seconds
+        }
+
+
+metrics_buffer = MetricsBuffer(
+    max_size=settings.METRICS_BUFFER_MAX_SIZE,
+    batch_size=settings.METRICS_FLUSH_BATCH_SIZE,
+    flush_interval=settings.METRICS_FLUSH_INTERVAL_SECONDS,
+    high_water=settings.METRICS_BUFFER_HIGH_WATER
+)
@@ -0,0 +1,351 @@
+"""
+Секціонування sensor_metrics за recorded_at (лише PostgreSQL).
+
+Секції створюються наперед на METRICS_PARTITIONS_AHEAD інтервалів (day/week),
+а старші за METRICS_RETENTION_DAYS відʼєднуються і видаляються цілком —
+без построкових DELETE. Рядки поза наявними діапазонами потрапляють у
+секцію DEFAULT, тож INSERT з буфера ніколи не падає через відсутню секцію.
+Довгі діапазони обслуговують агрегати (app/services/rollups.py) з власною,
+довшою ретенцією. З COLD_STORAGE_ENABLED прострочені секції й рядки
+DEFAULT-секції спершу вивантажуються у файли холодного рівня
+(app/services/cold_storage.py) і лише потім видаляються.
+
+Перехід наявної несекціонованої таблиці виконує `python -m app.db.migrate`
+разом з рештою змін схеми; окремо — `python -m app.services.partitions migrate`.
+"""
+import argparse
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.database import engine
+from app.db import models
+from app.services.chunks import chunk_store
+from app.services.cold_storage import cold_storage
+from app.services.rollups import prune_rollups
+
+logger = logging.getLogger(__name__)
+
+TABLE = models.SensorMetric.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+LEGACY_TABLE = f"{TABLE}_legacy"
+
+INTERVALS = {
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    start = datetime(moment.year, moment.month, moment.day)
+    if interval == "week":
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def partition_name(start: datetime) -> str:
+    return f"{TABLE}_p{start:%Y%m%d}"
+
+
+class PartitionManager:
+    """Створення секцій наперед і відʼєднання прострочених за retention."""
+
+    def __init__(
+        self,
+        interval: str,
+        ahead: int,
+        retention_days: int,
+        check_interval: float
+    ):
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported partition interval: {interval}")
+
+        self.interval = interval
+        self.step = INTERVALS[interval]
+        self.ahead = ahead
+        self.retention_days = retention_days
+        self.check_interval = check_interval
+
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = None
+
+        self.partitions = 0
+        self.created_total = 0
+        self.dropped_total = 0
+        self.last_run_at = None
+
+    @property
+    def enabled(self) -> bool:
+        return engine.dialect.name == "postgresql"
+
+    def retention_cutoff(self, now: datetime) -> datetime | None:
+        if self.retention_days <= 0:
+            return None
+        return now - timedelta(days=self.retention_days)
+
+    async def relkind(self, conn: AsyncConnection) -> str | None:
+        return await conn.scalar(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": TABLE}
+        )
+
+    async def list_partitions(self, conn: AsyncConnection) -> list[tuple[str, datetime, datetime]]:
+        rows = await conn.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:table)"
+            ),
+            {"table": TABLE}
+        )
+
+        partitions = []
+        for name, bounds in rows:
+            match = _BOUNDS.search(bounds)
+            # DEFAULT-секція меж не має
+            if match:
+                partitions.append((
+                    name,
+                    datetime.fromisoformat(match[1]),
+                    datetime.fromisoformat(match[2])
+                ))
+
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    async def ensure_partitions(
+        self,
+        conn: AsyncConnection,
+        since: datetime,
+        until: datetime
+    ) -> int:
+        """Створити секції, що покривають [since, until], і DEFAULT-секцію."""
+        await conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT'
+        ))
+
+        existing = [(start, end) for _, start, end in await self.list_partitions(conn)]
+        created = 0
+
+        start = period_start(since, self.interval)
+        while start <= until:
+            end = start + self.step
+            # Після зміни інтервалу старі секції можуть перекривати новий діапазон
+            if not any(s < end and start < e for s, e in existing):
+                try:
+                    async with conn.begin_nested():
+                        await conn.execute(text(
+                            f'CREATE TABLE "{partition_name(start)}" PARTITION OF "{TABLE}" '
+                            f"FOR VALUES FROM ('{start.isoformat(' ')}') TO ('{end.isoformat(' ')}')"
+                        ))
+                    created += 1
+                except Exception:
+                    # Найчастіше DEFAULT-секція вже містить рядки з цього діапазону
+                    logger.exception("Failed to create partition %s", partition_name(start))
+            start = end
+
+        return created
+
+    async def drop_expired(self, now: datetime) -> int:
+        cutoff = self.retention_cutoff(now)
+        if cutoff is None:
+            return 0
+
+        async with engine.connect() as conn:
+            expired = [
+                (name, start, end)
+                for name, start, end in await self.list_partitions(conn)
+                if end <= cutoff
+            ]
+
+        for name, start, end in expired:
+            # Якщо експорт упав, секція лишається і буде вивантажена наступного разу
+            if cold_storage.enabled:
+                await cold_storage.export(name, start, start, end)
+
+            # Кожна секція окремою транзакцією, щоб не тримати блокування батьківської таблиці
+            async with engine.begin() as conn:
+                await conn.execute(text(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"'))
+                await conn.execute(text(f'DROP TABLE "{name}"'))
+            logger.info("Dropped expired partition %s", name)
+
+        if cold_storage.enabled:
+            await self.export_default(cutoff, now)
+
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE recorded_at < :cutoff'),
+                {"cutoff": cutoff}
+            )
+
+        return len(expired)
+
+    async def export_default(self, cutoff: datetime, now: datetime):
+        """
+        Вивантажити прострочені рядки DEFAULT-секції по днях. Мітка запуску в
+        імені файлу не дає наступному вивантаженню того самого дня перезаписати
+        попереднє.
+        """
+        async with engine.connect() as conn:
+            days = (await conn.scalars(
+                text(
+                    f"SELECT DISTINCT date_trunc('day', recorded_at) "
+                    f'FROM "{DEFAULT_PARTITION}" WHERE recorded_at < :cutoff'
+                ),
+                {"cutoff": cutoff}
+            )).all()
+
+        for day in sorted(days):
+            await cold_storage.export(
+                DEFAULT_PARTITION,
+                day,
+                day,
+                min(day + timedelta(days=1), cutoff),
+                label=f"{DEFAULT_PARTITION}-{now:%Y%m%d%H%M%S}"
+            )
+
+    async def maintain(self, now: datetime | None = None):
+        now = now or datetime.utcnow()
+
+        async with engine.begin() as conn:
+            relkind = await self.relkind(conn)
+            if relkind != "p":
+                logger.warning(
+                    "%s is not partitioned, run `python -m app.db.migrate`",
+                    TABLE
+                )
+                return
+
+            created = await self.ensure_partitions(conn, now, now + self.step * self.ahead)
+
+        dropped = await self.drop_expired(now)
+        await prune_rollups(now)
+        await asyncio.to_thread(cold_storage.prune, now)
+        await chunk_store.prune(now)
+
+        async with engine.connect() as conn:
+            self.partitions = len(await self.list_partitions(conn))
+
+        self.created_total += created
+        self.dropped_total += dropped
+        self.last_run_at = now
+
+    async def migrate_legacy_table(self, now: datetime | None = None) -> bool:
+        """
+        Перенести несекціоновану sensor_metrics у секціоновану таблицю.
+        Рядки, старші за retention, не переносяться. Виконується однією транзакцією.
+        """
+        now = now or datetime.utcnow()
+
+        async with engine.begin() as conn:
+            relkind = await self.relkind(conn)
+            if relkind == "p":
+                return False
+
+            if relkind is None:
+                await conn.run_sync(models.SensorMetric.__table__.create)
+                await self.ensure_partitions(conn, now, now + self.step * self.ahead)
+                return True
+
+            sequence = await conn.scalar(
+                text("SELECT pg_get_serial_sequence(:table, 'id')"),
+                {"table": TABLE}
+            )
+            await conn.execute(text(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY_TABLE}"'))
+            await conn.execute(text(
+                f'ALTER TABLE "{LEGACY_TABLE}" RENAME CONSTRAINT "{TABLE}_pkey" TO "{LEGACY_TABLE}_pkey"'
+            ))
+            if sequence:
+                await conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {LEGACY_TABLE}_id_seq"))
+
+            await conn.run_sync(models.SensorMetric.__table__.create)
+
+            cutoff = self.retention_cutoff(now)
+            oldest = await conn.scalar(text(f'SELECT min(recorded_at) FROM "{LEGACY_TABLE}"'))
+            since = min(oldest or now, now)
+            if cutoff:
+                since = max(since, cutoff)
+            await self.ensure_partitions(conn, since, now + self.step * self.ahead)
+
+            await conn.execute(
+                text(
+                    f'INSERT INTO "{TABLE}" (id, sensor_id, value, recorded_at) '
+                    f"SELECT id, sensor_id, value, COALESCE(recorded_at, now()) "
+                    f'FROM "{LEGACY_TABLE}"'
+                    + (" WHERE recorded_at >= :cutoff" if cutoff else "")
+                ),
+                {"cutoff": cutoff}
+            )
+            await conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+                f'COALESCE((SELECT max(id) FROM "{TABLE}"), 0) + 1, false)'
+            ))
+            await conn.execute(text(f'DROP TABLE "{LEGACY_TABLE}"'))
+
+        return True
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await self.maintain()
+            except Exception:
+                logger.exception("Sensor metrics partition maintenance failed")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        if not self.enabled or (self._task and not self._task.done()):
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="metrics-partition-manager")
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "interval": self.interval,
+            "partitions": self.partitions,
+            "created_total": self.created_total,
+            "dropped_total": self.dropped_total,
+            "last_run_at": self.last_run_at
+        }
+
+
+partition_manager = PartitionManager(
+    interval=settings.METRICS_PARTITION_INTERVAL,
+    ahead=settings.METRICS_PARTITIONS_AHEAD,
+    retention_days=settings.METRICS_RETENTION_DAYS,
+    check_interval=settings.METRICS_PARTITION_CHECK_SECONDS
+)
+
+
+async def _main(command: str):
+    if command == "migrate":
+        migrated = await partition_manager.migrate_legacy_table()
+        print("migrated" if migrated else f"{TABLE} is already partitioned")
+    await partition_manager.maintain()
+    print(partition_manager.stats())
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["migrate", "maintain"])
+    asyncio.run(_main(parser.parse_args().command))
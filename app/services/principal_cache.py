@@ -0,0 +1,85 @@
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import models
+
+PRINCIPAL_MODELS = {
+    "administrator": models.Administrator,
+    "emergency_service": models.EmergencyService,
+    "business": models.BusinessUser,
+}
+
+
+class PrincipalCache:
+    """
+    LRU-кеш автентифікованих користувачів за (роль, id) у памʼяті процесу.
+
+    Кожен запит із JWT інакше починається з SELECT у administrators,
+    emergency_services або business_users. Кешуються відʼєднані від сесії
+    ORM-обʼєкти: обробники читають лише їхні колонки. Блокування і видалення
+    акаунтів інвалідують запис у цьому процесі одразу, в інших воркерах —
+    при оновленні списку відкликань (app/services/token_revocations.py).
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+
+        # (роль, id) -> (користувач, момент завантаження)
+        self._entries: OrderedDict[tuple[str, int], tuple[object, float]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, db: AsyncSession, role: str, user_id: int):
+        key = (role, user_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[1] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del self._entries[key]
+
+        self.misses += 1
+        model = PRINCIPAL_MODELS.get(role)
+        if model is None:
+            return None
+
+        user = await db.scalar(select(model).filter_by(id=user_id))
+        if user is None:
+            return None
+
+        # Обʼєкт переживе сесію цього запиту
+        db.expunge(user)
+        self._entries[key] = (user, time.monotonic())
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, role: str, user_id: int):
+        if self._entries.pop((role, user_id), None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations
+        }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE
+)
@@ -0,0 +1,188 @@
+"""
+Кільцеві буфери останніх показників кожного сенсора в памʼяті процесу.
+
+Кожен сенсор отримує слот — рядок у двох матрицях NumPy: значення (float32)
+і час (float64, секунди epoch UTC), по capacity комірок на рядок. Показання
+не створюють Python-обʼєктів: пакет записується векторно, latest — O(1),
+last(n) і window_stats — O(n) без звернення до БД.
+
+Памʼять на сенсор:
+
+    capacity * 12 B    (4 B значення + 8 B час)
+    + 8 B              (позиція запису + кількість, int32)
+    + ~100 B           (запис у словнику sensor_id -> слот)
+
+За capacity=60 це ~0.83 KB, тобто ~830 MB на 1M сенсорів. Матриці ростуть
+подвоєнням до max_sensors; сенсори понад ліміт не відстежуються (untracked_total).
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.core.config import settings
+
+EPOCH = datetime(1970, 1, 1)
+
+SLOT_BYTES = 12
+INDEX_BYTES = 8
+DICT_ENTRY_BYTES = 100
+
+
+def to_epoch(moment: datetime) -> float:
+    return (moment - EPOCH).total_seconds()
+
+
+def from_epoch(seconds: float) -> datetime:
+    return EPOCH + timedelta(seconds=seconds)
+
+
+class RecentReadings:
+    def __init__(self, capacity: int, max_sensors: int, initial_sensors: int = 1024):
+        self.capacity = capacity
+        self.max_sensors = max_sensors
+
+        rows = min(initial_sensors, max_sensors)
+        self._values = np.zeros((rows, capacity), dtype=np.float32)
+        self._times = np.zeros((rows, capacity), dtype=np.float64)
+        self._head = np.zeros(rows, dtype=np.int32)
+        self._count = np.zeros(rows, dtype=np.int32)
+
+        self._slots: dict[int, int] = {}
+        self._free: list[int] = []
+
+        self.untracked_total = 0
+
+    def _grow(self):
+        rows = min(len(self._head) * 2, self.max_sensors)
+        extra = rows - len(self._head)
+        self._values = np.vstack([self._values, np.zeros((extra, self.capacity), dtype=np.float32)])
+        self._times = np.vstack([self._times, np.zeros((extra, self.capacity), dtype=np.float64)])
+        self._head = np.concatenate([self._head, np.zeros(extra, dtype=np.int32)])
+        self._count = np.concatenate([self._count, np.zeros(extra, dtype=np.int32)])
+
+    def _slot(self, sensor_id: int) -> int:
+        slot = self._slots.get(sensor_id)
+        if slot is not None:
+            return slot
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            if slot >= self.max_sensors:
+                self.untracked_total += 1
+                return -1
+            if slot >= len(self._head):
+                self._grow()
+
+        self._slots[sensor_id] = slot
+        return slot
+
+    def extend(self, sensor_ids: list[int], values: list[float], times: list[float]):
+        """Записати пакет показань (times — секунди epoch UTC) у порядку надходження."""
+        if not sensor_ids:
+            return
+
+        slots = np.fromiter((self._slot(s) for s in sensor_ids), dtype=np.int64, count=len(sensor_ids))
+        values = np.asarray(values, dtype=np.float32)
+        times = np.asarray(times, dtype=np.float64)
+
+        tracked = slots >= 0
+        if not tracked.all():
+            slots, values, times = slots[tracked], values[tracked], times[tracked]
+
+        # Порядковий номер показання серед показань того самого сенсора в пакеті
+        order = np.argsort(slots, kind="stable")
+        slots, values, times = slots[order], values[order], times[order]
+        unique, first, counts = np.unique(slots, return_index=True, return_counts=True)
+        rank = np.arange(len(slots)) - np.repeat(first, counts)
+
+        # З довгого пакета для сенсора лишаються тільки останні capacity показань
+        keep = rank >= np.repeat(counts, counts) - self.capacity
+        positions = (self._head[slots] + rank) % self.capacity
+
+        self._values[slots[keep], positions[keep]] = values[keep]
+        self._times[slots[keep], positions[keep]] = times[keep]
+        self._head[unique] = (self._head[unique] + counts) % self.capacity
+        self._count[unique] = np.minimum(self._count[unique] + counts, self.capacity)
+
+    @property
+    def allocated_sensors(self) -> int:
+        return len(self._head)
+
+    def slots_of(self, sensor_ids) -> np.ndarray:
+        """Слоти сенсорів; -1 для тих, що не відстежуються."""
+        return np.fromiter(
+            (self._slots.get(s, -1) for s in sensor_ids),
+            dtype=np.int64,
+            count=len(sensor_ids)
+        )
+
+    def rows(self, slots: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Вміст кілець для слотів: (час, значення, маска заповнених комірок)."""
+        filled = np.arange(self.capacity) < self._count[slots][:, None]
+        return self._times[slots], self._values[slots], filled
+
+    def discard(self, sensor_id: int):
+        slot = self._slots.pop(sensor_id, None)
+        if slot is not None:
+            self._head[slot] = 0
+            self._count[slot] = 0
+            self._free.append(slot)
+
+    def latest(self, sensor_id: int) -> tuple[datetime, float] | None:
+        slot = self._slots.get(sensor_id)
+        if slot is None or not self._count[slot]:
+            return None
+        position = (self._head[slot] - 1) % self.capacity
+        return from_epoch(float(self._times[slot, position])), float(self._values[slot, position])
+
+    def last(self, sensor_id: int, n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Останні n показань від старішого до новішого: (секунди epoch, значення)."""
+        slot = self._slots.get(sensor_id)
+        if slot is None:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float32)
+
+        n = min(n, int(self._count[slot]))
+        positions = (self._head[slot] - n + np.arange(n)) % self.capacity
+        return self._times[slot, positions], self._values[slot, positions]
+
+    def window_stats(self, sensor_id: int, seconds: float, now: datetime | None = None) -> dict:
+        times, values = self.last(sensor_id, self.capacity)
+        values = values[times >= to_epoch(now or datetime.utcnow()) - seconds]
+
+        if not len(values):
+            return {"count": 0, "min": None, "max": None, "avg": None}
+
+        return {
+            "count": len(values),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "avg": float(values.mean(dtype=np.float64))
+        }
+
+    def memory_bytes(self) -> int:
+        return (
+            self._values.nbytes
+            + self._times.nbytes
+            + self._head.nbytes
+            + self._count.nbytes
+            + len(self._slots) * DICT_ENTRY_BYTES
+        )
+
+    def stats(self) -> dict:
+        return {
+            "sensors": len(self._slots),
+            "max_sensors": self.max_sensors,
+            "capacity": self.capacity,
+            "allocated_sensors": self.allocated_sensors,
+            "bytes_per_sensor": self.capacity * SLOT_BYTES + INDEX_BYTES + DICT_ENTRY_BYTES,
+            "memory_bytes": self.memory_bytes(),
+            "untracked_total": self.untracked_total
+        }
+
+
+recent_readings = RecentReadings(
+    capacity=settings.RECENT_READINGS_CAPACITY,
+    max_sensors=settings.RECENT_READINGS_MAX_SENSORS
+)
@@ -0,0 +1,102 @@
+"""
+Refresh-токени з ротацією.
+
+Токен — випадковий рядок; у refresh_tokens зберігається лише його SHA-256.
+Кожен /auth/refresh відкликає використаний токен і видає новий у тій самій
+родині (family_id). Повторне використання вже відкликаного токена означає,
+що його скопійовано, — тоді відкликається вся родина, і логін потрібен
+знову.
+"""
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import models
+
+
+class InvalidRefreshToken(Exception):
+    pass
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(db: AsyncSession, role: str, user_id: int, family_id: str | None = None) -> str:
+    """Додати новий токен у сесію; коміт — на стороні викликача."""
+    token = secrets.token_urlsafe(32)
+    db.add(models.RefreshToken(
+        token_hash=_hash(token),
+        family_id=family_id or uuid.uuid4().hex,
+        role=role,
+        user_id=user_id,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token
+
+
+async def claim_refresh_token(db: AsyncSession, token: str) -> models.RefreshToken:
+    """Чинний токен, заблокований до кінця транзакції, або InvalidRefreshToken."""
+    # FOR UPDATE: два паралельні refresh тим самим токеном не отримають обидва новий
+    stored = await db.scalar(
+        select(models.RefreshToken)
+        .filter(models.RefreshToken.token_hash == _hash(token))
+        .with_for_update()
+    )
+
+    if not stored or stored.expires_at <= datetime.utcnow():
+        raise InvalidRefreshToken("Invalid or expired refresh token")
+
+    if stored.revoked_at is not None:
+        await revoke_family(db, stored.family_id)
+        await db.commit()
+        raise InvalidRefreshToken("Refresh token reuse detected")
+
+    return stored
+
+
+async def rotate_refresh_token(db: AsyncSession, stored: models.RefreshToken) -> str:
+    """Відкликати токен з claim_refresh_token і видати новий у родині. Комітить сесію."""
+    stored.revoked_at = datetime.utcnow()
+    new_token = issue_refresh_token(db, stored.role, stored.user_id, stored.family_id)
+    await db.commit()
+    return new_token
+
+
+async def revoke_family(db: AsyncSession, family_id: str):
+    await db.execute(
+        update(models.RefreshToken)
+        .filter(
+            models.RefreshToken.family_id == family_id,
+            models.RefreshToken.revoked_at.is_(None)
+        )
+        .values(revoked_at=datetime.utcnow())
+    )
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str):
+    """Logout: відкликати родину токена, якщо він існує."""
+    family_id = await db.scalar(
+        select(models.RefreshToken.family_id)
+        .filter(models.RefreshToken.token_hash == _hash(token))
+    )
+    if family_id:
+        await revoke_family(db, family_id)
+
+
+async def revoke_principal_refresh_tokens(db: AsyncSession, role: str, user_id: int):
+    """Блокування чи видалення акаунта: жоден refresh-токен більше не спрацює."""
+    await db.execute(
+        update(models.RefreshToken)
+        .filter(
+            models.RefreshToken.role == role,
+            models.RefreshToken.user_id == user_id,
+            models.RefreshToken.revoked_at.is_(None)
+        )
+        .values(revoked_at=datetime.utcnow())
+    )
@@ -0,0 +1,216 @@
+"""
+Інкрементальні агрегати sensor_metrics з роздільністю 1m / 1h / 1d.
+
+Агрегати оновлюються в тій самій транзакції, що й INSERT сирих рядків з
+write-behind буфера, тому завжди узгоджені з sensor_metrics і переживають
+ретенцію сирих даних. Запит діапазону обирає найгрубшу роздільність,
+за якої кількість точок не перевищує запитаної.
+
+Лише PostgreSQL: оновлення — INSERT ... ON CONFLICT з least/greatest,
+перерахунок — date_trunc; інші СУБД відхиляє app/db/database.py.
+
+Перерахунок агрегатів з наявних сирих даних (після оновлення схеми):
+
+    python -m app.services.rollups backfill
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+from app.db import models
+
+RESOLUTIONS = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+# Одиниці date_trunc у PostgreSQL
+TRUNC_UNITS = {
+    "1m": "minute",
+    "1h": "hour",
+    "1d": "day",
+}
+
+RETENTION_DAYS = {
+    "1m": settings.ROLLUP_RETENTION_DAYS_1M,
+    "1h": settings.ROLLUP_RETENTION_DAYS_1H,
+    "1d": settings.ROLLUP_RETENTION_DAYS_1D,
+}
+
+
+def bucket_start(moment: datetime, resolution: str) -> datetime:
+    if resolution == "1m":
+        return moment.replace(second=0, microsecond=0)
+    if resolution == "1h":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def choose_resolution(start: datetime, end: datetime, points: int) -> str:
+    span = end - start
+    for resolution, step in RESOLUTIONS.items():
+        if span / step <= points:
+            return resolution
+    return "1d"
+
+
+def _merge(buckets: dict, key: tuple, count: int, total: float, low: float, high: float):
+    bucket = buckets.get(key)
+    if bucket is None:
+        buckets[key] = [count, total, low, high]
+        return
+    bucket[0] += count
+    bucket[1] += total
+    if low < bucket[2]:
+        bucket[2] = low
+    if high > bucket[3]:
+        bucket[3] = high
+
+
+def aggregate(rows: list[dict]) -> list[dict]:
+    """Згорнути сирі рядки в агрегати всіх роздільностей, по одному на ключ."""
+    minutes = {}
+    for row in rows:
+        value = row["value"]
+        key = (row["sensor_id"], row["recorded_at"].replace(second=0, microsecond=0))
+        _merge(minutes, key, 1, value, value, value)
+
+    # Години і доби збираються з хвилинних агрегатів, а не з кожного рядка
+    buckets = {}
+    for (sensor_id, minute), (count, total, low, high) in minutes.items():
+        hour = minute.replace(minute=0)
+        _merge(buckets, (sensor_id, "1m", minute), count, total, low, high)
+        _merge(buckets, (sensor_id, "1h", hour), count, total, low, high)
+        _merge(buckets, (sensor_id, "1d", hour.replace(hour=0)), count, total, low, high)
+
+    return [
+        {
+            "sensor_id": sensor_id,
+            "resolution": resolution,
+            "bucket_start": start,
+            "value_count": count,
+            "value_sum": total,
+            "value_min": low,
+            "value_max": high
+        }
+        for (sensor_id, resolution, start), (count, total, low, high) in buckets.items()
+    ]
+
+
+def _upsert_statement(values=None, replace: bool = False):
+    rollup = models.SensorMetricRollup
+    statement = pg_insert(rollup)
+    if values is not None:
+        statement = statement.from_select(
+            ["sensor_id", "resolution", "bucket_start", "value_count", "value_sum", "value_min", "value_max"],
+            values
+        )
+    excluded = statement.excluded
+
+    if replace:
+        changes = {
+            "value_count": excluded.value_count,
+            "value_sum": excluded.value_sum,
+            "value_min": excluded.value_min,
+            "value_max": excluded.value_max
+        }
+    else:
+        changes = {
+            "value_count": rollup.value_count + excluded.value_count,
+            "value_sum": rollup.value_sum + excluded.value_sum,
+            "value_min": func.least(rollup.value_min, excluded.value_min),
+            "value_max": func.greatest(rollup.value_max, excluded.value_max)
+        }
+
+    return statement.on_conflict_do_update(
+        index_elements=[rollup.sensor_id, rollup.resolution, rollup.bucket_start],
+        set_=changes
+    )
+
+
+async def upsert_rollups(db: AsyncSession, rows: list[dict]):
+    """Додати пакет сирих рядків до агрегатів. Комміт — на боці того, хто викликає."""
+    buckets = aggregate(rows)
+    if buckets:
+        await db.execute(_upsert_statement(), buckets)
+
+
+async def query_rollups(
+    db: AsyncSession,
+    sensor_id: int,
+    start: datetime,
+    end: datetime,
+    points: int
+) -> tuple[str, list[models.SensorMetricRollup]]:
+    resolution = choose_resolution(start, end, points)
+    rollup = models.SensorMetricRollup
+
+    buckets = (await db.scalars(
+        select(rollup)
+        .filter(
+            rollup.sensor_id == sensor_id,
+            rollup.resolution == resolution,
+            rollup.bucket_start >= bucket_start(start, resolution),
+            rollup.bucket_start < end
+        )
+        .order_by(rollup.bucket_start)
+    )).all()
+
+    return resolution, buckets
+
+
+async def prune_rollups(now: datetime) -> int:
+    deleted = 0
+    async with SessionLocal() as db:
+        for resolution, days in RETENTION_DAYS.items():
+            if days <= 0:
+                continue
+            result = await db.execute(
+                delete(models.SensorMetricRollup)
+                .filter(
+                    models.SensorMetricRollup.resolution == resolution,
+                    models.SensorMetricRollup.bucket_start < now - timedelta(days=days)
+                )
+            )
+            deleted += result.rowcount
+        await db.commit()
+    return deleted
+
+
+async def backfill():
+    """Перерахувати агрегати всіх роздільностей з сирих рядків, що ще зберігаються."""
+    metric = models.SensorMetric
+
+    async with SessionLocal() as db:
+        for resolution, unit in TRUNC_UNITS.items():
+            bucket = func.date_trunc(unit, metric.recorded_at)
+            await db.execute(_upsert_statement(
+                select(
+                    metric.sensor_id,
+                    literal(resolution),
+                    bucket,
+                    func.count(),
+                    func.sum(metric.value),
+                    func.min(metric.value),
+                    func.max(metric.value)
+                )
+                .group_by(metric.sensor_id, bucket),
+                replace=True
+            ))
+        await db.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["backfill"])
+    parser.parse_args()
+    asyncio.run(backfill())
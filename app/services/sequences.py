@@ -0,0 +1,93 @@
+"""
+Ідемпотентний прийом показників за послідовними номерами пристрою.
+
+Для кожного сенсора зберігається high-water mark (найбільший прийнятий seq)
+і 64-бітна маска вже прийнятих номерів нижче нього — обидва в одному
+Python int (hwm << 64 | маска), тобто ~100 B на сенсор разом із записом
+словника. Повтор POST після обриву звʼязку відсікається в памʼяті, без
+унікального індексу і без запиту до БД на кожен рядок.
+
+Номер нижче вікна вважається перезапуском лічильника пристрою (наприклад,
+після перепрошивки), якщо він ближчий до нуля, ніж до high-water mark, або
+нижчий за нього на понад SEQUENCE_RESET_GAP, — стан сенсора починається
+заново. Перезапуск, що потрапив у саме вікно, від повтору не відрізнити;
+такі показання позначаються дублікатами, але інциденти за ними все одно
+оцінюються (app/services/ingestion.py). Стан живе в памʼяті процесу.
+"""
+from app.core.config import settings
+
+WINDOW = 64
+MASK = (1 << WINDOW) - 1
+
+
+class SequenceTracker:
+    def __init__(self, reset_gap: int, max_sensors: int):
+        self.reset_gap = reset_gap
+        self.max_sensors = max_sensors
+        self._state: dict[int, int] = {}
+
+        self.duplicates_total = 0
+        self.resets_total = 0
+
+    def _store(self, sensor_id: int, high: int, seen: int):
+        if sensor_id not in self._state and len(self._state) >= self.max_sensors:
+            del self._state[next(iter(self._state))]
+        self._state[sensor_id] = high << WINDOW | seen
+
+    def accept(self, sensor_id: int, seq: int) -> bool:
+        """True — номер новий і тепер позначений; False — дублікат."""
+        state = self._state.get(sensor_id)
+        if state is None:
+            self._store(sensor_id, seq, 1)
+            return True
+
+        high, seen = state >> WINDOW, state & MASK
+
+        if seq > high:
+            shift = seq - high
+            seen = (seen << shift | 1) & MASK if shift < WINDOW else 1
+            self._store(sensor_id, seq, seen)
+            return True
+
+        # Біт i означає, що номер high - i вже прийнято
+        offset = high - seq
+        if offset >= WINDOW:
+            if offset > self.reset_gap or seq < offset:
+                self.resets_total += 1
+                self._store(sensor_id, seq, 1)
+                return True
+            self.duplicates_total += 1
+            return False
+
+        if seen >> offset & 1:
+            self.duplicates_total += 1
+            return False
+
+        self._store(sensor_id, high, seen | 1 << offset)
+        return True
+
+    def release(self, sensor_id: int, seq: int):
+        """Зняти позначку з номера, якщо обробка показання не завершилась."""
+        state = self._state.get(sensor_id)
+        if state is None:
+            return
+        offset = (state >> WINDOW) - seq
+        if 0 <= offset < WINDOW:
+            self._state[sensor_id] = state & ~(1 << offset)
+
+    def forget(self, sensor_id: int):
+        self._state.pop(sensor_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "sensors": len(self._state),
+            "max_sensors": self.max_sensors,
+            "duplicates_total": self.duplicates_total,
+            "resets_total": self.resets_total
+        }
+
+
+sequence_tracker = SequenceTracker(
+    reset_gap=settings.SEQUENCE_RESET_GAP,
+    max_sensors=settings.SEQUENCE_MAX_SENSORS
+)
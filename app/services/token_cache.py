@@ -0,0 +1,73 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.services.token_revocations import token_revocations
+
+
+class TokenCache:
+    """
+    Кеш перевірених JWT у памʼяті процесу.
+
+    Ключ — SHA-256 токена (сам токен не зберігається), значення — claims
+    після jwt.decode і момент exp, після якого запис недійсний. Повторний
+    запит із тим самим токеном не перевіряє підпис знову.
+
+    Відкликання перевіряється на кожен запит, зокрема для кешованих claims:
+      * jti у фільтрі відкликаних токенів (app/services/token_revocations.py) —
+        logout, спільний для всіх воркерів;
+      * відкликані акаунти там само — блокування чи видалення акаунта:
+        відхиляються всі токени, видані до цього моменту (за iat).
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+
+        # дайджест -> (claims, exp у секундах epoch)
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        """Claims кешованого чинного токена або None (треба перевірити підпис)."""
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[digest]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, token: str, claims: dict, exp: float):
+        self._entries[self._digest(token)] = (claims, exp)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def is_revoked(self, claims: dict) -> bool:
+        if token_revocations.principal_revoked(claims["role"], claims["user_id"], claims["iat"]):
+            return True
+        return token_revocations.is_revoked(claims["jti"])
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+token_cache = TokenCache(max_size=settings.JWT_CACHE_MAX_SIZE)
@@ -0,0 +1,216 @@
+"""
+Відкликані токени доступу: фільтр Блума в памʼяті кожного воркера.
+
+Logout записує jti токена в revoked_tokens і одразу додає його до фільтра
+цього процесу. Кожні REVOKED_TOKENS_REFRESH_SECONDS фільтр перебудовується
+з рядків, чий exp ще не настав, — так відкликання доходить до інших
+воркерів, а прострочені jti зникають із фільтра. Перевірка на запит —
+кілька бітів у bytearray, без звернень до БД.
+
+Блокування чи видалення акаунта записує (роль, id, момент) у
+revoked_principals: токени доступу, видані раніше, недійсні. Ці записи
+перечитуються тим самим циклом, і для нових записів інвалідується кеш
+користувачів (app/services/principal_cache.py) — інші воркери бачать зміну
+не пізніше ніж за REVOKED_TOKENS_REFRESH_SECONDS.
+
+Хибнопозитивні спрацювання (частка REVOKED_TOKENS_ERROR_RATE при
+REVOKED_TOKENS_CAPACITY записах) відхиляють чинний токен доступу; клієнт
+отримує 401 і бере новий через /auth/refresh — з іншим jti. Хибнонегативних
+немає. Якщо відкликаних більше за capacity, фільтр при перебудові
+збільшується.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db import models
+from app.services.principal_cache import principal_cache
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    __slots__ = ("bits", "size", "hashes", "count")
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Подвійне хешування: дві 64-бітні половини одного BLAKE2b
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def _epoch(moment: datetime) -> float:
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+class TokenRevocations:
+    def __init__(self, refresh_interval: float, capacity: int, error_rate: float, token_lifetime: float):
+        self.refresh_interval = refresh_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.token_lifetime = token_lifetime
+
+        self._filter = BloomFilter(capacity, error_rate)
+        # (роль, id) -> токени з iat раніше цього моменту (секунди epoch) недійсні
+        self._principals: dict[tuple[str, int], float] = {}
+        # Відкликані в цьому процесі з початку поточної перебудови
+        self._recent: set[str] = set()
+        self._recent_principals: dict[tuple[str, int], float] = {}
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        self.refreshed_at = None
+        self.rejected_total = 0
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti in self._filter:
+            self.rejected_total += 1
+            return True
+        return False
+
+    def principal_revoked(self, role: str, user_id: int, issued_at: float) -> bool:
+        revoked_at = self._principals.get((role, user_id))
+        if revoked_at is not None and issued_at < revoked_at:
+            self.rejected_total += 1
+            return True
+        return False
+
+    async def revoke_principal(self, db: AsyncSession, role: str, user_id: int):
+        """
+        Відкликати всі чинні токени доступу акаунта. Рядок додається в сесію
+        (коміт — на стороні викликача), у цьому процесі діє одразу.
+        """
+        now = datetime.utcnow()
+        await db.merge(models.RevokedPrincipal(
+            role=role,
+            user_id=user_id,
+            revoked_at=now,
+            expires_at=now + timedelta(seconds=self.token_lifetime)
+        ))
+        self._principals[(role, user_id)] = self._recent_principals[(role, user_id)] = _epoch(now)
+
+    async def revoke(self, jti: str, expires_at: datetime):
+        """Відкликати токен доступу: у БД для інших воркерів і одразу тут."""
+        async with SessionLocal() as db:
+            await db.merge(models.RevokedToken(jti=jti, expires_at=expires_at))
+            await db.commit()
+        self._filter.add(jti)
+        self._recent.add(jti)
+
+    async def refresh(self):
+        now = datetime.utcnow()
+        self._recent = set()
+        self._recent_principals = {}
+
+        async with SessionLocal() as db:
+            # Прострочені рядки вже нічого не відкликають
+            await db.execute(
+                delete(models.RevokedToken)
+                .filter(models.RevokedToken.expires_at <= now)
+            )
+            await db.execute(
+                delete(models.RevokedPrincipal)
+                .filter(models.RevokedPrincipal.expires_at <= now)
+            )
+            # Заодно прибираються прострочені refresh-токени
+            await db.execute(
+                delete(models.RefreshToken)
+                .filter(models.RefreshToken.expires_at <= now)
+            )
+            await db.commit()
+
+            jtis = (await db.scalars(select(models.RevokedToken.jti))).all()
+            principals = (await db.execute(
+                select(
+                    models.RevokedPrincipal.role,
+                    models.RevokedPrincipal.user_id,
+                    models.RevokedPrincipal.revoked_at
+                )
+            )).all()
+
+        rebuilt = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        # Відкликання цього процесу під час вибірки могли не потрапити в знімок
+        for jti in (*jtis, *self._recent):
+            rebuilt.add(jti)
+
+        revoked = {(row.role, row.user_id): _epoch(row.revoked_at) for row in principals}
+        revoked.update(self._recent_principals)
+        # Блокування і видалення в інших воркерах: кешований акаунт перечитується
+        for key, revoked_at in revoked.items():
+            if self._principals.get(key) != revoked_at:
+                principal_cache.invalidate(*key)
+
+        self._filter = rebuilt
+        self._principals = revoked
+        self.refreshed_at = now
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Token revocation refresh failed")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="token-revocations")
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": self._filter.count,
+            "filter_bytes": len(self._filter.bits),
+            "filter_hashes": self._filter.hashes,
+            "revoked_principals": len(self._principals),
+            "refreshed_at": self.refreshed_at,
+            "rejected_total": self.rejected_total
+        }
+
+
+token_revocations = TokenRevocations(
+    refresh_interval=settings.REVOKED_TOKENS_REFRESH_SECONDS,
+    capacity=settings.REVOKED_TOKENS_CAPACITY,
+    error_rate=settings.REVOKED_TOKENS_ERROR_RATE,
+    token_lifetime=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
@@ -0,0 +1,161 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import models
+
+
+@dataclass(frozen=True, slots=True)
+class SensorTopology:
+    sensor_id: int
+    sensor_type: str
+    unit: str
+    threshold_warning: int
+    threshold_critical: int
+    device_id: int
+    serial_number: str
+    device_active: bool
+    building_id: int
+    business_user_id: int
+    business_blocked: bool
+    loaded_at: float
+
+
+class TopologyCache:
+    """
+    Кеш топології сенсор -> пристрій -> будівля в памʼяті процесу.
+
+    Звичайне показання з кешованим сенсором не потребує жодного запиту до БД.
+    Записи явно інвалідуються при зміні топології у business/admin роутерах,
+    а TTL обмежує застарівання між кількома воркерами.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+
+        self._entries: dict[int, SensorTopology] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sensor_id: int) -> SensorTopology | None:
+        entry = self._entries.get(sensor_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at > self.ttl_seconds:
+            self._entries.pop(sensor_id, None)
+            return None
+        return entry
+
+    async def get_many(self, db: AsyncSession, sensor_ids) -> dict[int, SensorTopology]:
+        found = {}
+        missing = []
+
+        for sensor_id in sensor_ids:
+            entry = self.get(sensor_id)
+            if entry is None:
+                missing.append(sensor_id)
+            else:
+                found[sensor_id] = entry
+
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if missing:
+            found.update(await self._load(db, missing))
+
+        return found
+
+    async def get_or_load(self, db: AsyncSession, sensor_id: int) -> SensorTopology | None:
+        return (await self.get_many(db, [sensor_id])).get(sensor_id)
+
+    async def _load(self, db: AsyncSession, sensor_ids: list[int]) -> dict[int, SensorTopology]:
+        result = await db.execute(
+            select(
+                models.Sensor.id,
+                models.Sensor.sensor_type,
+                models.Sensor.unit,
+                models.Sensor.threshold_warning,
+                models.Sensor.threshold_critical,
+                models.IoTDevice.id.label("device_id"),
+                models.IoTDevice.serial_number,
+                models.IoTDevice.active,
+                models.Building.id.label("building_id"),
+                models.BusinessUser.id.label("business_user_id"),
+                models.BusinessUser.is_blocked
+            )
+            .join(models.IoTDevice, models.Sensor.device_id == models.IoTDevice.id)
+            .join(models.Building, models.IoTDevice.building_id == models.Building.id)
+            .join(models.BusinessUser, models.Building.business_user_id == models.BusinessUser.id)
+            .filter(models.Sensor.id.in_(sensor_ids))
+        )
+        rows = result.all()
+
+        now = time.monotonic()
+        loaded = {
+            row.id: SensorTopology(
+                sensor_id=row.id,
+                sensor_type=row.sensor_type,
+                unit=row.unit,
+                threshold_warning=row.threshold_warning,
+                threshold_critical=row.threshold_critical,
+                device_id=row.device_id,
+                serial_number=row.serial_number,
+                device_active=bool(row.active),
+                building_id=row.building_id,
+                business_user_id=row.business_user_id,
+                business_blocked=bool(row.is_blocked),
+                loaded_at=now
+            )
+            for row in rows
+        }
+
+        overflow = len(self._entries) + len(loaded) - self.max_size
+        if overflow > 0:
+            for sensor_id in list(self._entries)[:overflow]:
+                self._entries.pop(sensor_id, None)
+        self._entries.update(loaded)
+
+        return loaded
+
+    def _invalidate_where(self, predicate):
+        stale = [
+            sensor_id
+            for sensor_id, entry in self._entries.items()
+            if predicate(entry)
+        ]
+        for sensor_id in stale:
+            self._entries.pop(sensor_id, None)
+
+    def invalidate_sensor(self, sensor_id: int):
+        self._entries.pop(sensor_id, None)
+
+    def invalidate_device(self, device_id: int):
+        self._invalidate_where(lambda entry: entry.device_id == device_id)
+
+    def invalidate_building(self, building_id: int):
+        self._invalidate_where(lambda entry: entry.building_id == building_id)
+
+    def invalidate_business(self, business_user_id: int):
+        self._invalidate_where(lambda entry: entry.business_user_id == business_user_id)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+sensor_topology = TopologyCache(
+    ttl_seconds=settings.TOPOLOGY_CACHE_TTL_SECONDS,
+    max_size=settings.TOPOLOGY_CACHE_MAX_SIZE
+)
@@ -0,0 +1,63 @@
+"""
+Накладні витрати автентифікації на запит: перевірка JWT із кешем і без.
+
+    python -m benchmarks.auth_overhead --tokens 1000 --rounds 20
+
+Порівнюються:
+  jwt.decode       — попередній шлях: повна перевірка підпису на кожен запит
+  cache hit        — decode_access_token для вже перевіреного токена
+  cache miss       — decode_access_token для нового токена (перевірка + запис у кеш)
+
+Токени — справжні create_access_token з різними sub, тож ключі кешу
+різні, як у парку дашбордів.
+"""
+import argparse
+import json
+import time
+
+from jose import jwt
+
+from app.core.config import settings
+from app.core.security import create_access_token, decode_access_token
+from app.services.token_cache import token_cache
+
+
+def measure(fn, tokens: list[str], rounds: int) -> float:
+    """Мікросекунд на токен."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            fn(token)
+    return (time.perf_counter() - started) / (rounds * len(tokens)) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    tokens = [create_access_token({"sub": i, "role": "business"}) for i in range(args.tokens)]
+
+    def full_decode(token: str):
+        jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+    def miss(token: str):
+        token_cache.clear()
+        decode_access_token(token)
+
+    results = {"jwt.decode": measure(full_decode, tokens, args.rounds)}
+
+    results["cache miss"] = measure(miss, tokens, 1)
+    for token in tokens:
+        decode_access_token(token)
+    results["cache hit"] = measure(decode_access_token, tokens, args.rounds)
+
+    print(json.dumps({
+        "microseconds_per_request": {name: round(us, 2) for name, us in results.items()},
+        "token_cache": token_cache.stats()
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Симулятор парку IoT-пристроїв і навантажувальний прогін інжесту.
+
+Через business API створюються будівлі, пристрої (з токенами) і сенсори,
+після чого /iot отримує показання зі сходинками цільової частоти. Для
+кожної сходинки звітуються пропускна здатність, перцентилі латентності,
+коди відповідей, кількість запитів до БД і створених інцидентів — видно,
+на якій частоті p99 одного воркера починає рости.
+
+    python -m benchmarks.fleet_sim --buildings 10 --devices 5 --sensors 4 \\
+        --rates 200,500,1000,2000 --duration 20
+
+Трафік:
+  * більшість показань — нормальні значення нижче threshold_warning;
+  * з імовірністю --burst-probability сенсор переходить у сплеск із
+    --burst-length показань рівня warning/critical;
+  * кожні --storm-every секунд усі пристрої одночасно «перепідключаються»
+    і вивантажують накопичений буфер (--storm-backlog показань із часом
+    пристрою) через /iot/readings:batch.
+
+Навантаження відкритого циклу: запити стартують за розкладом незалежно від
+відповідей, а латентність рахується від запланованого моменту, тож черга
+перед насиченим воркером не ховається. Якщо в польоті понад
+--max-outstanding запитів, наступні пропускаються (skipped) — це ознака
+насичення.
+
+За замовчуванням застосунок запускається в цьому ж процесі
+(httpx.ASGITransport разом із lifespan) на БД з DATABASE_URL — лише
+PostgreSQL; --create-schema створює таблиці на порожній БД, наявну
+оновлює `python -m app.db.migrate`. З --url навантаження йде на зовнішній сервер, і кількість запитів
+до БД не рахується. У режимі в процесі клієнт ділить з сервером один цикл
+подій, тож межа виходить заниженою; для точнішої межі воркера — --url на
+uvicorn з одним воркером. Створені дані не видаляються — запускайте на
+окремій БД.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from benchmarks.http_load import summarize
+
+THRESHOLD_WARNING = 50
+THRESHOLD_CRITICAL = 100
+
+
+@dataclass
+class SimSensor:
+    sensor_id: int
+    token: str
+    burst_left: int = 0
+
+
+@dataclass
+class SimDevice:
+    device_id: int
+    token: str
+    sensors: list[SimSensor] = field(default_factory=list)
+
+
+class QueryCounter:
+    """Кількість SQL-запитів застосунку в цьому процесі."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args, **kwargs):
+        self.count += 1
+
+
+def reading_value(sensor: SimSensor, burst_probability: float, burst_length: int) -> float:
+    if not sensor.burst_left and random.random() < burst_probability:
+        sensor.burst_left = burst_length
+    if sensor.burst_left:
+        sensor.burst_left -= 1
+        return round(random.uniform(THRESHOLD_WARNING, THRESHOLD_CRITICAL * 1.5), 2)
+    return round(max(0.0, random.gauss(THRESHOLD_WARNING * 0.3, THRESHOLD_WARNING * 0.1)), 2)
+
+
+async def provision(client: httpx.AsyncClient, args) -> tuple[dict, list[SimDevice]]:
+    run_id = uuid.uuid4().hex[:8]
+    response = await client.post("/auth/business/register", params={
+        "email": f"fleet-sim-{run_id}@example.com",
+        "password": "fleet-sim",
+        "business_name": f"Fleet simulator {run_id}"
+    })
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    semaphore = asyncio.Semaphore(args.provision_concurrency)
+
+    async def post(path: str, **kwargs) -> dict:
+        async with semaphore:
+            response = await client.post(path, headers=headers, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def create_device(building_id: int, serial_number: str) -> SimDevice:
+        device = await post(f"/business/buildings/{building_id}/devices", json={
+            "serial_number": serial_number,
+            "model": "fleet-sim",
+            "supports_valve": False
+        })
+        credentials = await post(f"/business/devices/{device['id']}/credentials")
+        sensors = await asyncio.gather(*(
+            post(f"/business/devices/{device['id']}/sensors", json={
+                "sensor_type": "gas",
+                "unit": "ppm",
+                "threshold_warning": THRESHOLD_WARNING,
+                "threshold_critical": THRESHOLD_CRITICAL
+            })
+            for _ in range(args.sensors)
+        ))
+        return SimDevice(
+            device_id=device["id"],
+            token=credentials["token"],
+            sensors=[SimSensor(sensor["id"], credentials["token"]) for sensor in sensors]
+        )
+
+    buildings = await asyncio.gather(*(
+        post("/business/buildings", json={
+            "name": f"Sim building {b}",
+            "address": f"Simulated street {b}",
+            "latitude": random.uniform(-60, 60),
+            "longitude": random.uniform(-180, 180)
+        })
+        for b in range(args.buildings)
+    ))
+    devices = await asyncio.gather(*(
+        create_device(building["id"], f"SIM-{run_id}-{b}-{d}")
+        for b, building in enumerate(buildings)
+        for d in range(args.devices)
+    ))
+    return headers, list(devices)
+
+
+async def count_incidents(client: httpx.AsyncClient, headers: dict) -> int:
+    response = await client.get("/business/incidents", headers=headers)
+    response.raise_for_status()
+    return len(response.json())
+
+
+class Step:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.statuses: dict[int, int] = {}
+        self.readings = 0
+        self.errors = 0
+        self.skipped = 0
+        self.outstanding = 0
+
+    async def send(self, client: httpx.AsyncClient, scheduled: float, readings: int, method: str, path: str, **kwargs):
+        self.outstanding += 1
+        try:
+            response = await client.request(method, path, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        finally:
+            self.outstanding -= 1
+
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if 200 <= status < 300:
+            self.latencies.append(time.perf_counter() - scheduled)
+            self.readings += readings
+        else:
+            self.errors += 1
+
+
+def storm_batch(device: SimDevice, backlog: int, args) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "sensor_id": sensor.sensor_id,
+            "value": reading_value(sensor, args.burst_probability, args.burst_length),
+            "timestamp": (now - timedelta(seconds=backlog - i)).isoformat()
+        }
+        for i in range(backlog)
+        for sensor in device.sensors
+    ]
+
+
+async def run_step(client: httpx.AsyncClient, devices: list[SimDevice], rate: float, args) -> dict:
+    step = Step()
+    storm = Step()
+    sensors = [sensor for device in devices for sensor in device.sensors]
+    tasks = set()
+
+    def launch(coroutine):
+        task = asyncio.create_task(coroutine)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    started = time.perf_counter()
+    next_storm = started + args.storm_every if args.storm_every else None
+    sent = 0
+
+    while True:
+        now = time.perf_counter()
+        if now - started >= args.duration:
+            break
+
+        if next_storm is not None and now >= next_storm:
+            next_storm += args.storm_every
+            for device in devices:
+                batch = storm_batch(device, args.storm_backlog, args)
+                launch(storm.send(
+                    client, now, len(batch), "POST", "/iot/readings:batch",
+                    json={"readings": batch},
+                    headers={"X-Device-Token": device.token}
+                ))
+
+        # Розклад відкритого циклу: запит sent стартує в started + sent / rate
+        scheduled = started + sent / rate
+        if scheduled > now:
+            await asyncio.sleep(scheduled - now)
+            continue
+        sent += 1
+
+        if step.outstanding >= args.max_outstanding:
+            step.skipped += 1
+            continue
+
+        sensor = random.choice(sensors)
+        launch(step.send(
+            client, scheduled, 1, "POST", f"/iot/sensors/{sensor.sensor_id}/data",
+            json={"value": reading_value(sensor, args.burst_probability, args.burst_length)},
+            headers={"X-Device-Token": sensor.token}
+        ))
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "target_rate": rate,
+        **summarize(step.latencies, step.errors, elapsed),
+        "readings_per_second": round((step.readings + storm.readings) / elapsed, 1),
+        "skipped": step.skipped,
+        "statuses": step.statuses
+    }
+    if storm.statuses:
+        storm_summary = summarize(storm.latencies, storm.errors, elapsed)
+        result["storm"] = {
+            "requests": storm_summary["requests"],
+            "readings": storm.readings,
+            "p50_ms": storm_summary["p50_ms"],
+            "p99_ms": storm_summary["p99_ms"],
+            "statuses": storm.statuses
+        }
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Зовнішній сервер; без нього застосунок запускається в процесі")
+    parser.add_argument("--create-schema", action="store_true")
+    parser.add_argument("--buildings", type=int, default=10)
+    parser.add_argument("--devices", type=int, default=5, help="Пристроїв на будівлю")
+    parser.add_argument("--sensors", type=int, default=4, help="Сенсорів на пристрій")
+    parser.add_argument("--rates", default="100,250,500,1000", help="Сходинки, запитів/с")
+    parser.add_argument("--duration", type=float, default=10.0, help="Секунд на сходинку")
+    parser.add_argument("--max-outstanding", type=int, default=1000)
+    parser.add_argument("--burst-probability", type=float, default=0.002)
+    parser.add_argument("--burst-length", type=int, default=5)
+    parser.add_argument("--storm-every", type=float, default=0.0, help="0 — без перепідключень")
+    parser.add_argument("--storm-backlog", type=int, default=30)
+    parser.add_argument("--no-rate-limits", action="store_true", help="Вимкнути token bucket у процесі")
+    parser.add_argument("--provision-concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    async with AsyncExitStack() as stack:
+        queries = None
+        if args.url:
+            transport = None
+            base_url = args.url
+        else:
+            from app.db.database import Base, engine
+            from app.main import app
+            from app.services.admission import admission
+
+            if args.create_schema:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+            if args.no_rate_limits:
+                for buckets in (admission.devices, admission.sensors):
+                    buckets.rate = buckets.burst = 1e12
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://fleet-sim"
+            queries = QueryCounter(engine)
+
+        client = await stack.enter_async_context(httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=args.max_outstanding)
+        ))
+
+        provisioning_started = time.perf_counter()
+        headers, devices = await provision(client, args)
+        print(json.dumps({
+            "devices": len(devices),
+            "sensors": sum(len(d.sensors) for d in devices),
+            "provision_seconds": round(time.perf_counter() - provisioning_started, 2)
+        }))
+
+        for rate in (float(r) for r in args.rates.split(",")):
+            incidents_before = await count_incidents(client, headers)
+            queries_before = queries.count if queries else None
+
+            result = await run_step(client, devices, rate, args)
+
+            if queries:
+                result["db_queries"] = queries.count - queries_before
+            result["incidents_created"] = await count_incidents(client, headers) - incidents_before
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
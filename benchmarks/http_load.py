@@ -0,0 +1,111 @@
+"""
+HTTP-навантаження на один ендпоінт: requests/sec і перцентилі латентності.
+
+Запуск проти працюючого сервера (uvicorn app.main:app):
+
+    python -m benchmarks.http_load --url http://127.0.0.1:8000 \\
+        --path /iot/sensors/1/data --json '{"value": 12.5}' \\
+        --concurrency 200 --requests 20000
+
+Для порівняння sync- і async-шару БД той самий прогін виконується на
+обох версіях коду з однаковими параметрами.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    method: str,
+    path: str,
+    total: int,
+    concurrency: int,
+    make_kwargs=None,
+    ok_statuses: set[int] | None = None
+) -> dict:
+    """
+    Виконати total запитів з concurrency паралельними воркерами.
+    Успіх — код < 400 або, якщо задано, код з ok_statuses.
+    """
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            kwargs = make_kwargs(i) if make_kwargs else {}
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                ok = (
+                    response.status_code in ok_statuses
+                    if ok_statuses else response.status_code < 400
+                )
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/iot/sensors/1/data")
+    parser.add_argument("--method", default="POST")
+    parser.add_argument("--json", default='{"value": 12.5}')
+    parser.add_argument("--header", action="append", default=[], help="Name: value")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=10_000)
+    args = parser.parse_args()
+
+    headers = dict(h.split(": ", 1) for h in args.header)
+    body = json.loads(args.json) if args.json else None
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits) as client:
+        result = await run_load(
+            client,
+            args.method,
+            args.path,
+            args.requests,
+            args.concurrency,
+            make_kwargs=(lambda i: {"json": body}) if body is not None else None
+        )
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""
+Пропускна здатність /auth/login під паралельним навантаженням.
+
+    python -m benchmarks.login_load --accounts 200 --concurrency 50 --requests 2000
+
+Створюється --accounts бізнес-користувачів (/auth/business/register), далі
+логіни йдуть у випадковому порядку; частка --unknown-ratio — з невідомим
+email (шлях «User not found» без bcrypt, очікуваний код 401). Окремо
+звітуються успішні логіни і невідомі email, а в режимі в процесі —
+кількість SQL-запитів на логін.
+
+Як і fleet_sim, за замовчуванням застосунок запускається в цьому ж процесі
+на БД з DATABASE_URL (--create-schema створює таблиці), з --url —
+навантаження на зовнішній сервер. Час успішного логіну здебільшого
+визначає bcrypt у пулі процесів (app/core/passwords.py): пропускна здатність
+упирається в PASSWORD_HASH_WORKERS, а понад PASSWORD_HASH_MAX_PENDING
+логіни отримують 503.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from contextlib import AsyncExitStack
+
+import httpx
+
+from benchmarks.fleet_sim import QueryCounter
+from benchmarks.http_load import run_load
+
+PASSWORD = "login-load"
+
+
+async def register(client: httpx.AsyncClient, count: int, concurrency: int) -> list[str]:
+    run_id = uuid.uuid4().hex[:8]
+    emails = [f"login-load-{run_id}-{i}@example.com" for i in range(count)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(email: str):
+        async with semaphore:
+            response = await client.post("/auth/business/register", params={
+                "email": email,
+                "password": PASSWORD,
+                "business_name": "Login load"
+            })
+        response.raise_for_status()
+
+    await asyncio.gather(*(create(email) for email in emails))
+    return emails
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Зовнішній сервер; без нього застосунок запускається в процесі")
+    parser.add_argument("--create-schema", action="store_true")
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--unknown-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    async with AsyncExitStack() as stack:
+        queries = None
+        if args.url:
+            transport = None
+            base_url = args.url
+        else:
+            from app.db.database import Base, engine
+            from app.main import app
+
+            if args.create_schema:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://login-load"
+            queries = QueryCounter(engine)
+
+        client = await stack.enter_async_context(httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=args.concurrency)
+        ))
+
+        registering_started = time.perf_counter()
+        emails = await register(client, args.accounts, args.concurrency)
+        print(json.dumps({
+            "accounts": len(emails),
+            "register_seconds": round(time.perf_counter() - registering_started, 2)
+        }))
+
+        unknown = int(args.requests * args.unknown_ratio)
+        for name, total, make_email, ok_statuses in (
+            ("known", args.requests - unknown, lambda i: random.choice(emails), {200}),
+            ("unknown", unknown, lambda i: f"missing-{i}@example.com", {401}),
+        ):
+            if not total:
+                continue
+
+            queries_before = queries.count if queries else None
+            result = await run_load(
+                client,
+                "POST",
+                "/auth/login",
+                total,
+                args.concurrency,
+                make_kwargs=lambda i: {"data": {"username": make_email(i), "password": PASSWORD}},
+                ok_statuses=ok_statuses
+            )
+            result = {"logins": name, **result}
+            if queries:
+                result["db_queries_per_login"] = round((queries.count - queries_before) / total, 2)
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
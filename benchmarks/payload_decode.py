@@ -0,0 +1,84 @@
+"""
+CPU на розбір пакета показників і розмір тіла: JSON+pydantic проти швидкого шляху.
+
+    python -m benchmarks.payload_decode --readings 1000 --rounds 200
+
+Порівнюються:
+  json+pydantic   — попередній шлях: модель пакета з model_validate_json
+                    і перетворення моделей у Reading
+  json fast       — parse_batch_readings (TypeAdapter.validate_json)
+  msgpack fast    — компактні масиви [sensor_id, value, timestamp]
+  cbor fast       — те саме в CBOR
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import cbor2
+import msgpack
+from pydantic import BaseModel, Field
+
+from app.core.payloads import CBOR, JSON, MSGPACK, parse_batch_readings
+from app.schemas.iot_schemas import SensorReadingBatchItem
+from app.services.ingestion import Reading
+
+
+class SensorReadingBatchRequest(BaseModel):
+    """Модель тіла пакета, якою розбирався /iot/readings:batch до швидкого шляху."""
+    readings: list[SensorReadingBatchItem] = Field(..., min_length=1, max_length=10000)
+
+
+def make_batch(count: int) -> list[tuple[int, float, datetime]]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        (random.randint(1, 5000), round(random.uniform(0, 120), 2), start + timedelta(seconds=i))
+        for i in range(count)
+    ]
+
+
+def pydantic_readings(raw: bytes) -> list[Reading]:
+    data = SensorReadingBatchRequest.model_validate_json(raw)
+    return [Reading(r.sensor_id, r.value, r.timestamp) for r in data.readings]
+
+
+def measure(decode, raw: bytes, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        decode(raw)
+    return (time.perf_counter() - started) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    batch = make_batch(args.readings)
+
+    json_body = json.dumps({
+        "readings": [
+            {"sensor_id": s, "value": v, "timestamp": t.isoformat()}
+            for s, v, t in batch
+        ]
+    }).encode()
+    msgpack_body = msgpack.packb([[s, v, t] for s, v, t in batch], datetime=True)
+    cbor_body = cbor2.dumps([[s, v, t] for s, v, t in batch])
+
+    cases = [
+        ("json+pydantic", json_body, pydantic_readings),
+        ("json fast", json_body, lambda raw: parse_batch_readings(JSON, raw)),
+        ("msgpack fast", msgpack_body, lambda raw: parse_batch_readings(MSGPACK, raw)),
+        ("cbor fast", cbor_body, lambda raw: parse_batch_readings(CBOR, raw)),
+    ]
+
+    print(f"{'case':<16}{'bytes/reading':>15}{'us/reading':>12}")
+    for name, raw, decode in cases:
+        seconds = measure(decode, raw, args.rounds)
+        print(f"{name:<16}{len(raw) / args.readings:>15.1f}{seconds / args.readings * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()